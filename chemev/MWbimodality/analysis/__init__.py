@@ -0,0 +1,21 @@
+r""" 
+Subroutines shared by the analysis and plotting scripts for reading in and 
+reducing the outputs of the multizone simulations. 
+""" 
+
+__all__ = ["sidefile", "zheights", "star_query", "histogram_cube", 
+	"weighted_quantiles", "binned_weighted_quantiles", 
+	"crf_table", "cumulative_return_fraction", "remaining_mass", 
+	"run_mirrors", "iarate", "disk_geometry", "history_cube", "lazy_output", 
+	"write_archive", "star_archive"] 
+from .sidefiles import sidefile, zheights 
+from .stars import star_query 
+from .histograms import histogram_cube 
+from .quantiles import weighted_quantiles, binned_weighted_quantiles 
+from .crf import crf_table, cumulative_return_fraction, remaining_mass 
+from .mirrors import run_mirrors 
+from . import iarate 
+from .geometry import disk_geometry 
+from .histories import history_cube 
+from .outputs import lazy_output 
+from .archive import write_archive, star_archive 
@@ -0,0 +1,346 @@
+r""" 
+Compact archives of the star particle data of multizone outputs. The columns 
+of the star particle file and of the extra tracer particle data written 
+alongside it are stored together in a single ``.npz`` file, each with the 
+narrowest type which holds its values exactly (e.g. int8 or int16 zone 
+numbers), or at single precision where a tolerance is given, split into 
+chunks of a fixed number of rows and optionally deflated. Archives are a 
+fraction of the size of the text files and are read back without parsing. 
+""" 
+
+__all__ = ["write_archive", "star_archive", "CHUNK", "RTOL"] 
+from .outputs import lazy_output, _derived, _end_time 
+from .sidefiles import sidefile, _SUFFIXES 
+from utils import atomic_write 
+import numpy as np 
+import json 
+import vice 
+import os 
+
+CHUNK = 1048576 # The default number of rows in each chunk 
+RTOL = 0 # The default relative error tolerated in single precision 
+
+# The version of the archive layout written by this module 
+_VERSION = 1 
+
+# The signed integer types tried for integer-valued columns, narrowest first 
+_INTEGERS = [np.int8, np.int16, np.int32, np.int64] 
+
+
+def write_archive(output, filename = None, sidefiles = True, chunk = CHUNK, 
+	compress = True, rtol = RTOL): 
+	r""" 
+	Write the star particle data of a multizone output to a compact archive. 
+
+	Parameters 
+	---------- 
+	output : str or ``vice.multioutput`` or ``lazy_output`` or ``vice.dataframe`` 
+		The output, or its name, or a table of star particle data (e.g. one 
+		read back with ``star_archive.to_dataframe``). 
+	filename : str [default : None] 
+		The name of the archive. Defaults to "<name>_stars.npz" next to the 
+		output. Required if ``output`` is a table. 
+	sidefiles : bool [default : True] 
+		Whether or not to include the extra tracer particle data written 
+		alongside the output, if there is any. 
+	chunk : int [default : CHUNK] 
+		The number of rows in each chunk. 
+	compress : bool [default : True] 
+		Whether or not to deflate each chunk. The compression is lossless. 
+	rtol : real number [default : RTOL] 
+		The largest relative error tolerated in storing a floating point 
+		column at single precision. With the default of 0, the archive is 
+		lossless: only columns whose values are all exactly representable 
+		at single precision are stored as such. Values of order 1e-7 or 
+		larger store every finite column within range at single precision. 
+
+	Returns 
+	------- 
+	filename : str 
+		The name of the archive. 
+
+	Raises 
+	------ 
+	ValueError 
+		- ``output`` is a table and no filename is given. 
+		- The columns are not all of the same length. 
+		- ``chunk`` is not a positive integer. 
+
+	Notes 
+	----- 
+	Columns whose values are all integers (e.g. zone numbers) are stored as 
+	the narrowest signed integer type spanning their range, which is 
+	lossless. Other floating point columns are stored at single precision 
+	if every value is within ``rtol`` of its double precision counterpart, 
+	and at double precision otherwise, such that by default every column 
+	reads back exactly as it was written. 
+
+	The side file is the first of those searched for by ``zheights``. Its 
+	columns not among those of the star particles are included, the last 
+	column of a text side file under the label "zfinal". 
+
+	The time of the final output is recorded such that the ages of the star 
+	particles can be derived from the archive alone. 
+
+	Example Code 
+	------------ 
+	>>> write_archive("example") 
+	'example_stars.npz' 
+	>>> star_archive("example_stars.npz")["zone_final"].dtype 
+	dtype('int8') 
+	""" 
+	if chunk != int(chunk) or chunk < 1: raise ValueError( 
+		"Chunk size must be a positive integer. Got: %s" % (str(chunk))) 
+	if isinstance(output, str) or hasattr(output, "stars"): 
+		if isinstance(output, str): output = lazy_output(output) 
+		name = output.name[:-5] if output.name.endswith(".vice") else output.name 
+		stars = output.stars 
+		# decode every column of a lazily read output in one pass 
+		if hasattr(stars, "select"): stars.select(stars.labels) 
+		columns = dict([(i.lower(), stars[i]) for i in stars.keys()]) 
+		if sidefiles: columns.update(_sidefile_columns(name, output, columns)) 
+		if filename is None: filename = "%s_stars.npz" % (name) 
+		history = "%s.vice/zone0.vice/history.out" % (name) 
+		end_time = _end_time(name) if os.path.exists(history) else None 
+	elif filename is None: 
+		raise ValueError("Archive filename required for a table of data.") 
+	else: 
+		name = None 
+		columns = dict([(i.lower(), output[i]) for i in output.keys()]) 
+		end_time = None 
+	lengths = [len(columns[i]) for i in columns.keys()] 
+	if len(set(lengths)) > 1: raise ValueError( 
+		"Columns must be of the same length. Got: %s" % (str(dict(zip( 
+			columns.keys(), lengths))))) 
+
+	meta = { 
+		"version": 		_VERSION, 
+		"name": 		name, 
+		"rows": 		lengths[0] if len(lengths) else 0, 
+		"chunk": 		int(chunk), 
+		"end_time": 	end_time, 
+		"columns": 		[] 
+	} 
+	arrays = {} 
+	keys = list(columns.keys()) 
+	for i in range(len(keys)): 
+		values = np.asarray(columns[keys[i]]) 
+		values = values.astype(_narrowest(values, rtol)) 
+		# at least one chunk, such that empty columns keep their type 
+		starts = range(0, max(meta["rows"], 1), meta["chunk"]) 
+		for j in range(len(starts)): 
+			stop = starts[j] + meta["chunk"] 
+			arrays["c%d_%d" % (i, j)] = values[starts[j]:stop] 
+		meta["columns"].append({ 
+			"key": 		keys[i], 
+			"dtype": 	values.dtype.str, 
+			"chunks": 	len(starts) 
+		}) 
+	arrays["meta"] = np.array(json.dumps(meta)) 
+
+	with atomic_write(filename, 'wb') as out: 
+		if compress: 
+			np.savez_compressed(out, **arrays) 
+		else: 
+			np.savez(out, **arrays) 
+	return filename 
+
+
+class star_archive(object): 
+
+	r""" 
+	The star particle data of a multizone output read back from an archive 
+	written by ``write_archive``. 
+
+	Parameters 
+	---------- 
+	filename : str 
+		The name of the archive. 
+
+	Notes 
+	----- 
+	Columns are read in on first access, case-insensitive, in the types they 
+	are stored as. Besides those in the archive, "age", "[x/h]" and "[x/y]" 
+	are derived as in ``lazy_output``. This object can be passed to 
+	``star_query`` in place of ``vice.output.stars``. 
+
+	Example Code 
+	------------ 
+	>>> stars = star_archive("example_stars.npz") 
+	>>> stars.size 
+	(3107200, 9) 
+	>>> stars["[o/fe]"] 
+	>>> stars.to_dataframe() # a ``vice.dataframe`` at double precision 
+	""" 
+
+	def __init__(self, filename): 
+		if not os.path.exists(filename): raise IOError( 
+			"File not found: %s" % (filename)) 
+		self._filename = filename 
+		# members of an npz file are read from disk only when accessed 
+		self._file = np.load(filename) 
+		self._meta = json.loads(str(self._file["meta"])) 
+		if self._meta["version"] > _VERSION: raise IOError( 
+			"Archive written by a newer version of this module: %s" % ( 
+				filename)) 
+		self._index = dict([(self._meta["columns"][i]["key"], i) for i in 
+			range(len(self._meta["columns"]))]) 
+		self._columns = {} 
+
+	def __enter__(self): 
+		return self 
+
+	def __exit__(self, exc_type, exc_value, exc_tb): 
+		self.close() 
+		return False 
+
+	def __getitem__(self, key): 
+		key = key.lower() 
+		if key in self._columns: 
+			return self._columns[key] 
+		elif key in self._index: 
+			column = np.concatenate(list(self.chunks(key))) 
+			column.setflags(write = False) 
+			self._columns[key] = column 
+			return column 
+		else: 
+			return _derived(self, key, self._end_time) 
+
+	def __contains__(self, key): 
+		return key.lower() in self._index 
+
+	def keys(self): 
+		r""" 
+		Returns the labels of the columns in the archive. 
+		""" 
+		return self.labels 
+
+	def chunks(self, key): 
+		r""" 
+		Iterate over a column one chunk at a time. 
+
+		Parameters 
+		---------- 
+		key : str 
+			The label of the column, case-insensitive. 
+
+		Returns 
+		------- 
+		chunks : generator 
+			The chunks of the column, in order, each read from disk as it is 
+			reached. 
+		""" 
+		key = key.lower() 
+		if key not in self._index: raise KeyError( 
+			"Column not in archive: %s" % (key)) 
+		column = self._meta["columns"][self._index[key]] 
+		for i in range(column["chunks"]): 
+			yield self._file["c%d_%d" % (self._index[key], i)] 
+
+	def close(self): 
+		r""" 
+		Close the archive file. Columns already read in remain available. 
+		""" 
+		self._file.close() 
+
+	def to_dataframe(self): 
+		r""" 
+		Get every column of the archive as a ``vice.dataframe``, at double 
+		precision as in the outputs of VICE. 
+		""" 
+		return vice.dataframe(dict([(key, self[key].astype( 
+			np.float64).tolist()) for key in self.labels])) 
+
+	@property 
+	def filename(self): 
+		r""" 
+		Type : str 
+
+		The name of the archive. 
+		""" 
+		return self._filename 
+
+	@property 
+	def name(self): 
+		r""" 
+		Type : str 
+
+		The name of the output the archive was written from, None if it was 
+		written from a table. 
+		""" 
+		return self._meta["name"] 
+
+	@property 
+	def labels(self): 
+		r""" 
+		Type : list 
+
+		The labels of the columns in the archive, lower-case. 
+		""" 
+		return [i["key"] for i in self._meta["columns"]] 
+
+	@property 
+	def dtypes(self): 
+		r""" 
+		Type : dict 
+
+		The type each column is stored as. 
+		""" 
+		return dict([(i["key"], np.dtype(i["dtype"])) for i in 
+			self._meta["columns"]]) 
+
+	@property 
+	def size(self): 
+		r""" 
+		Type : tuple 
+
+		The number of star particles and the number of columns, as in 
+		``vice.dataframe.size``. 
+		""" 
+		return (self._meta["rows"], len(self._meta["columns"])) 
+
+	def _end_time(self): 
+		if self._meta["end_time"] is None: raise ValueError( 
+			"Archive does not record the time of the final output: %s" % ( 
+				self._filename)) 
+		return self._meta["end_time"] 
+
+
+def _narrowest(values, rtol): 
+	# the narrowest type holding the values of a column, to within rtol at 
+	# single precision 
+	if len(values) and (values.dtype.kind in "iu" or (values.dtype.kind == 'f' 
+		and np.all(np.isfinite(values)) and np.array_equal(values, 
+		np.round(values)))): 
+		lower, upper = values.min(), values.max() 
+		for dtype in _INTEGERS: 
+			if np.iinfo(dtype).min <= lower and upper <= np.iinfo(dtype).max: 
+				return np.dtype(dtype) 
+			else: continue 
+	else: pass 
+	if values.dtype.kind == 'f' and values.dtype.itemsize > 4: 
+		with np.errstate(over = "ignore", invalid = "ignore"): 
+			single = values.astype(np.float32) 
+			error = np.abs(single.astype(values.dtype) - values) 
+			tolerated = (error <= rtol * np.abs(values)) | (single == values) | ( 
+				np.isnan(single) & np.isnan(values)) 
+		if np.all(tolerated): return np.dtype(np.float32) 
+	else: pass 
+	return values.dtype 
+
+
+def _sidefile_columns(name, output, columns): 
+	# the columns of the side file of an output not already among those of 
+	# its star particles, aligned with them 
+	for suffix in _SUFFIXES: 
+		if os.path.exists("%s%s" % (name, suffix)): 
+			data = sidefile("%s%s" % (name, suffix)) 
+			if data.data.dtype.names is None: 
+				# text side files have no labels; the last column is the height 
+				fields = {"zfinal": -1} 
+			else: 
+				fields = dict([(i, i) for i in data.data.dtype.names]) 
+			return dict([(key, data.aligned(output, fields[key])) for key in 
+				fields.keys() if key not in columns]) 
+		else: continue 
+	return {} 
@@ -0,0 +1,128 @@
+r""" 
+A tabulated cumulative return fraction (CRF) for weighting star particles by 
+their remaining mass. ``vice.cumulative_return_fraction`` is evaluated once 
+on a fine age grid for a given IMF and mass-lifetime setting, the table is 
+cached on disk, and every later call interpolates it for any number of star 
+particles at once. 
+""" 
+
+__all__ = ["crf_table", "cumulative_return_fraction", "remaining_mass"] 
+from utils import atomic_write 
+import numpy as np 
+import hashlib 
+import vice 
+import os 
+
+CACHE_DIR = "%s/cache" % (os.path.dirname(os.path.abspath(__file__))) 
+
+# logarithmically spaced, since the CRF rises steeply in the first ~100 Myr 
+AGES = np.concatenate(([0.], np.logspace(-3, np.log10(15), 4000))) 
+
+_TABLES = {} 
+
+
+def crf_table(ages = AGES, **kwargs): 
+	r""" 
+	Get the cumulative return fraction tabulated on an age grid. 
+
+	Parameters 
+	---------- 
+	ages : array-like [default : ``AGES``] 
+		The ages in Gyr to evaluate the CRF at, in increasing order. The 
+		default grid spans 0 to 15 Gyr. 
+	kwargs : varying types 
+		Keyword arguments passed to ``vice.cumulative_return_fraction`` (e.g. 
+		IMF, m_upper, m_lower, postMS). 
+
+	Returns 
+	------- 
+	crf : numpy.ndarray 
+		The CRF at each age. 
+
+	Notes 
+	----- 
+	Tables are kept in memory and written to ``CACHE_DIR``, keyed by the age 
+	grid, the keyword arguments, the version of VICE, and its mass-lifetime 
+	relation setting where available. Tables for a user-defined IMF (i.e. a 
+	function) are neither kept nor written, since the function cannot be 
+	identified across sessions. 
+	""" 
+	ages = np.asarray(ages, dtype = np.float64) 
+	if any([callable(i) for i in kwargs.values()]): 
+		return _tabulate(ages, kwargs) 
+	else: pass 
+	key = _key(ages, kwargs) 
+	if key not in _TABLES: 
+		filename = "%s/crf.%s.npy" % (CACHE_DIR, key) 
+		if os.path.exists(filename): 
+			_TABLES[key] = np.load(filename) 
+		else: 
+			_TABLES[key] = _tabulate(ages, kwargs) 
+			os.makedirs(CACHE_DIR, exist_ok = True) 
+			with atomic_write(filename, 'wb') as out: 
+				np.save(out, _TABLES[key]) 
+	else: pass 
+	return _TABLES[key] 
+
+
+def cumulative_return_fraction(age, **kwargs): 
+	r""" 
+	Get the cumulative return fraction of stellar populations by 
+	interpolating a tabulated CRF. 
+
+	Parameters 
+	---------- 
+	age : real number or array-like 
+		The age(s) of the stellar populations in Gyr. Ages outside of the 
+		tabulated grid take the CRF at its nearest end. 
+	kwargs : varying types 
+		Keyword arguments passed to ``crf_table``. 
+
+	Returns 
+	------- 
+	crf : float or numpy.ndarray 
+		The cumulative return fraction at each age. 
+	""" 
+	ages = kwargs.pop("ages", AGES) 
+	crf = np.interp(age, ages, crf_table(ages = ages, **kwargs)) 
+	if np.ndim(age): 
+		return crf 
+	else: 
+		return float(crf) 
+
+
+def remaining_mass(mass, age, **kwargs): 
+	r""" 
+	Get the mass remaining in stellar populations. 
+
+	Parameters 
+	---------- 
+	mass : real number or array-like 
+		The mass(es) of the stellar populations at birth. 
+	age : real number or array-like 
+		The age(s) of the stellar populations in Gyr. 
+	kwargs : varying types 
+		Keyword arguments passed to ``crf_table``. 
+
+	Returns 
+	------- 
+	remaining : float or numpy.ndarray 
+		The birth mass times one minus the cumulative return fraction. 
+	""" 
+	return np.asarray(mass, dtype = np.float64) * (1 - 
+		cumulative_return_fraction(age, **kwargs)) 
+
+
+def _tabulate(ages, kwargs): 
+	return np.array([vice.cumulative_return_fraction(float(i), **kwargs) for 
+		i in ages]) 
+
+
+def _key(ages, kwargs): 
+	sha = hashlib.sha1() 
+	sha.update(repr(sorted([(k.lower(), kwargs[k]) for k in 
+		kwargs.keys()])).encode()) 
+	sha.update(str(vice.__version__).encode()) 
+	if hasattr(vice, "mlr"): sha.update(str(vice.mlr.setting).encode()) 
+	sha.update(ages.tobytes()) 
+	return sha.hexdigest()[:16] 
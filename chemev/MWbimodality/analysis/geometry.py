@@ -0,0 +1,261 @@
+r""" 
+The geometry of the annuli of a multizone disk model: their edges, centers, 
+and areas, and the mapping between galactocentric radius and zone number. 
+The simulations write it next to each output (``<name>.vice/geometry.json``) 
+so that the analysis and plotting scripts read the resolution of the run 
+they are given rather than assuming one. 
+""" 
+
+__all__ = ["disk_geometry", "ZONE_WIDTH", "CUTOFF"] 
+from utils import atomic_write 
+import numpy as np 
+import json 
+import os 
+
+ZONE_WIDTH = 0.25 # The default width of each zone in kpc 
+CUTOFF = 15.5 # The default radius of the star forming disk in kpc 
+
+
+class disk_geometry(object): 
+
+	r""" 
+	The annuli of a multizone disk model, each of the same width. 
+
+	Parameters 
+	---------- 
+	zone_width : real number [default : ZONE_WIDTH] 
+		The width of each zone in kpc. 
+	n_zones : int [default : 120] 
+		The number of zones. 
+	cutoff : real number [default : CUTOFF] 
+		The radius of the star forming disk in kpc. Zones whose inner edge 
+		is inside it are active. 
+
+	Example Code 
+	------------ 
+	>>> geometry = disk_geometry(0.25, 120) 
+	>>> geometry.zone([3, 8.1, 40]) 
+	array([12, 32, -1]) 
+	>>> geometry.n_active 
+	62 
+	""" 
+
+	def __init__(self, zone_width = ZONE_WIDTH, n_zones = 120, 
+		cutoff = CUTOFF): 
+		if zone_width <= 0: raise ValueError( 
+			"Zone width must be positive. Got: %g" % (zone_width)) 
+		if int(n_zones) != n_zones or n_zones < 1: raise ValueError( 
+			"Number of zones must be a positive integer. Got: %s" % ( 
+				str(n_zones))) 
+		self._zone_width = float(zone_width) 
+		self._n_zones = int(n_zones) 
+		self._cutoff = float(cutoff) 
+		self._edges = self._zone_width * np.arange(self._n_zones + 1) 
+		self._centers = (self._edges[:-1] + self._edges[1:]) / 2 
+		self._areas = np.pi * (self._edges[1:]**2 - self._edges[:-1]**2) 
+		for i in [self._edges, self._centers, self._areas]: 
+			i.setflags(write = False) 
+
+	def __repr__(self): 
+		return "disk_geometry(zone_width = %g, n_zones = %d, cutoff = %g)" % ( 
+			self._zone_width, self._n_zones, self._cutoff) 
+
+	def __eq__(self, other): 
+		return isinstance(other, disk_geometry) and ( 
+			self.to_dict() == other.to_dict()) 
+
+	def __len__(self): 
+		return self._n_zones 
+
+	@property 
+	def zone_width(self): 
+		r""" 
+		Type : float 
+
+		The width of each zone in kpc. 
+		""" 
+		return self._zone_width 
+
+	@property 
+	def n_zones(self): 
+		r""" 
+		Type : int 
+
+		The number of zones. 
+		""" 
+		return self._n_zones 
+
+	@property 
+	def cutoff(self): 
+		r""" 
+		Type : float 
+
+		The radius of the star forming disk in kpc. 
+		""" 
+		return self._cutoff 
+
+	@property 
+	def n_active(self): 
+		r""" 
+		Type : int 
+
+		The number of zones whose inner edge is inside the cutoff, i.e. the 
+		star forming zones 0 through n_active - 1. 
+		""" 
+		return int(min(np.ceil(self._scaled(self._cutoff)), self._n_zones)) 
+
+	@property 
+	def edges(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The radii of the zone boundaries in kpc, from 0 to the outer edge of 
+		the last zone. Read-only. 
+		""" 
+		return self._edges 
+
+	@property 
+	def centers(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The radius of the middle of each zone in kpc. Read-only. 
+		""" 
+		return self._centers 
+
+	@property 
+	def areas(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The area of each annulus in kpc^2. Read-only. 
+		""" 
+		return self._areas 
+
+	def zone(self, rgal): 
+		r""" 
+		Get the zone containing one or more galactocentric radii. 
+
+		Parameters 
+		---------- 
+		rgal : real number or array-like 
+			Galactocentric radius in kpc. 
+
+		Returns 
+		------- 
+		zone : int or numpy.ndarray 
+			The zone number(s), -1 for radii outside of the disk. Each zone 
+			includes its inner edge but not its outer edge. 
+		""" 
+		zone = np.floor(self._scaled(rgal)).astype(np.int64) 
+		zone = np.where((zone >= 0) & (zone < self._n_zones), zone, -1) 
+		if np.ndim(rgal): 
+			return zone 
+		else: 
+			return int(zone) 
+
+	def radius(self, zone): 
+		r""" 
+		Get the galactocentric radius of the middle of one or more zones. 
+
+		Parameters 
+		---------- 
+		zone : int or array-like 
+			The zone number(s). 
+
+		Returns 
+		------- 
+		rgal : float or numpy.ndarray 
+			The radius in kpc. 
+		""" 
+		rgal = (np.asarray(zone, dtype = np.float64) + 0.5) * self._zone_width 
+		if np.ndim(zone): 
+			return rgal 
+		else: 
+			return float(rgal) 
+
+	def _scaled(self, rgal): 
+		# radii in units of the zone width, snapped to the nearest integer 
+		# within roundoff such that e.g. 0.3 / 0.1 lands on an edge 
+		scaled = np.asarray(rgal, dtype = np.float64) / self._zone_width 
+		nearest = np.round(scaled) 
+		return np.where(np.abs(scaled - nearest) <= 1.e-9 * np.maximum( 
+			np.abs(nearest), 1), nearest, scaled) 
+
+	def to_dict(self): 
+		r""" 
+		Get the parameters of this geometry as a dictionary, as they are 
+		written by ``save``. 
+		""" 
+		return { 
+			"zone_width": 	self._zone_width, 
+			"n_zones": 		self._n_zones, 
+			"cutoff": 		self._cutoff 
+		} 
+
+	def save(self, filename): 
+		r""" 
+		Write this geometry to a JSON file. 
+
+		Parameters 
+		---------- 
+		filename : str 
+			The name of the file, e.g. "<name>.vice/geometry.json". 
+		""" 
+		with atomic_write(filename) as f: 
+			json.dump(self.to_dict(), f, indent = 4) 
+
+	@classmethod 
+	def load(cls, filename): 
+		r""" 
+		Read a geometry from a JSON file written by ``save``. 
+
+		Parameters 
+		---------- 
+		filename : str 
+			The name of the file. 
+		""" 
+		with open(filename, 'r') as f: 
+			return cls(**json.load(f)) 
+
+	@classmethod 
+	def from_output(cls, output, zone_width = ZONE_WIDTH, cutoff = CUTOFF): 
+		r""" 
+		Get the geometry of a multizone output. 
+
+		Parameters 
+		---------- 
+		output : str or ``vice.output`` or ``vice.multioutput`` 
+			The output, or its name. 
+		zone_width : real number [default : ZONE_WIDTH] 
+			The width of each zone in kpc if the output does not record it. 
+		cutoff : real number [default : CUTOFF] 
+			The radius of the star forming disk in kpc if the output does not 
+			record it. 
+
+		Returns 
+		------- 
+		geometry : ``disk_geometry`` 
+			The geometry written alongside the output if there is one. 
+			Otherwise, that of the ``diskspec`` specification written 
+			alongside it, or failing that, the given zone width and cutoff 
+			with the number of zones in the output. 
+		""" 
+		name = getattr(output, "name", output) 
+		if name.endswith(".vice"): name = name[:-5] 
+		if os.path.exists("%s.vice/geometry.json" % (name)): 
+			return cls.load("%s.vice/geometry.json" % (name)) 
+		elif os.path.exists("%s.vice/spec.json" % (name)): 
+			with open("%s.vice/spec.json" % (name), 'r') as f: 
+				spec = json.load(f) 
+			zone_width = spec.get("zone_width", zone_width) 
+			cutoff = spec.get("cutoff", cutoff) 
+		else: pass 
+		if os.path.exists("%s.vice" % (name)): 
+			# each zone is written to a directory "zone<number>.vice", and 
+			# lazily read outputs may not make all of them available 
+			n_zones = len([i for i in os.listdir("%s.vice" % (name)) if 
+				i.startswith("zone") and i[4:].split('.')[0].isdigit()]) 
+		else: 
+			n_zones = len(output.zones.keys()) 
+		return cls(zone_width = zone_width, n_zones = n_zones, cutoff = cutoff) 
@@ -0,0 +1,182 @@
+r""" 
+Mass-weighted N-dimensional histograms of star particles. The histogram is 
+computed over every axis at once in a single pass through the star particle 
+data, and each panel of a multi-panel figure is then a slice of the cube 
+rather than a separate set of filters over the stars. 
+""" 
+
+__all__ = ["histogram_cube"] 
+import numpy as np 
+
+
+class histogram_cube(object): 
+
+	r""" 
+	A weighted histogram of star particles over any number of quantities. 
+
+	Parameters 
+	---------- 
+	stars : ``star_query``, ``vice.dataframe``, or dict 
+		The star particle data. 
+	bins : list 
+		A list of (key, edges) tuples, one per axis of the cube, where key is 
+		the label of a column of the star particle data and edges are the 
+		bin edges along that axis in increasing order. 
+	weights : str or None [default : "mass"] 
+		The label of the column to weight each star particle by. If None, 
+		each star particle contributes one. 
+
+	Notes 
+	----- 
+	Each bin includes its lower edge but not its upper edge. Star particles 
+	falling outside of the edges along an axis are kept in overflow bins on 
+	either side, such that sums over an axis not restricted by a slice include 
+	all star particles. Star particles with a NaN along any axis are dropped. 
+
+	Example Code 
+	------------ 
+	>>> cube = histogram_cube(stars, [("zone_final", [12, 20, 28]), 
+		("[fe/h]", np.linspace(-1, 0.5, 31))]) 
+	>>> mdf = cube.marginal("[fe/h]", zone_final = (12, 20)) 
+	""" 
+
+	def __init__(self, stars, bins, weights = "mass"): 
+		self._keys = [i[0].lower() for i in bins] 
+		self._edges = [np.asarray(i[1], dtype = np.float64) for i in bins] 
+		for i in range(len(self._edges)): 
+			if self._edges[i].ndim != 1 or len(self._edges[i]) < 2: 
+				raise ValueError( 
+					"Bin edges must be a 1-D array of at least two values. Got: %s" % ( 
+						str(bins[i][1]))) 
+			else: pass 
+			if np.any(np.diff(self._edges[i]) <= 0): raise ValueError( 
+				"Bin edges must be strictly increasing. Got: %s" % ( 
+					str(bins[i][1]))) 
+		shape = tuple([len(i) + 1 for i in self._edges]) 
+		indices = len(self._keys) * [None] 
+		keep = None 
+		for i in range(len(self._keys)): 
+			column = np.asarray(stars[self._keys[i]], dtype = np.float64) 
+			# index 0 and len(edges) are the underflow and overflow bins 
+			indices[i] = np.searchsorted(self._edges[i], column, side = "right") 
+			if keep is None: 
+				keep = ~np.isnan(column) 
+			else: 
+				keep &= ~np.isnan(column) 
+		indices = [i[keep] for i in indices] 
+		flat = np.ravel_multi_index(indices, shape) 
+		size = int(np.prod(shape)) 
+		if weights is None: 
+			self._weights = np.bincount(flat, minlength = size) 
+		else: 
+			self._weights = np.bincount(flat, weights = np.asarray( 
+				stars[weights], dtype = np.float64)[keep], minlength = size) 
+		self._weights = self._weights.astype(np.float64).reshape(shape) 
+		self._counts = np.bincount(flat, minlength = size).reshape(shape) 
+
+	@property 
+	def keys(self): 
+		r""" 
+		Type : list 
+
+		The labels of the quantities along each axis of the cube. 
+		""" 
+		return self._keys[:] 
+
+	def edges(self, key): 
+		r""" 
+		Get the bin edges along a given axis. 
+
+		Parameters 
+		---------- 
+		key : str 
+			The label of the quantity along the axis. 
+
+		Returns 
+		------- 
+		edges : numpy.ndarray 
+			The bin edges. 
+		""" 
+		return self._edges[self._axis(key)].copy() 
+
+	def marginal(self, key, counts = False, **ranges): 
+		r""" 
+		Get the distribution along one axis within a slice of the others. 
+
+		Parameters 
+		---------- 
+		key : str 
+			The label of the quantity to get the distribution of. 
+		counts : bool [default : False] 
+			Whether to return the number of star particles in each bin rather 
+			than their summed weights. 
+		ranges : keyword arguments 
+			The (lower, upper) range to restrict any of the other axes to. 
+			Each bound must be one of the bin edges along that axis, or None 
+			to include the overflow bin on that side. Axes not given are 
+			summed over entirely. Labels which are not valid python 
+			identifiers (e.g. "[fe/h]") can be passed by unpacking a 
+			dictionary. 
+
+		Returns 
+		------- 
+		dist : numpy.ndarray 
+			The distribution in each bin along the axis, not including the 
+			overflow bins. Not normalized. 
+		""" 
+		axis = self._axis(key) 
+		if key.lower() in [i.lower() for i in ranges.keys()]: raise ValueError( 
+			"Cannot restrict the axis of the distribution: %s" % (key)) 
+		cube = self._slice(counts, ranges) 
+		others = tuple([i for i in range(cube.ndim) if i != axis]) 
+		return cube.sum(axis = others)[1:-1] 
+
+	def total(self, counts = False, **ranges): 
+		r""" 
+		Get the summed weight or number of star particles within a slice. 
+
+		Parameters 
+		---------- 
+		counts : bool [default : False] 
+			Whether to return the number of star particles rather than their 
+			summed weights. 
+		ranges : keyword arguments 
+			The (lower, upper) range to restrict any of the axes to, as in 
+			``marginal``. 
+
+		Returns 
+		------- 
+		total : float or int 
+			The summed weight or number of star particles. 
+		""" 
+		return self._slice(counts, ranges).sum() 
+
+	def _axis(self, key): 
+		key = key.lower() 
+		if key not in self._keys: raise KeyError( 
+			"Quantity is not an axis of the cube: %s" % (key)) 
+		return self._keys.index(key) 
+
+	def _slice(self, counts, ranges): 
+		if counts: 
+			cube = self._counts 
+		else: 
+			cube = self._weights 
+		index = cube.ndim * [slice(None)] 
+		for key in ranges.keys(): 
+			axis = self._axis(key) 
+			if len(ranges[key]) != 2: raise ValueError( 
+				"Range must be a (lower, upper) pair. Got: %s" % ( 
+					str(ranges[key]))) 
+			index[axis] = slice(self._edge_index(axis, ranges[key][0], 0), 
+				self._edge_index(axis, ranges[key][1], cube.shape[axis])) 
+		return cube[tuple(index)] 
+
+	def _edge_index(self, axis, value, default): 
+		# the bin starting at edge i is at index i + 1 due to the underflow bin 
+		if value is None: return default 
+		match = np.flatnonzero(np.isclose(self._edges[axis], value)) 
+		if not len(match): raise ValueError( 
+			"Range bound %g is not a bin edge along axis: %s" % (value, 
+				self._keys[axis])) 
+		return match[0] + 1 
@@ -0,0 +1,181 @@
+r""" 
+The histories of every zone of a multizone output as (zones x time) arrays. 
+Each zone's history is read in once, and the stacked columns are cached in 
+a single binary file within the output, which is memory-mapped on every 
+later read. Radial gradients, heatmaps, and surface densities are then 
+slices of the cube rather than one dataframe lookup per zone. 
+""" 
+
+__all__ = ["history_cube"] 
+from .geometry import disk_geometry 
+from utils import atomic_write 
+import numpy as np 
+import vice 
+import os 
+
+# The name of the cache file within the output directory 
+_CACHE = "history_cube.npy" 
+
+
+class history_cube(object): 
+
+	r""" 
+	The history of every zone of a multizone output. 
+
+	Parameters 
+	---------- 
+	output : str or ``vice.output`` or ``vice.multioutput`` 
+		The output, or its name. 
+	keys : list [default : None] 
+		The history columns to read in, case-insensitive. None for every 
+		column of the history of the first zone. Columns not cached yet are 
+		added to the cache. 
+	cache : bool [default : True] 
+		Whether or not to read from and write to the cache file. 
+
+	Notes 
+	----- 
+	The cache is stored as "history_cube.npy" within the output directory. 
+	Each column is a contiguous block of the file, so ``cube[key]`` is a 
+	read-only view of shape (zones x time) and ``cube[key][:, -1]`` reads 
+	in only the final timestep of every zone. The cache is rebuilt whenever 
+	the history of the first zone is newer than it. 
+
+	Example Code 
+	------------ 
+	>>> cube = history_cube("example") 
+	>>> cube["[o/h]"][:, -1] # the gas-phase gradient at the final timestep 
+	>>> cube["sfr"] / cube.geometry.areas[:, None] # surface densities 
+	""" 
+
+	def __init__(self, output, keys = None, cache = True): 
+		name = getattr(output, "name", output) 
+		if name.endswith(".vice"): name = name[:-5] 
+		if not os.path.exists("%s.vice" % (name)): raise IOError( 
+			"Output not found: %s" % (name)) 
+		self._name = name 
+		self._output = output if hasattr(output, "zones") else None 
+		self._geometry = None 
+		if keys is not None: keys = [i.lower() for i in keys] 
+		filename = "%s.vice/%s" % (name, _CACHE) 
+		data = self._cached(filename) if cache else None 
+		if data is None or (keys is not None and 
+			not set(keys).issubset(data.dtype.names)): 
+			if keys is None: 
+				keys = [i.lower() for i in self._zone(0).history.keys()] 
+			elif data is not None: 
+				# keep the columns cached already 
+				keys = list(data.dtype.names) + [i for i in keys if i not in 
+					data.dtype.names] 
+			else: pass 
+			if "time" not in keys: keys = ["time"] + keys 
+			data = self._build(keys) 
+			if cache: 
+				with atomic_write(filename, 'wb') as out: 
+					np.save(out, data) 
+				data = np.load(filename, mmap_mode = 'r') 
+			else: pass 
+		else: pass 
+		self._data = data 
+
+	def __getitem__(self, key): 
+		r""" 
+		Get a history column of every zone. 
+
+		Parameters 
+		---------- 
+		key : str 
+			The label of the column, case-insensitive. 
+
+		Returns 
+		------- 
+		column : numpy.ndarray 
+			The column with shape (zones x time). Read-only. 
+		""" 
+		key = key.lower() 
+		if key not in self._data.dtype.names: raise KeyError( 
+			"Column not in history cube: %s. Load it with keys = [...]." % ( 
+				key)) 
+		column = self._data[key][0] 
+		column.setflags(write = False) 
+		return column 
+
+	def __contains__(self, key): 
+		return key.lower() in self._data.dtype.names 
+
+	def keys(self): 
+		r""" 
+		Returns the labels of the columns in the cube. 
+		""" 
+		return list(self._data.dtype.names) 
+
+	@property 
+	def name(self): 
+		r""" 
+		Type : str 
+
+		The name of the output, without the ".vice" extension. 
+		""" 
+		return self._name 
+
+	@property 
+	def shape(self): 
+		r""" 
+		Type : tuple 
+
+		The number of zones and the number of outputs of each column. 
+		""" 
+		return self._data.dtype[0].shape 
+
+	@property 
+	def time(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The time of each output in Gyr, taken from the first zone. 
+		""" 
+		return self["time"][0] 
+
+	@property 
+	def geometry(self): 
+		r""" 
+		Type : ``disk_geometry`` 
+
+		The geometry of the zones, as in ``disk_geometry.from_output``. 
+		""" 
+		if self._geometry is None: 
+			self._geometry = disk_geometry.from_output(self._name if 
+				self._output is None else self._output) 
+		else: pass 
+		return self._geometry 
+
+	def _multioutput(self): 
+		# the output itself, read in if only its name was given 
+		if self._output is None: 
+			self._output = vice.output(self._name) 
+		else: pass 
+		return self._output 
+
+	def _zone(self, i): 
+		return self._multioutput().zones["zone%d" % (i)] 
+
+	def _cached(self, filename): 
+		# the cache, or None if there is none or it is out of date 
+		history = "%s.vice/zone0.vice/history.out" % (self._name) 
+		if os.path.exists(filename) and not (os.path.exists(history) and 
+			os.path.getmtime(filename) < os.path.getmtime(history)): 
+			return np.load(filename, mmap_mode = 'r') 
+		else: 
+			return None 
+
+	def _build(self, keys): 
+		zones = [self._zone(i) for i in range(len( 
+			self._multioutput().zones.keys()))] 
+		shape = (len(zones), len(zones[0].history["time"])) 
+		# one field per column, each a contiguous (zones x time) block 
+		data = np.zeros(1, dtype = [(key, np.float64, shape) for key in keys]) 
+		for i in range(len(zones)): 
+			history = zones[i].history 
+			for key in keys: 
+				data[key][0, i] = history[key] 
+		return data 
@@ -0,0 +1,281 @@
+r""" 
+The SN Ia rate proxy inferred from the iron budget of each zone of a 
+multizone simulation: the rate of change of the iron mass, less the CCSN 
+contribution, plus the iron lost to star formation and outflows. The proxy is 
+computed for every zone at once as (zones x time) arrays, and the singlezone 
+comparison models run for each zone are memoized on disk. 
+""" 
+
+__all__ = ["constant", "history_arrays", "proxies", "zone_proxies", 
+	"comparison_runs", "comparison_proxies"] 
+from .mirrors import run_mirrors 
+from utils import atomic_write 
+import numpy as np 
+import hashlib 
+import vice 
+import os 
+
+CACHE_DIR = "%s/cache" % (os.path.dirname(os.path.abspath(__file__))) 
+
+# the history columns needed to compute the proxy 
+_KEYS = ["time", "mass(fe)", "sfr", "z(fe)"] 
+
+# the scalar singlezone attributes identifying a comparison model 
+_ATTRIBUTES = ["mode", "elements", "IMF", "eta", "enhancement", "recycling", 
+	"delay", "RIa", "Mg0", "smoothing", "tau_ia", "tau_star", "schmidt", 
+	"schmidt_index", "MgSchmidt", "dt", "m_upper", "m_lower", "postMS", 
+	"Z_solar"] 
+
+
+class constant(object): 
+
+	r""" 
+	A function of time which always returns the same value. Unlike a lambda 
+	expression, it can be sent to other processes and be identified across 
+	sessions, so it can be used to override a singlezone attribute in 
+	``comparison_runs``. 
+
+	Parameters 
+	---------- 
+	value : real number 
+		The value to return. 
+	""" 
+
+	def __init__(self, value): 
+		self._value = float(value) 
+
+	def __call__(self, t): 
+		return self._value 
+
+	def __repr__(self): 
+		return "constant(%r)" % (self._value) 
+
+
+def history_arrays(zones, keys = _KEYS): 
+	r""" 
+	Stack the history of several zones into 2-D arrays. 
+
+	Parameters 
+	---------- 
+	zones : list 
+		The ``vice.output`` objects of each zone. All must have the same 
+		number of outputs. 
+	keys : list [default : ["time", "mass(fe)", "sfr", "z(fe)"]] 
+		The history columns to stack. 
+
+	Returns 
+	------- 
+	arrays : dict 
+		Each column as a (zones x time) numpy array. 
+	""" 
+	return dict([(key, np.array([zone.history[key] for zone in zones], 
+		dtype = np.float64)) for key in keys]) 
+
+
+def proxies(time, mass_fe, sfr, z_fe, delay, eta, normalize = True, 
+	prefactor = 1, recycling = 0.4, ccsne_yield = None): 
+	r""" 
+	Compute the SN Ia rate proxy from zone histories. 
+
+	Parameters 
+	---------- 
+	time : array-like 
+		The times of each output in Gyr, with shape (zones x time) or 
+		(time,). 
+	mass_fe : array-like 
+		The iron mass in the ISM at each output in Msun. 
+	sfr : array-like 
+		The star formation rate at each output in Msun/yr. 
+	z_fe : array-like 
+		The iron abundance by mass in the ISM at each output. 
+	delay : real number or array-like 
+		The minimum SN Ia delay time of each zone in Gyr. The proxy is zero 
+		before it. 
+	eta : real number or array-like 
+		The mass loading factor of each zone. 
+	normalize : bool [default : True] 
+		Whether to divide by the iron mass in the ISM. 
+	prefactor : real number [default : 1] 
+		A factor to multiply the proxy by. 
+	recycling : real number [default : 0.4] 
+		The return fraction assumed for the iron lost to star formation. 
+	ccsne_yield : real number [default : None] 
+		The IMF-integrated CCSN yield of iron. None to take it from 
+		``vice.yields.ccsne.settings``. 
+
+	Returns 
+	------- 
+	proxies : numpy.ndarray 
+		The proxy at every output but the last, with negative values 
+		clipped to zero. Has one fewer entry along the time axis than the 
+		inputs. 
+	""" 
+	time = np.asarray(time, dtype = np.float64) 
+	mass_fe = np.asarray(mass_fe, dtype = np.float64) 
+	sfr = np.asarray(sfr, dtype = np.float64) 
+	z_fe = np.asarray(z_fe, dtype = np.float64) 
+	delay = np.asarray(delay, dtype = np.float64) 
+	eta = np.asarray(eta, dtype = np.float64) 
+	if time.ndim == 2: 
+		delay = np.reshape(delay, (-1, 1)) 
+		eta = np.reshape(eta, (-1, 1)) 
+	else: pass 
+	if ccsne_yield is None: ccsne_yield = vice.yields.ccsne.settings["fe"] 
+	result = np.diff(mass_fe, axis = -1) / np.diff(time, axis = -1) 
+	result -= ccsne_yield * sfr[..., :-1] * 1e9 
+	result += z_fe[..., :-1] * sfr[..., :-1] * (1 + eta - recycling) * 1e9 
+	if normalize: 
+		with np.errstate(divide = "ignore", invalid = "ignore"): 
+			result /= mass_fe[..., :-1] 
+	else: pass 
+	result *= prefactor 
+	result[~(time[..., :-1] > delay) | ~(result >= 0)] = 0 
+	return result 
+
+
+def zone_proxies(zones, **kwargs): 
+	r""" 
+	Compute the SN Ia rate proxy for the zones of a multizone output. 
+
+	Parameters 
+	---------- 
+	zones : ``vice.output`` or list 
+		The output of one zone, or a list of them. 
+	kwargs : varying types 
+		Keyword arguments passed to ``proxies``. 
+
+	Returns 
+	------- 
+	proxies : numpy.ndarray 
+		The proxy with shape (zones x time - 1), or (time - 1,) if a single 
+		zone was given. 
+	""" 
+	single = not isinstance(zones, (list, tuple)) 
+	if single: zones = [zones] 
+	mirrors = [vice.singlezone.from_output(zone) for zone in zones] 
+	arrays = history_arrays(zones) 
+	result = proxies(arrays["time"], arrays["mass(fe)"], arrays["sfr"], 
+		arrays["z(fe)"], [i.delay for i in mirrors], [i.eta for i in mirrors], 
+		**kwargs) 
+	if single: 
+		return result[0] 
+	else: 
+		return result 
+
+
+def comparison_runs(zones, times, overrides = None, processes = None, 
+	verbose = False): 
+	r""" 
+	Run a singlezone model mirroring each of several zones. 
+
+	Parameters 
+	---------- 
+	zones : list 
+		The ``vice.output`` objects of each zone. 
+	times : array-like 
+		The output times of the comparison models. 
+	overrides : dict or list [default : None] 
+		Attributes to set on the comparison models after mirroring the 
+		zones, either one dictionary for all of them or one per zone. Values 
+		must be picklable (e.g. ``constant`` rather than a lambda). 
+	processes : int [default : None] 
+		The number of processes to run the models in. None to use one per 
+		CPU. 
+	verbose : bool [default : False] 
+		Whether to print the wall time of each model as it finishes. 
+
+	Returns 
+	------- 
+	runs : list 
+		A dictionary for each zone containing the history columns "time", 
+		"mass(fe)", "sfr", and "z(fe)" of its comparison model as numpy 
+		arrays, and its SN Ia "delay" and mass loading factor "eta". 
+
+	Notes 
+	----- 
+	The models are run by ``mirrors.run_mirrors``. The results are written to 
+	``CACHE_DIR`` keyed by the zone's history and parameters, the yield 
+	settings, the overrides, and the output times, and models whose results 
+	are already cached are not rerun. 
+	""" 
+	times = np.asarray(times, dtype = np.float64) 
+	if overrides is None: overrides = {} 
+	if isinstance(overrides, dict): overrides = len(zones) * [overrides] 
+	if len(overrides) != len(zones): raise ValueError( 
+		"Need one set of overrides per zone. Got: %d != %d" % ( 
+			len(overrides), len(zones))) 
+	filenames = ["%s/comparison.%s.npz" % (CACHE_DIR, _key(zones[i], times, 
+		overrides[i])) for i in range(len(zones))] 
+	pending = [i for i in range(len(zones)) if not os.path.exists(filenames[i])] 
+	runs = run_mirrors([zones[i] for i in pending], times, 
+		overrides = [overrides[i] for i in pending], keys = _KEYS, 
+		attributes = ["delay", "eta"], processes = processes, verbose = verbose) 
+	if len(runs): os.makedirs(CACHE_DIR, exist_ok = True) 
+	for i in range(len(runs)): 
+		results = dict(runs[i]["history"]) 
+		results["delay"] = np.float64(runs[i]["attributes"]["delay"]) 
+		results["eta"] = np.float64(runs[i]["attributes"]["eta"]) 
+		with atomic_write(filenames[pending[i]], 'wb') as out: 
+			np.savez(out, **results) 
+	runs = [] 
+	for i in filenames: 
+		with np.load(i) as cached: 
+			runs.append(dict([(key, cached[key]) for key in cached.files])) 
+	return runs 
+
+
+def comparison_proxies(zones, times, overrides = None, processes = None, 
+	verbose = False, **kwargs): 
+	r""" 
+	Compute the SN Ia rate proxy of singlezone models mirroring each of 
+	several zones. 
+
+	Parameters 
+	---------- 
+	zones : list 
+		The ``vice.output`` objects of each zone. 
+	times : array-like 
+		The output times of the comparison models. 
+	overrides : dict or list [default : None] 
+		Passed to ``comparison_runs``. 
+	processes : int [default : None] 
+		Passed to ``comparison_runs``. 
+	verbose : bool [default : False] 
+		Passed to ``comparison_runs``. 
+	kwargs : varying types 
+		Keyword arguments passed to ``proxies``. 
+
+	Returns 
+	------- 
+	runs : list 
+		The comparison models as returned by ``comparison_runs``. 
+	proxies : numpy.ndarray 
+		The proxy of each model with shape (zones x len(times) - 1). 
+	""" 
+	runs = comparison_runs(zones, times, overrides = overrides, 
+		processes = processes, verbose = verbose) 
+	stacked = dict([(key, np.array([run[key] for run in runs])) for key in 
+		_KEYS + ["delay", "eta"]]) 
+	return [runs, proxies(stacked["time"], stacked["mass(fe)"], 
+		stacked["sfr"], stacked["z(fe)"], stacked["delay"], stacked["eta"], 
+		**kwargs)] 
+
+
+def _key(zone, times, overrides): 
+	sha = hashlib.sha1() 
+	for key in sorted(zone.history.keys()): 
+		sha.update(key.encode()) 
+		sha.update(np.asarray(zone.history[key], dtype = np.float64).tobytes()) 
+	mirror = vice.singlezone.from_output(zone) 
+	for attr in _ATTRIBUTES: 
+		value = getattr(mirror, attr, None) 
+		if not callable(value): sha.update(("%s=%r" % (attr, 
+			value)).encode()) 
+	for element in mirror.elements: 
+		for source in [vice.yields.ccsne, vice.yields.sneia]: 
+			value = source.settings[element] 
+			if callable(value): value = getattr(value, "__name__", "function") 
+			sha.update(("%s=%r" % (element, value)).encode()) 
+	sha.update(repr(sorted(overrides.items())).encode()) 
+	sha.update(times.tobytes()) 
+	return sha.hexdigest()[:16] 
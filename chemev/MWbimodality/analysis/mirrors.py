@@ -0,0 +1,119 @@
+r""" 
+Runs singlezone models mirroring the zones of multizone outputs (i.e. 
+``vice.singlezone.from_output``) across a pool of processes. Each model 
+runs in its own temporary directory, so that concurrent runs never overwrite 
+one another's output, and the directory is removed once its history has been 
+read back in. 
+""" 
+
+__all__ = ["run_mirrors"] 
+import multiprocessing 
+import numpy as np 
+import tempfile 
+import shutil 
+import time 
+import vice 
+import sys 
+import os 
+
+
+def run_mirrors(zones, times, overrides = None, keys = None, 
+	attributes = None, processes = None, verbose = False): 
+	r""" 
+	Run a singlezone model mirroring each of several zones. 
+
+	Parameters 
+	---------- 
+	zones : list 
+		The ``vice.output`` objects of each zone, or the names of their 
+		outputs. 
+	times : array-like 
+		The output times of the models. 
+	overrides : dict or list [default : None] 
+		Attributes to set on the models after mirroring the zones, either 
+		one dictionary for all of them or one per zone. Values must be 
+		picklable (e.g. a function defined at module level rather than a 
+		lambda). 
+	keys : list [default : None] 
+		The history columns to collect. None to collect all of them. 
+	attributes : list [default : None] 
+		The singlezone attributes of each model to collect (e.g. "delay", 
+		"eta"). 
+	processes : int [default : None] 
+		The number of processes to run the models in. None to use one per 
+		CPU. Models are run in this process if there is only one of them. 
+	verbose : bool [default : False] 
+		Whether to print the wall time of each model as it finishes. 
+
+	Returns 
+	------- 
+	runs : list 
+		A dictionary for each zone, in the same order, with the following 
+		keys: 
+
+		- "name" : The name of the mirrored zone's output. 
+		- "history" : A dictionary of the collected history columns as 
+		  numpy arrays. 
+		- "attributes" : A dictionary of the collected attributes. 
+		- "seconds" : The wall time of the model in seconds. 
+	""" 
+	times = np.asarray(times, dtype = np.float64) 
+	if overrides is None: overrides = {} 
+	if isinstance(overrides, dict): overrides = len(zones) * [overrides] 
+	if len(overrides) != len(zones): raise ValueError( 
+		"Need one set of overrides per zone. Got: %d != %d" % ( 
+			len(overrides), len(zones))) 
+	if attributes is None: attributes = [] 
+	tasks = [] 
+	for i in range(len(zones)): 
+		if isinstance(zones[i], str): 
+			name = zones[i] 
+		else: 
+			name = zones[i].name 
+		tasks.append((os.path.abspath(name), times, overrides[i], keys, 
+			attributes)) 
+	runs = [] 
+	if len(tasks) > 1 and processes != 1: 
+		pool = multiprocessing.Pool(processes = processes) 
+		try: 
+			for run in pool.imap(_run, tasks): 
+				if verbose: _report(run, len(runs), len(tasks)) 
+				runs.append(run) 
+		finally: 
+			pool.close() 
+			pool.join() 
+	else: 
+		for task in tasks: 
+			run = _run(task) 
+			if verbose: _report(run, len(runs), len(tasks)) 
+			runs.append(run) 
+	return runs 
+
+
+def _run(task): 
+	name, times, overrides, keys, attributes = task 
+	start = time.time() 
+	sz = vice.singlezone.from_output(name) 
+	for key in overrides.keys(): 
+		setattr(sz, key, overrides[key]) 
+	directory = tempfile.mkdtemp(prefix = "mirror") 
+	try: 
+		sz.name = "%s/mirror" % (directory) 
+		out = sz.run(times, overwrite = True, capture = True) 
+		if keys is None: keys = out.history.keys() 
+		history = dict([(key, np.array(out.history[key], dtype = np.float64)) 
+			for key in keys]) 
+	finally: 
+		shutil.rmtree(directory, ignore_errors = True) 
+	return { 
+		"name": 		name, 
+		"history": 		history, 
+		"attributes": 	dict([(i, getattr(sz, i)) for i in attributes]), 
+		"seconds": 		time.time() - start 
+	} 
+
+
+def _report(run, index, total): 
+	sys.stdout.write("[%d/%d] %s: %.2f s\n" % (index + 1, total, run["name"], 
+		run["seconds"])) 
+	sys.stdout.flush() 
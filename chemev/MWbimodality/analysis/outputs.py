@@ -0,0 +1,333 @@
+r""" 
+Lazy handles on multizone outputs which read in only the zones and star 
+particle columns a figure actually uses. Zones are read in on first access, 
+and star particle columns are decoded from the text file on demand, any 
+number of them in a single pass, with a binary copy of each cached within 
+the output that is memory-mapped on every later read. 
+""" 
+
+__all__ = ["lazy_output"] 
+from .geometry import disk_geometry 
+from utils import atomic_write 
+import numpy as np 
+import vice 
+import os 
+
+# The star particle files to look for, in order of preference 
+_STAR_FILES = ["stars.out", "tracers.out"] 
+
+# The directory within the output holding the binary copies of the columns 
+_COLUMN_CACHE = "star_columns" 
+
+
+class lazy_output(object): 
+
+	r""" 
+	A multizone output read in only as far as it is used. 
+
+	Parameters 
+	---------- 
+	name : str 
+		The name of the output, with or without the ".vice" extension. 
+	zones : array-like [default : None] 
+		The numbers of the zones to make available. None for all of them. 
+	stars : list [default : None] 
+		The star particle columns the figure needs, e.g. ["zone_final", 
+		"mass", "[o/fe]"]. They are decoded together the first time any 
+		star particle data is accessed. Other columns can still be accessed, 
+		at the cost of another pass through the file. 
+
+	Notes 
+	----- 
+	The attributes mirror those of ``vice.multioutput``, so this object can 
+	be passed to ``zheights``, ``star_query`` and 
+	``disk_geometry.from_output`` in its place. 
+
+	Example Code 
+	------------ 
+	>>> out = lazy_output("example", zones = range(12, 52), stars = [ 
+		"zone_origin", "zone_final", "mass", "formation_time", "z(o)", 
+		"z(fe)"]) 
+	>>> out.zones["zone12"].history["[o/h]"] # reads in only zone 12 
+	>>> out.stars["mass"] # decodes the six columns in one pass 
+	""" 
+
+	def __init__(self, name, zones = None, stars = None): 
+		if name.endswith(".vice"): name = name[:-5] 
+		if not os.path.exists("%s.vice" % (name)): raise IOError( 
+			"Output not found: %s" % (name)) 
+		self._name = name 
+		self._zones = lazy_zones(name, zones) 
+		self._stars = lazy_stars(name, stars) 
+
+	@property 
+	def name(self): 
+		r""" 
+		Type : str 
+
+		The name of the output, without the ".vice" extension. 
+		""" 
+		return self._name 
+
+	@property 
+	def zones(self): 
+		r""" 
+		Type : ``lazy_zones`` 
+
+		The ``vice.output`` object of each zone, keyed by "zone<number>" as 
+		in ``vice.multioutput``, each read in on first access. 
+		""" 
+		return self._zones 
+
+	@property 
+	def stars(self): 
+		r""" 
+		Type : ``lazy_stars`` 
+
+		The star particle data, decoded one column at a time on first 
+		access. 
+		""" 
+		return self._stars 
+
+	@property 
+	def tracers(self): 
+		r""" 
+		Type : ``lazy_stars`` 
+
+		An alias for ``stars``, for scripts written for older versions of 
+		VICE. 
+		""" 
+		return self._stars 
+
+	@property 
+	def geometry(self): 
+		r""" 
+		Type : ``disk_geometry`` 
+
+		The geometry of the zones, as in ``disk_geometry.from_output``. 
+		""" 
+		return disk_geometry.from_output(self._name) 
+
+
+class lazy_zones(object): 
+
+	r""" 
+	The zones of a multizone output, each read in on first access. 
+
+	Parameters 
+	---------- 
+	name : str 
+		The name of the output, without the ".vice" extension. 
+	zones : array-like [default : None] 
+		The numbers of the zones to make available. None for all of them. 
+	""" 
+
+	def __init__(self, name, zones = None): 
+		self._name = name 
+		if zones is None: 
+			# each zone is written to a directory "zone<number>.vice" 
+			zones = sorted([int(i[4:].split('.')[0]) for i in os.listdir( 
+				"%s.vice" % (name)) if i.startswith("zone") and 
+				i[4:].split('.')[0].isdigit()]) 
+		else: pass 
+		self._keys = ["zone%d" % (i) for i in zones] 
+		self._loaded = {} 
+
+	def __getitem__(self, key): 
+		if key not in self._keys: raise KeyError( 
+			"Zone not available: %s" % (key)) 
+		if key not in self._loaded: 
+			self._loaded[key] = vice.output("%s.vice/%s" % (self._name, key)) 
+		else: pass 
+		return self._loaded[key] 
+
+	def __contains__(self, key): 
+		return key in self._keys 
+
+	def __len__(self): 
+		return len(self._keys) 
+
+	def keys(self): 
+		r""" 
+		Returns the keys of the available zones. 
+		""" 
+		return list(self._keys) 
+
+
+class lazy_stars(object): 
+
+	r""" 
+	The star particle data of a multizone output, decoded on demand. 
+
+	Parameters 
+	---------- 
+	name : str 
+		The name of the output, without the ".vice" extension. 
+	columns : list [default : None] 
+		The columns to decode together on first access. 
+
+	Notes 
+	----- 
+	Columns are case-insensitive. Besides those in the file, "age", 
+	"[x/h]" and "[x/y]" are derived from the formation times and mass 
+	fractions. Columns assigned to this object (e.g. heights from a side 
+	file) are held in memory. 
+
+	The binary copy of each column is stored within the output directory 
+	and is rebuilt whenever the text file is newer than it. 
+	""" 
+
+	def __init__(self, name, columns = None): 
+		self._name = name 
+		self._filename = None 
+		for i in _STAR_FILES: 
+			if os.path.exists("%s.vice/%s" % (name, i)): 
+				self._filename = "%s.vice/%s" % (name, i) 
+				break 
+			else: continue 
+		self._labels = None 
+		self._pending = [] if columns is None else [i.lower() for i in columns] 
+		self._columns = {} 
+		self._assigned = {} 
+
+	def __getitem__(self, key): 
+		key = key.lower() 
+		if key in self._assigned: 
+			return self._assigned[key] 
+		elif key in self._columns: 
+			return self._columns[key] 
+		elif key in self.labels: 
+			self._load([key]) 
+			return self._columns[key] 
+		else: 
+			return _derived(self, key, lambda: _end_time(self._name)) 
+
+	def __setitem__(self, key, value): 
+		value = np.asarray(value) 
+		if len(value) != self.size[0]: raise ValueError( 
+			"Column must have one value per star particle. Got: %d != %d" % ( 
+				len(value), self.size[0])) 
+		self._assigned[key.lower()] = value 
+
+	def keys(self): 
+		r""" 
+		Returns the labels of the columns in the file and those assigned. 
+		""" 
+		return self.labels + [i for i in self._assigned.keys() if i not in 
+			self.labels] 
+
+	def select(self, columns): 
+		r""" 
+		Declare columns to decode together on the next access. 
+
+		Parameters 
+		---------- 
+		columns : list 
+			The labels of the columns, case-insensitive. 
+		""" 
+		self._pending += [i.lower() for i in columns] 
+
+	@property 
+	def size(self): 
+		r""" 
+		Type : tuple 
+
+		The number of star particles and the number of columns, as in 
+		``vice.dataframe.size``. 
+		""" 
+		return (len(self[self.labels[0]]), len(self.keys())) 
+
+	@property 
+	def labels(self): 
+		r""" 
+		Type : list 
+
+		The labels of the columns in the file, lower-case, read from its 
+		header. 
+		""" 
+		if self._labels is None: 
+			if self._filename is None: raise IOError( 
+				"No star particle data found for output: %s" % (self._name)) 
+			self._labels = _header(self._filename) 
+		else: pass 
+		return self._labels 
+
+	def _load(self, keys): 
+		# decode the requested columns along with any declared ones which 
+		# refer to columns in the file and have not been read in yet 
+		keys = [i for i in _sources(keys + self._pending) if i in self.labels and 
+			i not in self._columns] 
+		keys = list(dict.fromkeys(keys)) 
+		self._pending = [] 
+		directory = "%s.vice/%s" % (self._name, _COLUMN_CACHE) 
+		stale = [] 
+		for key in keys: 
+			cache = "%s/%s.npy" % (directory, key) 
+			if os.path.exists(cache) and (os.path.getmtime(cache) >= 
+				os.path.getmtime(self._filename)): 
+				self._columns[key] = np.load(cache, mmap_mode = 'r') 
+			else: 
+				stale.append(key) 
+		if len(stale): 
+			raw = np.loadtxt(self._filename, comments = '#', ndmin = 2, 
+				usecols = [self.labels.index(i) for i in stale]) 
+			os.makedirs(directory, exist_ok = True) 
+			for i in range(len(stale)): 
+				cache = "%s/%s.npy" % (directory, stale[i]) 
+				with atomic_write(cache, 'wb') as out: 
+					np.save(out, np.ascontiguousarray(raw[:, i])) 
+				self._columns[stale[i]] = np.load(cache, mmap_mode = 'r') 
+		else: pass 
+
+
+def _derived(stars, key, end_time): 
+	# "age", "[x/h]" and "[x/y]" from the formation times and mass fractions, 
+	# with end_time a function returning the time of the final output 
+	if key == "age": 
+		return end_time() - stars["formation_time"] 
+	elif key.startswith('[') and key.endswith(']') and '/' in key: 
+		x, y = key[1:-1].split('/') 
+		if y == 'h': 
+			with np.errstate(divide = "ignore", invalid = "ignore"): 
+				return np.log10(stars["z(%s)" % (x)] / vice.solar_z[x]) 
+		else: 
+			return stars["[%s/h]" % (x)] - stars["[%s/h]" % (y)] 
+	else: 
+		raise KeyError("Unrecognized star particle column: %s" % (key)) 
+
+
+def _end_time(name): 
+	# the time of the final output of a multizone output, i.e. the present day 
+	history = "%s.vice/zone0.vice/history.out" % (name) 
+	return float(np.loadtxt(history, comments = '#', ndmin = 2, 
+		usecols = [0])[-1, 0]) 
+
+
+def _sources(keys): 
+	# the columns in the file which derived columns are computed from 
+	sources = [] 
+	for key in keys: 
+		if key == "age": 
+			sources.append("formation_time") 
+		elif key.startswith('[') and key.endswith(']') and '/' in key: 
+			sources += ["z(%s)" % (i) for i in key[1:-1].split('/') if i != 'h'] 
+		else: 
+			sources.append(key) 
+	return sources 
+
+
+def _header(filename): 
+	# the column labels from the "#	<number>: <Label> [unit]" lines at the 
+	# top of a VICE output file 
+	labels = [] 
+	with open(filename, 'r') as f: 
+		for line in f: 
+			if not line.startswith('#'): break 
+			line = line[1:].strip() 
+			if ':' in line and line.split(':')[0].strip().isdigit(): 
+				label = line.split(':', 1)[1].strip() 
+				labels.append(label.split(' [')[0].strip().lower()) 
+			else: pass 
+	if not len(labels): raise IOError( 
+		"No column labels in the header of: %s" % (filename)) 
+	return labels 
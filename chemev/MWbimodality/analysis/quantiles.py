@@ -0,0 +1,116 @@
+r""" 
+Weighted quantiles of star particle data. Values are sorted once per call, 
+and any number of quantiles are found for every bin at once from the 
+normalized cumulative weights with a single ``numpy.searchsorted``. 
+""" 
+
+__all__ = ["weighted_quantiles", "binned_weighted_quantiles"] 
+import numpy as np 
+
+
+def weighted_quantiles(values, weights, quantiles): 
+	r""" 
+	Calculate weighted quantiles of a sample. 
+
+	Parameters 
+	---------- 
+	values : array-like 
+		The sample. 
+	weights : array-like 
+		The weight of each element of the sample. 
+	quantiles : real number or array-like 
+		The quantiles to calculate, each between 0 and 1 (e.g. 0.5 for the 
+		median). 
+
+	Returns 
+	------- 
+	q : float or numpy.ndarray 
+		The smallest value at which the normalized cumulative weight exceeds 
+		each quantile. NaN if the weights sum to zero. 
+	""" 
+	values = np.asarray(values, dtype = np.float64) 
+	result = binned_weighted_quantiles(values, weights, 
+		np.zeros(len(values)), [0, 1], quantiles)[0] 
+	if np.ndim(quantiles): 
+		return result 
+	else: 
+		return float(result) 
+
+
+def binned_weighted_quantiles(values, weights, x, bins, quantiles, 
+	minimum = 1): 
+	r""" 
+	Calculate weighted quantiles of a sample within each bin of another 
+	quantity. 
+
+	Parameters 
+	---------- 
+	values : array-like 
+		The sample, e.g. the ages of star particles. 
+	weights : array-like 
+		The weight of each element of the sample, e.g. their remaining 
+		masses. 
+	x : array-like 
+		The quantity to bin the sample in, e.g. their [Fe/H]. 
+	bins : array-like 
+		The bin edges in x, in increasing order. Each bin includes its lower 
+		edge but not its upper edge. 
+	quantiles : real number or array-like 
+		The quantiles to calculate, each between 0 and 1. 
+	minimum : int [default : 1] 
+		The minimum number of elements of the sample a bin must have for its 
+		quantiles to be calculated. 
+
+	Returns 
+	------- 
+	q : numpy.ndarray 
+		The smallest value in each bin at which the normalized cumulative 
+		weight exceeds each quantile, with shape (len(bins) - 1, 
+		len(quantiles)), or (len(bins) - 1,) if quantiles is a single value. 
+		NaN for bins with fewer than ``minimum`` elements or no weight. 
+	""" 
+	values = np.asarray(values, dtype = np.float64) 
+	weights = np.asarray(weights, dtype = np.float64) 
+	x = np.asarray(x, dtype = np.float64) 
+	bins = np.asarray(bins, dtype = np.float64) 
+	q = np.atleast_1d(np.asarray(quantiles, dtype = np.float64)) 
+	if not (len(values) == len(weights) == len(x)): raise ValueError( 
+		"Values, weights, and x must have the same length. Got: %d, %d, %d" % ( 
+			len(values), len(weights), len(x))) 
+	if np.any(q < 0) or np.any(q > 1): raise ValueError( 
+		"Quantiles must be between 0 and 1. Got: %s" % (str(quantiles))) 
+	n_bins = len(bins) - 1 
+	group = np.searchsorted(bins, x, side = "right") - 1 
+	keep = (group >= 0) & (group < n_bins) & ~np.isnan(values) 
+	values = values[keep] 
+	weights = weights[keep] 
+	group = group[keep] 
+
+	# sort by bin, then by value within each bin 
+	order = np.lexsort((values, group)) 
+	values = values[order] 
+	weights = weights[order] 
+	group = group[order] 
+	counts = np.bincount(group, minlength = n_bins) 
+	totals = np.bincount(group, weights = weights, minlength = n_bins) 
+	starts = np.concatenate(([0], np.cumsum(counts)[:-1])) 
+	cumulative = np.cumsum(weights) 
+	offsets = np.concatenate(([0.], cumulative))[starts] 
+	with np.errstate(divide = "ignore", invalid = "ignore"): 
+		fraction = (cumulative - offsets[group]) / totals[group] 
+	# bins with no weight are reported as NaN below, but must stay sorted 
+	fraction[totals[group] <= 0] = 0 
+
+	# bin index plus normalized cumulative weight is sorted across all bins, 
+	# so every quantile of every bin is found with one search 
+	key = group + np.minimum(fraction, 1) 
+	targets = np.arange(n_bins)[:, None] + q[None, :] 
+	idx = np.searchsorted(key, targets, side = "right") 
+	idx = np.minimum(idx, starts[:, None] + counts[:, None] - 1) 
+	result = np.full((n_bins, len(q)), np.nan) 
+	valid = (counts >= max(minimum, 1)) & (totals > 0) 
+	result[valid] = values[idx[valid]] 
+	if np.ndim(quantiles): 
+		return result 
+	else: 
+		return result[:, 0] 
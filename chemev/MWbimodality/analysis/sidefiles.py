@@ -0,0 +1,174 @@
+r""" 
+Reads the extra tracer particle data files written alongside multizone 
+simulation outputs (``<name>_extra_tracer_data.out`` and 
+``<name>_analogdata.out``). Text files are parsed once and a binary copy is 
+cached next to them, which is memory-mapped on every later read. 
+""" 
+
+__all__ = ["sidefile", "zheights"] 
+from utils import atomic_write 
+import numpy as np 
+import warnings 
+import os 
+
+# The side files to look for, in order of preference 
+_SUFFIXES = ["_analogdata.out", "_extra_tracer_data.npy", 
+	"_extra_tracer_data.out"] 
+
+
+class sidefile(object): 
+
+	r""" 
+	A side file of extra tracer particle data. 
+
+	Parameters 
+	---------- 
+	filename : str 
+		The name of the file. Either a whitespace-delimited text file or a 
+		``.npy`` file as written by ``writer.tracer_writer``. 
+
+	Notes 
+	----- 
+	The binary copy of a text file is stored next to it with the extension 
+	".npy" appended, and is rebuilt whenever the text file is newer than it. 
+	""" 
+
+	def __init__(self, filename): 
+		if not os.path.exists(filename): raise IOError( 
+			"File not found: %s" % (filename)) 
+		self._filename = filename 
+		self._data = None 
+
+	def __getitem__(self, key): 
+		r""" 
+		Get a column as a read-only view. 
+
+		Parameters 
+		---------- 
+		key : int or str 
+			The index of the column (negative values index from the end) or, 
+			for ``.npy`` files written by ``writer.tracer_writer``, its name. 
+		""" 
+		data = self.data 
+		if data.dtype.names is not None: 
+			if isinstance(key, str): 
+				return data[key] 
+			else: 
+				return data[data.dtype.names[key]] 
+		elif isinstance(key, str): 
+			raise KeyError("Text side files have no column names: %s" % ( 
+				key)) 
+		else: 
+			return data[:, key] 
+
+	def __len__(self): 
+		return len(self.data) 
+
+	@property 
+	def filename(self): 
+		r""" 
+		Type : str 
+
+		The name of the side file. 
+		""" 
+		return self._filename 
+
+	@property 
+	def data(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The contents of the side file: a 2-D array for text files, a 1-D 
+		structured array for binary files. Memory-mapped. 
+		""" 
+		if self._data is None: 
+			if self._filename.endswith(".npy"): 
+				self._data = np.load(self._filename, mmap_mode = 'r') 
+			else: 
+				cache = "%s.npy" % (self._filename) 
+				if (not os.path.exists(cache) or os.path.getmtime(cache) < 
+					os.path.getmtime(self._filename)): 
+					# at least 2-D, such that a file of a single row is 
+					# still read in as one row 
+					with warnings.catch_warnings(): 
+						warnings.simplefilter("ignore", UserWarning) 
+						raw = np.loadtxt(self._filename, ndmin = 2) 
+					if not raw.size: raise IOError( 
+						"Side file contains no data: %s" % (self._filename)) 
+					with atomic_write(cache, 'wb') as out: 
+						np.save(out, raw) 
+				else: pass 
+				self._data = np.load(cache, mmap_mode = 'r') 
+		else: pass 
+		return self._data 
+
+	def aligned(self, output, key = -1): 
+		r""" 
+		Get a column of this side file aligned with the star particles of a 
+		multizone output. 
+
+		Parameters 
+		---------- 
+		output : ``vice.output`` or ``vice.multioutput`` 
+			The output whose star particles this side file describes. 
+		key : int or str [default : -1] 
+			The column to take. 
+
+		Returns 
+		------- 
+		column : numpy.ndarray 
+			The first ``output.stars.size[0]`` rows of the column. 
+
+		Raises 
+		------ 
+		ValueError 
+			- The side file has fewer rows than the output has star particles. 
+			- The zones of origin in the first column of the side file do not 
+			  match those of the star particles. 
+		""" 
+		n = output.stars.size[0] 
+		if len(self) < n: raise ValueError( 
+			"Side file has fewer rows than the output has star particles: %d < %d (%s)" % ( 
+				len(self), n, self._filename)) 
+		origin = np.asarray(output.stars["zone_origin"], dtype = np.float64) 
+		mismatch = np.flatnonzero(self[0][:n] != origin) 
+		if len(mismatch): raise ValueError( 
+			"Side file is misaligned with the star particles at row %d (%s)" % ( 
+				mismatch[0], self._filename)) 
+		return self[key][:n] 
+
+
+def zheights(name, output = None): 
+	r""" 
+	Get the final heights above or below the disk midplane of the star 
+	particles of a multizone output. 
+
+	Parameters 
+	---------- 
+	name : str 
+		The name of the multizone output, without the ".vice" extension. 
+	output : ``vice.output`` or ``vice.multioutput`` [default : None] 
+		The output itself. If provided, the heights are truncated to and 
+		validated against its star particles. 
+
+	Returns 
+	------- 
+	z : numpy.ndarray 
+		The height of each star particle in kpc, taken from the last column 
+		of the side file. 
+
+	Notes 
+	----- 
+	The side files are searched for in the following order: 
+	"<name>_analogdata.out", "<name>_extra_tracer_data.npy", and 
+	"<name>_extra_tracer_data.out". 
+	""" 
+	for suffix in _SUFFIXES: 
+		if os.path.exists("%s%s" % (name, suffix)): 
+			data = sidefile("%s%s" % (name, suffix)) 
+			if output is None: 
+				return data[-1] 
+			else: 
+				return data.aligned(output) 
+		else: continue 
+	raise IOError("No extra tracer data found for output: %s" % (name)) 
@@ -0,0 +1,183 @@
+r""" 
+A columnar query layer over the star particles of a multizone output. The 
+star particle data are read into numpy arrays once, and selections are 
+composed lazily and evaluated as a single boolean mask over the parent set 
+rather than as a chain of ``vice.dataframe.filter`` calls, each of which 
+copies every column. 
+""" 
+
+__all__ = ["star_query"] 
+from utils import RELATIONS 
+import numpy as np 
+import operator 
+
+
+class star_query(object): 
+
+	r""" 
+	A lazily evaluated selection of star particles. 
+
+	Parameters 
+	---------- 
+	stars : ``vice.dataframe`` or dict 
+		The star particle data, e.g. ``vice.output.stars``. Columns are read 
+		in from it on first access, case-insensitive. 
+
+	Notes 
+	----- 
+	Selections are made with ``where`` and ``filter``, which return a new 
+	query sharing this one's columns. No columns are read and no mask is 
+	computed until the data are accessed, at which point every predicate is 
+	evaluated together as one boolean mask over the parent set. Queries built 
+	from the same parent can therefore be taken for each panel of a figure 
+	without reading in the star particle data more than once. 
+
+	Example Code 
+	------------ 
+	>>> q = star_query(vice.output("example").stars) 
+	>>> disk = q.where(zone_final = (70, 89), zfinal = (-0.5, 0.5), 
+		mass = (1, None)) 
+	>>> disk["age"] 
+	""" 
+
+	def __init__(self, stars): 
+		self._source = stars 
+		self._columns = {} 
+		self._parent = None 
+		self._predicates = [] 
+		self._mask = None 
+		self._selected = {} 
+
+	def __getitem__(self, key): 
+		key = key.lower() 
+		if self._parent is None and not self._predicates: 
+			return self._column(key) 
+		elif key not in self._selected: 
+			self._selected[key] = self._column(key)[self.mask] 
+		else: pass 
+		return self._selected[key] 
+
+	def __len__(self): 
+		if self._parent is None and not self._predicates: 
+			return len(self._column(self.keys()[0])) 
+		else: 
+			return int(np.count_nonzero(self.mask)) 
+
+	def keys(self): 
+		r""" 
+		Returns the labels of the columns of the star particle data. 
+		""" 
+		return [i.lower() for i in self._root._source.keys()] 
+
+	@property 
+	def mask(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The boolean mask over the rows of the original star particle data 
+		selecting the stars in this query. 
+		""" 
+		if self._mask is None: 
+			if self._parent is None: 
+				mask = np.ones(len(self._root), dtype = bool) 
+			else: 
+				mask = self._parent.mask.copy() 
+			for key, test, value in self._predicates: 
+				mask &= test(self._column(key), value) 
+			self._mask = mask 
+		else: pass 
+		return self._mask 
+
+	@property 
+	def indices(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The indices of the stars in this query within the original star 
+		particle data. 
+		""" 
+		return np.flatnonzero(self.mask) 
+
+	def where(self, **ranges): 
+		r""" 
+		Select the stars whose values fall within given ranges. 
+
+		Parameters 
+		---------- 
+		ranges : keyword arguments 
+			The column labels and the ranges to select on. Each range is 
+			either a (lower, upper) tuple, inclusive on both ends with None 
+			denoting no bound, or a single value to test for equality. 
+			Columns whose labels are not valid python identifiers (e.g. 
+			"[fe/h]") can be passed by unpacking a dictionary. 
+
+		Returns 
+		------- 
+		subset : star_query 
+			The stars in this query within all of the ranges. 
+
+		Example Code 
+		------------ 
+		>>> q.where(zone_final = (70, 89), mass = (1, None)) 
+		>>> q.where(**{"[fe/h]": (-0.2, 0.)}) 
+		""" 
+		predicates = [] 
+		for key in ranges.keys(): 
+			if isinstance(ranges[key], (tuple, list)): 
+				if len(ranges[key]) != 2: raise ValueError( 
+					"Range must be a (lower, upper) pair. Got: %s" % ( 
+						str(ranges[key]))) 
+				if ranges[key][0] is not None: predicates.append( 
+					(key.lower(), operator.ge, ranges[key][0])) 
+				if ranges[key][1] is not None: predicates.append( 
+					(key.lower(), operator.le, ranges[key][1])) 
+			else: 
+				predicates.append((key.lower(), operator.eq, ranges[key])) 
+		return self._derive(predicates) 
+
+	def filter(self, key, relation, value): 
+		r""" 
+		Select the stars satisfying a given relation, in the same manner as 
+		``vice.dataframe.filter``. 
+
+		Parameters 
+		---------- 
+		key : str 
+			The label of the column to filter on. 
+		relation : str 
+			One of "<", "<=", "=", "==", "!=", ">=", or ">". 
+		value : real number 
+			The value to compare the column to. 
+
+		Returns 
+		------- 
+		subset : star_query 
+			The stars in this query satisfying the relation. 
+		""" 
+		if relation not in RELATIONS: raise ValueError( 
+			"Unrecognized relation: %s" % (relation)) 
+		return self._derive([(key.lower(), RELATIONS[relation], value)]) 
+
+	@property 
+	def _root(self): 
+		if self._parent is None: 
+			return self 
+		else: 
+			return self._parent._root 
+
+	def _column(self, key): 
+		root = self._root 
+		if key not in root._columns: 
+			root._columns[key] = np.asarray(root._source[key]) 
+		else: pass 
+		return root._columns[key] 
+
+	def _derive(self, predicates): 
+		subset = star_query.__new__(star_query) 
+		subset._source = None 
+		subset._columns = None 
+		subset._parent = self 
+		subset._predicates = predicates 
+		subset._mask = None 
+		subset._selected = {} 
+		return subset 
@@ -0,0 +1,196 @@
+r""" 
+A binary columnar store for whitespace-delimited data files. The text file is 
+parsed once and each column is stored as its own ``.npy`` file, which is 
+memory-mapped on first access rather than read in at import time. 
+""" 
+
+__all__ = ["columnar_file", "columnar_subset"] 
+from utils import atomic_write, RELATIONS 
+import numpy as np 
+import os 
+
+
+class columnar_file(object): 
+
+	r""" 
+	A lazily-loaded, memory-mapped columnar copy of a text data file. 
+
+	Parameters 
+	---------- 
+	filename : str 
+		The name of the whitespace-delimited text file. 
+	columns : list 
+		The indices of the columns in the text file to store. 
+	labels : list 
+		The name to give each column, in the same order as ``columns``. 
+
+	Notes 
+	----- 
+	The binary copy is stored in a directory next to the text file with the 
+	same name and the extension ".columns", one ``.npy`` file per column. It 
+	is rebuilt automatically whenever the text file is newer than the copy. 
+	Columns are accessed like those of a ``vice.dataframe``, case-insensitive, 
+	and are returned as read-only ``numpy.ndarray`` views of the copy. 
+	""" 
+
+	def __init__(self, filename, columns, labels): 
+		if len(columns) != len(labels): raise ValueError( 
+			"Number of columns does not match number of labels: %d != %d" % ( 
+				len(columns), len(labels))) 
+		self._filename = filename 
+		self._columns = list(columns) 
+		self._labels = [i.lower() for i in labels] 
+		self._loaded = {} 
+
+	def __getitem__(self, key): 
+		key = key.lower() 
+		if key not in self._labels: raise KeyError( 
+			"Unrecognized column: %s" % (key)) 
+		if key not in self._loaded: 
+			if self._stale(): self._convert() 
+			self._loaded[key] = np.load(self._column_file(key), mmap_mode = 'r') 
+		else: pass 
+		return self._loaded[key] 
+
+	def keys(self): 
+		r""" 
+		Returns the labels of the columns in the store. 
+		""" 
+		return self._labels[:] 
+
+	@property 
+	def filename(self): 
+		r""" 
+		Type : str 
+
+		The name of the text file this store is a copy of. 
+		""" 
+		return self._filename 
+
+	def filter(self, key, relation, value): 
+		r""" 
+		Select the rows satisfying a given relation, in the same manner as 
+		``vice.dataframe.filter``. 
+
+		Parameters 
+		---------- 
+		key : str 
+			The label of the column to filter on. 
+		relation : str 
+			One of "<", "<=", "=", "==", "!=", ">=", or ">". 
+		value : real number 
+			The value to compare the column to. 
+
+		Returns 
+		------- 
+		subset : columnar_subset 
+			The rows of this store satisfying the relation. 
+		""" 
+		test = RELATIONS[relation] 
+		return self.subset(lambda cols: test(cols[key], value)) 
+
+	def subset(self, selection): 
+		r""" 
+		Select the rows of this store given by a boolean mask. 
+
+		Parameters 
+		---------- 
+		selection : callable 
+			Accepts this store as its only argument and returns a boolean 
+			mask over its rows. Evaluated on first access to the subset, such 
+			that no columns are read until they're needed. 
+
+		Returns 
+		------- 
+		subset : columnar_subset 
+			The selected rows. 
+		""" 
+		return columnar_subset(self, selection) 
+
+	def _column_file(self, key): 
+		return "%s.columns/%s.npy" % (os.path.splitext(self._filename)[0], key) 
+
+	def _stale(self): 
+		source = os.path.getmtime(self._filename) 
+		for i in self._labels: 
+			if not os.path.exists(self._column_file(i)): return True 
+			if os.path.getmtime(self._column_file(i)) < source: return True 
+		return False 
+
+	def _convert(self): 
+		raw = np.genfromtxt(self._filename, usecols = self._columns) 
+		raw = raw.reshape(-1, len(self._columns)) 
+		os.makedirs(os.path.dirname(self._column_file(self._labels[0])), 
+			exist_ok = True) 
+		for i in range(len(self._labels)): 
+			with atomic_write(self._column_file(self._labels[i]), 'wb') as out: 
+				np.save(out, np.ascontiguousarray(raw[:, i])) 
+
+
+class columnar_subset(object): 
+
+	r""" 
+	A subset of the rows of a ``columnar_file`` selected by a boolean mask. 
+
+	Parameters 
+	---------- 
+	parent : columnar_file 
+		The store to select rows from. 
+	selection : callable 
+		Accepts the parent store and returns a boolean mask over its rows. 
+		Evaluated lazily on first access. 
+	""" 
+
+	def __init__(self, parent, selection): 
+		self._parent = parent 
+		self._selection = selection 
+		self._mask = None 
+		self._loaded = {} 
+
+	def __getitem__(self, key): 
+		key = key.lower() 
+		if key not in self._loaded: 
+			self._loaded[key] = self._parent[key][self.mask] 
+		else: pass 
+		return self._loaded[key] 
+
+	def keys(self): 
+		r""" 
+		Returns the labels of the columns in the store. 
+		""" 
+		return self._parent.keys() 
+
+	@property 
+	def mask(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The boolean mask over the rows of the parent store. 
+		""" 
+		if self._mask is None: 
+			self._mask = np.asarray(self._selection(self._parent), dtype = bool) 
+		else: pass 
+		return self._mask 
+
+	def filter(self, key, relation, value): 
+		r""" 
+		Select the rows of this subset satisfying a given relation, in the 
+		same manner as ``vice.dataframe.filter``. 
+
+		Parameters 
+		---------- 
+		key : str 
+			The label of the column to filter on. 
+		relation : str 
+			One of "<", "<=", "=", "==", "!=", ">=", or ">". 
+		value : real number 
+			The value to compare the column to. 
+
+		Returns 
+		------- 
+		subset : columnar_subset 
+			The rows of this subset satisfying the relation. 
+		""" 
+		test = RELATIONS[relation] 
+		return columnar_subset(self._parent, 
+			lambda cols: self.mask & test(cols[key], value)) 
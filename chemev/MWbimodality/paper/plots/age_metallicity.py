@@ -7,6 +7,10 @@ from astropy.io import fits
 import numpy as np 
 import vice 
 import sys 
+import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+import analysis 
 
 OUTPUTSDIR = "/Users/astrobeard/Work/Research/VICErepos/VICE/migration/outputs" 
 STATIC = "%s/high-resolution/2Gyr/diffusion/static" % (OUTPUTSDIR)
@@ -17,9 +21,8 @@ OUTERBURST = "%s/high-resolution/2Gyr/diffusion/outerburst" % (OUTPUTSDIR)
 # LATEBURST = "../../simulations/paper_withburst" 
 STEM = "age_metallicity" 
 CMAP = "winter" 
-ZONE_WIDTH = 0.1 
-ZONE_MIN = int(7 / ZONE_WIDTH) 
-ZONE_MAX = int((9 - ZONE_WIDTH) / ZONE_WIDTH) 
+ZONE_WIDTH = 0.1 # for outputs which do not record their zone geometry 
+RGAL = [7, 9] # the range in final galactocentric radius in kpc 
 LOGAGE = True 
 
 
@@ -63,62 +66,28 @@ def setup_axes():
 	return axes 
 
 
-def plot_amr(ax, element, output): 
-	cmap = plt.get_cmap(CMAP) 
-	stars = output.stars.filter("zone_final", ">=", ZONE_MIN) 
-	stars = stars.filter("zone_final", "<=", ZONE_MAX) 
-	stars = stars.filter("zfinal", ">=", -0.5) 
-	stars = stars.filter("zfinal", "<=", 0.5) 
-	stars = stars.filter("mass", ">=", 1.) 
-	colors = [ZONE_WIDTH * (i + 0.5) for i in stars["zone_origin"]] 
-	return ax.scatter(stars["age"], stars["[%s/H]" % (element)], c = colors, 
-		s = 0.1, cmap = cmap, vmin = 0, vmax = 15) 
-
-
-def zheights(name): 
-	raw = np.genfromtxt("%s_analogdata.out" % (name)) 
-	return [row[-1] for row in raw] 
+def disk_stars(output): 
+	geometry = analysis.disk_geometry.from_output(output, 
+		zone_width = ZONE_WIDTH) 
+	output.stars["rgal_origin"] = geometry.radius(output.stars["zone_origin"]) 
+	return analysis.star_query(output.stars).where( 
+		zone_final = (geometry.zone(RGAL[0]), geometry.zone(RGAL[1]) - 1), 
+		zfinal = (-0.5, 0.5), mass = (1, None)) 
 
 
-def weighted_median(values, weights, stop = 0.5): 
-	indeces = np.argsort(values) 
-	values = [values[i] for i in indeces] 
-	weights = [weights[i] for i in indeces] 
-	weights = [i / sum(weights) for i in weights] 
-	s = 0 
-	for i in range(len(weights)): 
-		s += weights[i] 
-		if s > stop: 
-			idx = i - 1 
-			break 
-	return values[idx] 
+def plot_amr(ax, element, stars): 
+	cmap = plt.get_cmap(CMAP) 
+	return ax.scatter(stars["age"], stars["[%s/H]" % (element)], 
+		c = stars["rgal_origin"], 
+		s = 0.1, cmap = cmap, vmin = 0, vmax = 15) 
 
 
-def median_ages(ax, element, output, label = False): 
-	stars = output.stars.filter("zone_final", ">=", ZONE_MIN) 
-	stars = stars.filter("zone_final", "<=", ZONE_MAX) 
-	stars = stars.filter("zfinal", ">=", -0.5) 
-	stars = stars.filter("zfinal", "<=", 0.5) 
-	stars = stars.filter("mass", ">=", 1.) 
+def median_ages(ax, element, stars, label = False): 
 	bins = np.arange(-1., 1.05, 0.05) 
-	ages = (len(bins) - 1) * [0.] 
-	lowers = (len(bins) - 1) * [0.] 
-	uppers = (len(bins) - 1) * [0.] 
-	for i in range(len(ages)): 
-		stars_ = stars.filter("[%s/h]" % (element), ">=", bins[i]) 
-		stars_ = stars_.filter("[%s/h]" % (element), "<=", bins[i + 1]) 
-		if len(stars_["age"]) > 20: 
-			masses = list(map(lambda x, y: x * (1 - 
-				vice.cumulative_return_fraction(y)), 
-			stars_["mass"], stars_["age"])) 
-			ages[i] = weighted_median(stars_["age"], masses) 
-			# ages[i] = np.mean(stars_["age"]) 
-			lowers[i] = weighted_median(stars_["age"], masses, stop = 0.16) 
-			uppers[i] = weighted_median(stars_["age"], masses, stop = 0.84) 
-		else: 
-			ages[i] = float("nan") 
-			lowers[i] = float("nan") 
-			uppers[i] = float("nan") 
+	masses = analysis.remaining_mass(stars["mass"], stars["age"]) 
+	lowers, ages, uppers = analysis.binned_weighted_quantiles(stars["age"], 
+		masses, stars["[%s/h]" % (element)], bins, [0.16, 0.5, 0.84], 
+		minimum = 21).T 
 	# ax.scatter(ages, list(map(lambda x, y: (x + y) / 2., bins[1:], bins[:-1])), 
 	# 	marker = plots.mpltoolkit.markers()["star"], 
 	# 	c = plots.mpltoolkit.named_colors()["black"], s = 100) 
@@ -209,16 +178,16 @@ if __name__ == "__main__":
 	insideout = vice.output(INSIDEOUT) 
 	lateburst = vice.output(LATEBURST) 
 	outerburst = vice.output(OUTERBURST) 
-	static.stars["zfinal"] = zheights(STATIC)[:static.stars.size[0]] 
-	insideout.stars["zfinal"] = zheights(INSIDEOUT)[:insideout.stars.size[0]] 
-	lateburst.stars["zfinal"] = zheights(LATEBURST)[:lateburst.stars.size[0]] 
-	outerburst.stars["zfinal"] = zheights(OUTERBURST)[:outerburst.stars.size[0]] 
+	static.stars["zfinal"] = analysis.zheights(STATIC, static) 
+	insideout.stars["zfinal"] = analysis.zheights(INSIDEOUT, insideout) 
+	lateburst.stars["zfinal"] = analysis.zheights(LATEBURST, lateburst) 
+	outerburst.stars["zfinal"] = analysis.zheights(OUTERBURST, 
+		outerburst) 
+	disks = [disk_stars(i) for i in [static, insideout, lateburst, outerburst]] 
 	for i in range(2): 
 		for j in range(4): 
-			sc = plot_amr(axes[i][j], ["O", "Fe"][i], 
-				[static, insideout, lateburst, outerburst][j]) 
-			median_ages(axes[i][j], ["O", "Fe"][i], 
-				[static, insideout, lateburst, outerburst][j], 
+			sc = plot_amr(axes[i][j], ["O", "Fe"][i], disks[j]) 
+			median_ages(axes[i][j], ["O", "Fe"][i], disks[j], 
 				label = i == 1 and j == 0) 
 			feuillet2019_data(axes[i][j], ["O", "Fe"][i], 
 				label = i == 1 and j == 0) 
@@ -12,6 +12,11 @@ vice.yields.sneia.settings['fe'] *= 10**0.1
 import sys 
 sys.path.append("/Users/astrobeard/Work/Research/VICErepos/VICE/migration") 
 import src 
+import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+import analysis 
+from analysis import iarate 
 
 OUTPUTSDIR = "/Users/astrobeard/Work/Research/VICErepos/VICE/migration/outputs" 
 FULL = "%s/high-resolution/2Gyr/diffusion/insideout" % (OUTPUTSDIR) 
@@ -19,10 +24,9 @@ SIMPLE = "%s/high-resolution/2Gyr/post-process/insideout" % (OUTPUTSDIR)
 STEM = "yar_insideout_highres" 
 # FULL = "../../simulations/paper_noburst" 
 # SIMPLE = "../../simulations/paper_noburst_simple"  
-ZONE_WIDTH = 0.1 
+ZONE_WIDTH = 0.1 # for outputs which do not record their zone geometry 
 CMAP = "jet" 
-ZONE_MIN = int(7 / ZONE_WIDTH) 
-ZONE_MAX = int((9 - ZONE_WIDTH) / ZONE_WIDTH) 
+RGAL = [7, 9] # the range in final galactocentric radius in kpc 
 
 # cm1 = colors.LinearSegmentedColormap.from_list("MyCmap", ["r", "b"]) 
 # cnorm = colors.Normalize(vmin = 0, vmax = 15) 
@@ -73,12 +77,12 @@ def setup_axes():
 
 def plot_relation(ax, output): 
 	cmap = plt.get_cmap(CMAP) 
-	stars = output.stars.filter("zone_final", ">=", ZONE_MIN) 
-	stars = stars.filter("zone_final", "<=", ZONE_MAX) 
-	stars = stars.filter("zfinal", ">=", -3.) 
-	stars = stars.filter("zfinal", "<=", 3.) 
-	stars = stars.filter("mass", ">=", 1.) 
-	colors = [ZONE_WIDTH * (i + 0.5) for i in stars["zone_origin"]] 
+	geometry = analysis.disk_geometry.from_output(output, 
+		zone_width = ZONE_WIDTH) 
+	stars = analysis.star_query(output.stars).where( 
+		zone_final = (geometry.zone(RGAL[0]), geometry.zone(RGAL[1]) - 1), 
+		zfinal = (-3, 3), mass = (1, None)) 
+	colors = geometry.radius(stars["zone_origin"]) 
 	# colors = [cpick.to_rgba(ZONE_WIDTH * (i + 0.5)) 
 		# for i in stars["zone_origin"]]
 	return ax.scatter(stars["age"], stars["[O/Fe]"], c = colors, s = 0.1, 
@@ -86,14 +90,6 @@ def plot_relation(ax, output):
 		# vmin = 0, vmax = 15)  
 
 
-def zheights(name): 
-	if "VICE" in name: 
-		raw = np.genfromtxt("%s_analogdata.out" % (name)) 
-	else: 
-		raw = np.genfromtxt("%s_extra_tracer_data.out" % (name)) 
-	return [row[-1] for row in raw] 
-
-
 def feuillet2018_data(ax): 
 	raw = np.genfromtxt("age_alpha.dat") 
 	ofe = len(raw) * [0.] 
@@ -140,44 +136,22 @@ def feuillet2019_data(ax):
 		c = plots.mpltoolkit.named_colors()["black"], linestyle = "None") 
 
 
-def ia_rate_proxies(zone, prefactor = 1): 
-	mir = vice.singlezone.from_output(zone) 
-	proxies = (len(zone.history["time"]) - 1) * [0.] 
-	for i in range(len(proxies)): 
-		if zone.history["time"][i] > mir.delay: 
-			proxies[i] = (
-				zone.history["mass(fe)"][i + 1] - zone.history["mass(fe)"][i] 
-			) / (
-				zone.history["time"][i + 1] - zone.history["time"][i] 
-			) 
-			proxies[i] -= (
-				vice.yields.ccsne.settings['fe'] * zone.history['sfr'][i] * 1e9 
-			) 
-			proxies[i] += zone.history["z(fe)"][i] * zone.history['sfr'][i] * (
-				1 + mir.eta - 0.4) * 1e9 
-			proxies[i] /= zone.history["mass(fe)"][i] 
-			proxies[i] *= prefactor 
-			if proxies[i] < 0: proxies[i] = 0 
-		else: pass 
-	return proxies 
-
-
 def plot_ia_rate_proxies(ax, output, linestyle = '-', label = True): 
 	radii = [15, 10, 5] 
 	colors = ["blue", "red", "black"]  
 	# colors = ["black", "red", "blue"] 
 	prefactors = [1.3, 1, 1] 
+	geometry = analysis.disk_geometry.from_output(output, 
+		zone_width = ZONE_WIDTH) 
+	zones = [output.zones["zone%d" % (i)] for i in geometry.zone(radii)] 
+	proxies = iarate.zone_proxies(zones) * np.reshape(prefactors, (-1, 1)) 
 	for i in range(len(radii)): 
 		kwargs = {
 			"c": 			colors[i], 
 			"linestyle": 	linestyle 
 		} 
 		if label: kwargs["label"] = "%g kpc" % (radii[i]) 
-		zone = int(radii[i] / ZONE_WIDTH) 
-		ax.plot(output.zones["zone%d" % (zone)].history["time"][:-1], 
-			ia_rate_proxies(output.zones["zone%d" % (zone)], 
-				prefactor = prefactors[i]), 
-			**kwargs) 
+		ax.plot(zones[i].history["time"][:-1], proxies[i], **kwargs) 
 	if label: 
 		leg = ax.legend(loc = plots.mpltoolkit.mpl_loc("upper right"), 
 			ncol = 1, frameon = False, bbox_to_anchor = (0.99, 0.99), 
@@ -192,8 +166,8 @@ if __name__ == "__main__":
 	axes = setup_axes() 
 	full = vice.output(FULL) 
 	simple = vice.output(SIMPLE) 
-	full.stars["zfinal"] = zheights(FULL)[:full.stars.size[0]] 
-	simple.stars["zfinal"] = zheights(SIMPLE)[:simple.stars.size[0]] 
+	full.stars["zfinal"] = analysis.zheights(FULL, full) 
+	simple.stars["zfinal"] = analysis.zheights(SIMPLE, simple) 
 	sc = plot_relation(axes[0], simple) 
 	plot_relation(axes[1], full) 
 	plot_ia_rate_proxies(axes[2], full) 
@@ -16,6 +16,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+from analysis import disk_geometry 
 
 XLIM = [8, 18] 
 
@@ -76,7 +79,7 @@ def get_actual(out):
 
 
 def plot_rates(ax, bottom, out): 
-	radii = [0.25 * i + 0.125 for i in range(len(out.zones.keys()))] 
+	radii = disk_geometry.from_output(out).centers 
 	expected = get_expected(out) 
 	actual = get_actual(out) 
 	ax.plot(radii, expected, c = plots.mpltoolkit.named_colors()["black"], 
@@ -20,6 +20,9 @@ import sys
 import os 
 sys.path.append("../../simulations/") 
 import gas_disks 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+from analysis import iarate, disk_geometry 
 from conference import TIME_SWITCH, tau_in, tau_star, eta, TSWITCH 
 
 
@@ -34,30 +37,9 @@ def setup_axis():
 	return ax 
 
 
-def get_proxies(zone): 
-	mir = vice.singlezone.from_output(zone) 
-	proxies = (len(zone.history["time"]) - 1) * [0.] 
-	for i in range(len(proxies)): 
-		if zone.history["time"][i] > mir.delay: 
-			proxies[i] = (
-				zone.history["mass(fe)"][i + 1] - zone.history["mass(fe)"][i] 
-			) / (
-				zone.history["time"][i + 1] - zone.history["time"][i] 
-			) 
-			proxies[i] -= (
-				vice.yields.ccsne.settings["fe"] * zone.history["sfr"][i] * 1e9 
-			) 
-			proxies[i] += zone.history["z(fe)"][i] * zone.history["sfr"][i] * (
-				1 + mir.eta - 0.4) * 1e9 
-			proxies[i] /= zone.history["mass(fe)"][i] 
-			if proxies[i] < 0: proxies[i] = 0
-		else: pass 
-	return proxies 
-
-
 def plot_actual(ax, zone, color, norm, label): 	
 	# proxies = [i / norm for i in get_proxies(zone)] 
-	proxies = get_proxies(zone) 
+	proxies = iarate.zone_proxies(zone) 
 	kwargs = {
 		"c": 		plots.mpltoolkit.named_colors()[color] 
 	}
@@ -66,18 +48,11 @@ def plot_actual(ax, zone, color, norm, label):
 
 
 def plot_comparison(ax, zone, color): 
-	sz = vice.singlezone.from_output(zone) 
-	# sz.func = lambda t: zone.history["mgas"][0] 
-	# sz.schmidt = False 
-	# sz.func = vice.toolkit.repair_function(zone, "sfr") 
-	# sz.tau_star = vice.toolkit.repair_function(zone, "tau_star") 
-	sz.name = "comparison" 
-	comp = sz.run(np.linspace(0, 14, 1401), overwrite = True, capture = True) 
-	# proxies = [i / comp.history["mass(fe)"][-1] for i in get_proxies(comp)] 
-	proxies = get_proxies(comp) 
-	ax.plot(comp.history["time"][:-1], proxies, 
+	# overrides = {"func": iarate.constant(zone.history["mgas"][0])} 
+	comp, proxies = iarate.comparison_proxies([zone], np.linspace(0, 14, 1401)) 
+	ax.plot(comp[0]["time"][:-1], proxies[0], 
 		c = plots.mpltoolkit.named_colors()[color], linestyle = '--') 
-	return comp.history["mass(fe)"][-1] 
+	return comp[0]["mass(fe)"][-1] 
 
 
 
@@ -86,12 +61,13 @@ if __name__ == "__main__":
 	ax = setup_axis() 
 	out = vice.output(sys.argv[1]) 
 	radii = [5, 10, 15]
+	zones = disk_geometry.from_output(out).zone(radii) 
 	colors = ["dodgerblue", "lime", "crimson"] 
 	for i in range(len(radii)): 
 		norm = plot_comparison(ax, 
-			out.zones["zone%d" % (int(radii[i] / 0.25))], colors[i]) 
+			out.zones["zone%d" % (zones[i])], colors[i]) 
 		# norm = 1 
-		plot_actual(ax, out.zones["zone%d" % (int(radii[i] / 0.25))], 
+		plot_actual(ax, out.zones["zone%d" % (zones[i])], 
 			colors[i], norm, r"$R_\text{gal}$ = %g kpc" % (radii[i])) 
 	leg = ax.legend(loc = plots.mpltoolkit.mpl_loc("lower right"), ncol = 1, 
 		frameon = False, bbox_to_anchor = (0.99, 0.01), handlelength = 0) 
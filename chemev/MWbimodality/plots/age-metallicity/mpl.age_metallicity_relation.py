@@ -16,10 +16,12 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+import analysis 
 
 CMAP = "plasma_r" 
-zone_min = int(7 / 0.25) 
-zone_max = int(8.75 / 0.25) 
+RGAL = [7, 9] # the range in final galactocentric radius in kpc 
 
 def setup_axes(): 
 	fig = plt.figure(figsize = (21, 7)) 
@@ -44,7 +46,8 @@ def plot_tracers(axes, tracers):
 		tracers["zone_origin"], 
 		tracers["mass"], 
 		tracers["z(o)"], 
-		tracers["z(fe)"] 
+		tracers["z(fe)"], 
+		tracers["rgal_origin"] 
 	)]
 	ages = len(tracers) * [0.] 
 	sizes = len(tracers) * [0.] 
@@ -53,6 +56,7 @@ def plot_tracers(axes, tracers):
 	FeH = len(tracers) * [0.] 
 	OFe = len(tracers) * [0.] 
 	med_mass = np.median([row[3] for row in tracers]) 
+	crf = analysis.cumulative_return_fraction([row[0] for row in tracers]) 
 	for i in range(len(tracers)): 
 		ages[i] = 12.8 - tracers[i][0] 
 		if tracers[i][4]: 
@@ -64,9 +68,8 @@ def plot_tracers(axes, tracers):
 		else: 
 			FeH[i] = -float("inf") 
 		OFe[i] = OH[i] - FeH[i] 
-		sizes[i] = tracers[i][3] / med_mass * 20 * (1 - 
-			vice.cumulative_return_fraction(tracers[i][0])) 
-		colors[i] = 0.25 * tracers[i][2] 
+		sizes[i] = tracers[i][3] / med_mass * 20 * (1 - crf[i]) 
+		colors[i] = tracers[i][6] 
 	axes[0].scatter(ages, OH, c = colors, s = sizes, cmap = cmap, 
 		vmin = 0, vmax = 15) 
 	axes[1].scatter(ages, FeH, c = colors, s = sizes, cmap = cmap, 
@@ -76,42 +79,14 @@ def plot_tracers(axes, tracers):
 	return sc 
 
 
-def weighted_median(values, weights, stop = 0.5): 
-	indeces = np.argsort(values) 
-	values = [values[i] for i in indeces] 
-	weights = [weights[i] for i in indeces] 
-	weights = [i / sum(weights) for i in weights] 
-	s = 0 
-	for i in range(len(weights)): 
-		s += weights[i] 
-		if s > stop: 
-			idx = i - 1 
-			break 
-	return values[idx] 
-
-
 def feuillet_points(ax, tracers, element): 
 	bins = np.arange(-1, 1.1, 0.1) 
-	ages = (len(bins) - 1) * [0.] 
-	lowers = (len(bins) - 1) * [0.] 
-	uppers = (len(bins) - 1) * [0.] 
-	for i in range(len(ages)): 
-		stars = tracers.filter("[%s/h]" % (element), ">=", bins[i]) 
-		stars = stars.filter("[%s/h]" % (element), "<=", bins[i + 1]) 
-		if len(stars["age"]) > 20: 
-			""" 
-			Calculate the mass-weighted median 
-			""" 
-			masses = list(map(lambda x, y: x * (1 - 
-				vice.cumulative_return_fraction(y)), 
-				stars["mass"], stars["age"])) 
-			ages[i] = weighted_median(stars["age"], masses) 
-			lowers[i] = weighted_median(stars["age"], masses, stop = 0.16) 
-			uppers[i] = weighted_median(stars["age"], masses, stop = 0.84) 
-		else: 
-			ages[i] = float("nan") 
-			lowers[i] = float("nan") 
-			uppers[i] = float("nan") 
+	age = np.array(tracers["age"]) 
+	masses = analysis.remaining_mass(tracers["mass"], age) 
+	# the mass-weighted median and 16th and 84th percentiles 
+	lowers, ages, uppers = analysis.binned_weighted_quantiles(age, masses, 
+		tracers["[%s/h]" % (element)], bins, [0.16, 0.5, 0.84], 
+		minimum = 21).T 
 	ax.scatter(ages, list(map(lambda x, y: (x + y) / 2, bins[1:], bins[:-1])), 
 		marker = plots.mpltoolkit.markers()["star"], 
 		c = plots.mpltoolkit.named_colors()["black"], s = 100) 
@@ -126,13 +101,15 @@ if __name__ == "__main__":
 	plt.clf() 
 	axes = setup_axes() 
 	out = vice.multioutput(sys.argv[1]) 
-	extra_tracer_data = np.genfromtxt("%s_extra_tracer_data.out" % (out.name)) 
-	out.stars["zfinal"] = [row[-1] for row in 
-		extra_tracer_data[:out.stars.size[0]]] 
+	out.stars["zfinal"] = analysis.zheights(out.name, out) 
+	geometry = analysis.disk_geometry.from_output(out) 
+	out.stars["rgal_origin"] = geometry.radius(out.stars["zone_origin"]) 
 	fltrd_tracers = out.stars.filter("zfinal", ">=", -3.) 
 	fltrd_tracers = fltrd_tracers.filter("zfinal", "<=", 3.) 
-	fltrd_tracers = fltrd_tracers.filter("zone_final", ">=", zone_min) 
-	fltrd_tracers = fltrd_tracers.filter("zone_final", "<=", zone_max) 
+	fltrd_tracers = fltrd_tracers.filter("zone_final", ">=", 
+		geometry.zone(RGAL[0])) 
+	fltrd_tracers = fltrd_tracers.filter("zone_final", "<", 
+		geometry.zone(RGAL[1])) 
 	fltrd_tracers = fltrd_tracers.filter("mass", ">=", 1.) 
 	sc = plot_tracers(axes, fltrd_tracers) 
 	cbar = plt.colorbar(sc, 
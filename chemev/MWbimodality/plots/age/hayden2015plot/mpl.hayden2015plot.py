@@ -18,6 +18,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../../..")) 
+import analysis 
 
 REF_ELEMENT = "Fe" 
 SEC_ELEMENT = "O" 
@@ -71,8 +74,8 @@ def plot_stars(ax, stars, zone_bounds, zbounds):
 	stars = stars.filter("abszfinal", "<=", zbounds[1]) 
 	stars = stars.filter("mass", ">", 1) 
 	med_mass = np.median(stars["mass"]) 
-	stars["size"] = [i["mass"] / med_mass * 20 * (1 - 
-		vice.cumulative_return_fraction(i["age"])) for i in stars] 
+	stars["size"] = analysis.remaining_mass(stars["mass"], 
+		stars["age"]) / med_mass * 20 
 	return ax.scatter(
 		stars["[%s/H]" % (REF_ELEMENT)], 
 		stars["[%s/%s]" % (SEC_ELEMENT, REF_ELEMENT)], 
@@ -88,9 +91,7 @@ if __name__ == "__main__":
 	plt.clf() 
 	fig, axes = setup_axes() 
 	out = vice.multioutput(sys.argv[1]) 
-	extra_tracer_data = np.genfromtxt("%s_extra_tracer_data.out" % (out.name)) 
-	out.stars["abszfinal"] = [abs(row[-1]) for row in 
-		extra_tracer_data[:out.stars.size[0]]] 
+	out.stars["abszfinal"] = np.abs(analysis.zheights(out.name, out)) 
 	zone_bounds = [[12, 19], [20, 27], [28, 35], [36, 43], [44, 51]] 
 	z_bounds = [[1, 2], [0.5, 1], [0, 0.5]] 
 	for i in range(3): 
@@ -19,6 +19,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+import analysis 
 
 XLIM = [-1.7, 0.4] 
 YLIM = [0.0, 0.5] 
@@ -55,12 +58,12 @@ def plot_tracers(ax, tracers, zone_bounds):
 	YX = len(tracers) * [0.] 
 	colors = len(tracers) * [None] 
 	sizes = len(tracers) * [None] 
+	crf = analysis.cumulative_return_fraction([row[0] for row in tracers]) 
 	for i in range(len(tracers)): 
 		XH[i] = m.log10(tracers[i][3] / vice.solar_z[sys.argv[3]]) 
 		YX[i] = m.log10(tracers[i][4] / vice.solar_z[sys.argv[4]]) - XH[i] 
 		colors[i] = 13.8 - tracers[i][0] 
-		sizes[i] = tracers[i][2] / 1e6 * 4 * (1 - 
-			vice.cumulative_return_fraction(tracers[i][0])) 
+		sizes[i] = tracers[i][2] / 1e6 * 4 * (1 - crf[i]) 
 	sc = ax.scatter(XH, YX, c = colors, s = sizes, cmap = cmap, vmin = 1, 
 		vmax = 13.8) 
 	return sc 
@@ -75,9 +78,7 @@ def plot_track(ax, szout):
 if __name__ == "__main__": 
 	axes = setup_axes() 
 	out = vice.multioutput(sys.argv[1]) 
-	extra_tracer_data = np.genfromtxt("%s_extra_tracer_data.out" % (out.name)) 
-	out.stars["zfinal"] = [row[-1] for row in 
-		extra_tracer_data[:out.stars.size[0]]]  
+	out.stars["zfinal"] = analysis.zheights(out.name, out) 
 	fltrd_tracers = out.stars.filter("zfinal", ">=", -3.) 
 	fltrd_tracers = fltrd_tracers.filter("zfinal", "<=", 3.) 
 	plot_tracers(axes[0], fltrd_tracers, [12, 19]) 
@@ -16,6 +16,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../../..")) 
+from analysis import disk_geometry, history_cube 
 
 
 def setup_axes(): 
@@ -100,7 +103,7 @@ def plot_stellar_metallicities(axes, multioutput):
 		"dn/d[o/fe]") for i in range(len(multioutput.zones.keys()))] 
 	OFe_disp = [stellar_dispersion(multioutput.zones["zone%d" % (i)], 
 		"dn/d[o/fe]") for i in range(len(multioutput.zones.keys()))] 
-	radii = [0.25 * i + 0.125 for i in range(len(multioutput.zones.keys()))] 
+	radii = disk_geometry.from_output(multioutput).centers 
 	axes[0].scatter(radii, O, c = plots.mpltoolkit.named_colors()["red"], 
 		marker = plots.mpltoolkit.markers()["star"], s = 50, zorder = 20) 
 	axes[0].scatter(radii, Fe, c = plots.mpltoolkit.named_colors()["blue"], 
@@ -128,18 +131,18 @@ def plot_gas_phase_metallicity(axes, out):
 	out : vice.multioutput 
 		The multioutput object from the simulation  
 	""" 
-	O = [out.zones["zone%d" % (i)].history["[o/h]"][-1] for i in range(
-		len(out.zones.keys()))] 
-	Fe = [out.zones["zone%d" % (i)].history["[fe/h]"][-1] for i in range(
-		len(out.zones.keys()))] 
-	OFe = [out.zones["zone%d" % (i)].history["[o/fe]"][-1] for i in range(
-		len(out.zones.keys()))] 
-	radii = [0.25 * i + 0.125 for i in range(len(out.zones.keys()))] 
-	axes[0].plot(radii[:62], O[:62], 
+	cube = history_cube(out, keys = ["[o/h]", "[fe/h]", "[o/fe]"]) 
+	O = cube["[o/h]"][:, -1] 
+	Fe = cube["[fe/h]"][:, -1] 
+	OFe = cube["[o/fe]"][:, -1] 
+	geometry = cube.geometry 
+	radii = geometry.centers 
+	n = geometry.n_active 
+	axes[0].plot(radii[:n], O[:n], 
 		c = plots.mpltoolkit.named_colors()["red"]) 
-	axes[0].plot(radii[:62], Fe[:62], 
+	axes[0].plot(radii[:n], Fe[:n], 
 		c = plots.mpltoolkit.named_colors()["blue"]) 
-	axes[1].plot(radii[:62], OFe[:62], 
+	axes[1].plot(radii[:n], OFe[:n], 
 		c = plots.mpltoolkit.named_colors()["black"]) 
 
 
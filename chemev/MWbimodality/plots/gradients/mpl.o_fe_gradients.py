@@ -17,6 +17,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+from analysis import disk_geometry, history_cube 
 
 _COLORS_ = ["black", "crimson", "lime", "dodgerblue", "darkviolet"] 
 
@@ -123,7 +126,7 @@ def plot_stellar_metallicities(axes, multiout, color):
 			"dn/d[o/fe]") 
 		OFe_disp[i] = stellar_dispersion(multiout.zones["zone%d" % (i)], 
 			"dn/d[o/fe]") 
-	radii = [0.25 * i for i in range(len(multiout.zones.keys()))] 
+	radii = disk_geometry.from_output(multiout).edges[:-1] 
 	# axes[0].fill_between(radii, [row[0] for row in O_disp], 
 	# 	[row[1] for row in O_disp], 
 	# 	color = plots.mpltoolkit.named_colors()[color], 
@@ -163,20 +166,20 @@ def plot_stellar_metallicities(axes, multiout, color):
 		marker = plots.mpltoolkit.markers()["star"], s = 50, zorder = 20) 
 
 def plot_gas_phase_metallicities(axes, multiout, color): 
-	O = [multiout.zones["zone%d" % (i)].history["[o/h]"][-1] for i in range(
-		len(multiout.zones.keys()))] 
-	Fe = [multiout.zones["zone%d" % (i)].history["[fe/h]"][-1] for i in range(
-		len(multiout.zones.keys()))] 
-	OFe = [multiout.zones["zone%d" % (i)].history["[o/fe]"][-1] for i in range(
-		len(multiout.zones.keys()))] 
-	radii = [0.25 * i for i in range(len(multiout.zones.keys()))] 
-	axes[0].plot(radii[:62], O[:62], 
+	cube = history_cube(multiout, keys = ["[o/h]", "[fe/h]", "[o/fe]"]) 
+	O = cube["[o/h]"][:, -1] 
+	Fe = cube["[fe/h]"][:, -1] 
+	OFe = cube["[o/fe]"][:, -1] 
+	geometry = cube.geometry 
+	radii = geometry.edges[:-1] 
+	n = geometry.n_active 
+	axes[0].plot(radii[:n], O[:n], 
 		c = plots.mpltoolkit.named_colors()[color], zorder = 10) 
 		# marker = plots.mpltoolkit.markers()["circle"]) 
-	axes[1].plot(radii[:62], Fe[:62], 
+	axes[1].plot(radii[:n], Fe[:n], 
 		c = plots.mpltoolkit.named_colors()[color], zorder = 10) 
 		# marker = plots.mpltoolkit.markers()["circle"]) 
-	axes[2].plot(radii[:62], OFe[:62], 
+	axes[2].plot(radii[:n], OFe[:n], 
 		c = plots.mpltoolkit.named_colors()[color], zorder = 10) 
 		# marker = plots.mpltoolkit.markers()["circle"]) 
 
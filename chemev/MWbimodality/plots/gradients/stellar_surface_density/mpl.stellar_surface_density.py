@@ -17,8 +17,10 @@ import math as m
 import vice 
 import sys 
 import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../../..")) 
+import analysis 
 
-RAD_BINS = np.linspace(0, 30, 121).tolist() 
 NORM = 5e7  
 
 
@@ -44,15 +46,12 @@ def surface_density(output):
 	output : vice.multioutput 
 		The multioutput object with stellar data 
 	""" 
-	densities = (len(RAD_BINS) - 1) * [0.] 
+	geometry = analysis.disk_geometry.from_output(output) 
 	stars = output.stars.filter("mass", ">", 0) 
-	for i in range(len(stars["mass"])): 
-		densities[int(stars["zone_final"][i])] += stars["mass"][i] * (1 - 
-			vice.cumulative_return_fraction(stars["age"][i])) 
-	for i in range(len(densities)): 
-		densities[i] /= m.pi * (RAD_BINS[i + 1]**2 - RAD_BINS[i]**2) 
-		densities[i] /= NORM 
-	return densities 
+	densities = np.bincount(np.array(stars["zone_final"], dtype = int), 
+		weights = analysis.remaining_mass(stars["mass"], stars["age"]), 
+		minlength = geometry.n_zones) 
+	return densities / (geometry.areas * NORM) 
 
 
 def draw(ax, output): 
@@ -64,8 +63,8 @@ def draw(ax, output):
 	output : vice.multioutput 
 		The multioutput object with stellar data 
 	""" 
-	bin_centers = lambda x: list(map(lambda x, y: (x + y) / 2., x[1:], x[:-1])) 
-	ax.scatter(bin_centers(RAD_BINS), surface_density(output), 
+	ax.scatter(analysis.disk_geometry.from_output(output).centers, 
+		surface_density(output), 
 		marker = plots.mpltoolkit.markers()["star"], 
 		c = plots.mpltoolkit.named_colors()["black"]) 
 	xvals = np.linspace(0, 21, 1001).tolist() 
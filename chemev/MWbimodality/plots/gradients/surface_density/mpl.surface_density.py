@@ -16,8 +16,10 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../../..")) 
+from analysis import history_cube 
 
-RAD_BINS = np.linspace(0, 15.5, 63).tolist() 
 COLORS = ["black", "crimson", "lime", "dodgerblue"] 
 XLIM = [-1, 16] 
 YLIM = [3e-4, 3e3] 
@@ -35,24 +37,19 @@ def setup_axis():
 
 
 def plot_densities(ax, out, color): 
-	stellar = (len(RAD_BINS) - 1) * [0.] 
-	gaseous = (len(RAD_BINS) - 1) * [0.] 
-	for i in range(len(stellar)): 
-		stellar[i] = out.zones["zone%d" % (i)].history["mstar"][-1] 
-		stellar[i] /= m.pi * (RAD_BINS[i + 1]**2 - RAD_BINS[i]**2) 
-		gaseous[i] = out.zones["zone%d" % (i)].history["mgas"][-1] 
-		gaseous[i] /= m.pi * (RAD_BINS[i + 1]**2 - RAD_BINS[i]**2) 
-	norm_stellar = stellar[16] 
-	norm_gaseous = gaseous[16] 
-	for i in range(len(stellar)): 
-		stellar[i] /= norm_stellar 
-		gaseous[i] /= norm_gaseous 
-	bin_centers = lambda x: [(x[i] + x[i + 1]) / 2 for i in range(len(x) - 1)] 
-	ax.scatter(bin_centers(RAD_BINS), stellar, 
+	cube = history_cube(out, keys = ["mstar", "mgas"]) 
+	geometry = cube.geometry 
+	n = geometry.n_active 
+	stellar = cube["mstar"][:n, -1] / geometry.areas[:n] 
+	gaseous = cube["mgas"][:n, -1] / geometry.areas[:n] 
+	# normalize to the zone at 4 kpc 
+	stellar /= stellar[geometry.zone(4)] 
+	gaseous /= gaseous[geometry.zone(4)] 
+	ax.scatter(geometry.centers[:n], stellar, 
 		marker = plots.mpltoolkit.markers()["star"], 
 		c = plots.mpltoolkit.named_colors()[color], 
 		s = 50) 
-	ax.plot(bin_centers(RAD_BINS), gaseous, 
+	ax.plot(geometry.centers[:n], gaseous, 
 		linestyle = ':', 
 		c = plots.mpltoolkit.named_colors()[color]) 
 
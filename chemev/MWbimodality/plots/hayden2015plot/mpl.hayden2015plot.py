@@ -14,6 +14,10 @@ plots.mpltoolkit.load_mpl_presets()
 import numpy as np 
 import vice 
 import sys 
+import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+import analysis 
 
 CMAP = "Greys" 
 XLIM = [-1.2, 1.2] 
@@ -56,8 +60,8 @@ def plot_density(ax, out, minrgal, maxrgal, minabsz, maxabsz):
 	maxabsz : Maximum |z| in kpc 
 	""" 
 	stars = out.stars.filter("mass", ">", 0) 
-	stars = stars.filter("zone_final", ">=", minrgal / 0.25) 
-	stars = stars.filter("zone_final", "<=", (maxrgal - 0.25) / 0.25) 
+	stars = stars.filter("rgal_final", ">=", minrgal) 
+	stars = stars.filter("rgal_final", "<", maxrgal) 
 	stars = stars.filter("abszfinal", ">=", minabsz) 
 	stars = stars.filter("abszfinal", "<=", maxabsz) 
 	dist, xedges, yedges = np.histogram2d(stars["[fe/h]"], stars["[o/fe]"], 
@@ -72,8 +76,9 @@ if __name__ == "__main__":
 	plt.clf() 
 	fig, axes = setup_axes() 
 	out = vice.output(sys.argv[1]) 
-	extra = np.genfromtxt("%s_extra_tracer_data.out" % (out.name)) 
-	out.stars["abszfinal"] = [abs(row[-1]) for row in extra] 
+	out.stars["abszfinal"] = np.abs(analysis.zheights(out.name, out)) 
+	out.stars["rgal_final"] = analysis.disk_geometry.from_output(out).radius( 
+		out.stars["zone_final"]) 
 	radii = [3, 5, 7, 9, 11, 13] 
 	heights = [2, 1, 0.5, 0] 
 	for i in range(3): 
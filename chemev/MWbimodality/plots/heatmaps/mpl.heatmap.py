@@ -20,6 +20,9 @@ import numpy as np
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+from analysis import iarate, history_cube 
 
 CMAP = "bwr" 
 # KEY = "[o/fe]" 
@@ -30,45 +33,25 @@ VMAX = 0.2
 
 
 def get_heatmap(out): 
-	radii = [0.25 * i for i in range(62)] 
-	times = out.zones["zone0"].history["time"][:] 
-	qty = len(radii) * [None] 
-	for i in range(len(qty)): 
-		# qty[i] = out.zones["zone%d" % (i)].history[KEY][:] 
-		actual = get_proxies(out.zones["zone%d" % (i)]) 
-		sz = vice.mirror(out.zones["zone%d" % (i)]) 
-		sz.func = lambda t: out.zones["zone%d" % (i)].history["mgas"][0] 
-		sz.name = "comparison2" 
-		comp = sz.run(np.linspace(0, 12.8, 641), overwrite = True, 
-			capture = True) 
-		expected = get_proxies(comp) 
-		qty[i] = list(map(lambda x, y: 100 * (x - y) / y if y > 0 else 0, 
-			actual, expected)) 
+	cube = history_cube(out, keys = ["time", "mgas"]) 
+	geometry = cube.geometry 
+	radii = geometry.edges[:geometry.n_active] 
+	times = cube.time 
+	zones = [out.zones["zone%d" % (i)] for i in range(len(radii))] 
+	actual = iarate.zone_proxies(zones, normalize = False) 
+	# comparison models with the gas supply held at its initial value, run 
+	# on the output's own timesteps such that the proxies line up 
+	expected = iarate.comparison_proxies(zones, times, 
+		overrides = [{"func": iarate.constant(i)} for i in 
+			cube["mgas"][:len(zones), 0]], verbose = True, normalize = False)[1] 
+	if actual.shape != expected.shape: raise ValueError( 
+		"Comparison proxies do not match those of the output. Got: %s != %s" % ( 
+			str(expected.shape), str(actual.shape))) 
+	with np.errstate(divide = "ignore", invalid = "ignore"): 
+		qty = np.where(expected > 0, 100 * (actual - expected) / expected, 0) 
 	return [radii, times, qty] 
 
 
-# From the Ia rate calculation functions 
-def get_proxies(zone): 
-	mir = vice.mirror(zone) 
-	proxies = (len(zone.history["time"]) - 1) * [0.] 
-	for i in range(len(proxies)): 
-		if zone.history["time"][i] > mir.delay: 
-			proxies[i] = (
-				zone.history["mass(fe)"][i + 1] - zone.history["mass(fe)"][i] 
-			) / (
-				zone.history["time"][i + 1] - zone.history["time"][i] 
-			) 
-			proxies[i] -= (
-				vice.yields.ccsne.settings["fe"] * zone.history["sfr"][i] * 1e9 
-			) 
-			proxies[i] += zone.history["z(fe)"][i] * zone.history["sfr"][i] * (
-				1 + mir.eta - 0.4) * 1e9 
-			# proxies[i] /= zone.history["mass(fe)"][i] 
-			if proxies[i] < 0: proxies[i] = 0
-		else: pass 
-	return proxies 
-
-
 def setup_axis(): 
 	""" 
 	Sets up the polar axis 
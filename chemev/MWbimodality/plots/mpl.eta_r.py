@@ -35,7 +35,7 @@ def linear(rgal):
 	""" 
 	The linear trend of eta with galactocentric radius 
 
-	rgal :: The galactocentric radius in kpc 
+	rgal :: The galactocentric radius(es) in kpc 
 	""" 
 	return 0.8 * rgal 
 
@@ -44,7 +44,7 @@ def mode_mgh(rgal):
 	""" 
 	The mode of [Mg/H] motivated eta with galactocentric radius 
 
-	rgal :: The galactocentric radius in kpc 
+	rgal :: The galactocentric radius(es) in kpc 
 	""" 
 	return Y_MG_CC / vice.solar_z["mg"] * 10**(0.06 * (rgal - 4) - 0.3) - 0.6 
 
@@ -56,9 +56,9 @@ def plot_trends(ax):
 	ax :: The subplot to plot on 
 	""" 
 	radii = np.linspace(0, 30, 1000) 
-	ax.plot(radii, list(map(linear, radii)), 
+	ax.plot(radii, linear(radii), 
 		c = plots.mpltoolkit.named_colors()["crimson"]) 
-	ax.plot(radii, list(map(mode_mgh, radii)), 
+	ax.plot(radii, mode_mgh(radii), 
 		c = plots.mpltoolkit.named_colors()["dodgerblue"]) 
 
 
@@ -21,6 +21,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"..")) 
+import analysis 
 
 
 def setup_axis(): 
@@ -35,9 +38,11 @@ def tracer_data():
 	return np.genfromtxt("%s.vice/tracers.out" % (sys.argv[1])) 
 
 
-def plot_tracers(ax, tracers): 
+def plot_tracers(ax, tracers, geometry): 
 	cmap = plt.get_cmap("viridis") 
-	tracers = list(filter(lambda x: 40 <= x[2] <= 55, tracers)) 
+	# final radii of 10 - 14 kpc 
+	zones = [geometry.zone(10), geometry.zone(14) - 1] 
+	tracers = list(filter(lambda x: zones[0] <= x[2] <= zones[1], tracers)) 
 	tracers = list(filter(lambda x: x[5] > 0, tracers)) 
 	tracers = list(filter(lambda x: x[6] > 0, tracers)) 
 	XH = len(tracers) * [0.] 
@@ -49,7 +54,7 @@ def plot_tracers(ax, tracers):
 			vice.solar_z[sys.argv[3]]) 
 		YX[i] = m.log10(tracers[i][int(sys.argv[6])] / 
 			vice.solar_z[sys.argv[4]]) - XH[i] 
-		colors[i] = tracers[i][1] * 0.25 
+		colors[i] = geometry.radius(tracers[i][1]) 
 		sizes[i] = 20 * tracers[i][3] / 4e6 
 		sys.stdout.write("Progress: %.2f%%\r" % (100. * (i + 1) / len(tracers))) 
 		sys.stdout.flush() 
@@ -64,7 +69,8 @@ def plot_tracers(ax, tracers):
 if __name__ == "__main__": 
 	plt.clf() 
 	ax = setup_axis() 
-	plot_tracers(ax, tracer_data()) 
+	plot_tracers(ax, tracer_data(), 
+		analysis.disk_geometry.from_output(sys.argv[1])) 
 	plt.tight_layout() 
 	ax.set_xlim([-1.7, 0.2]) 
 	ax.set_ylim([-0.24, 0.24]) 
@@ -18,6 +18,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../../..")) 
+import analysis 
 
 REF_ELEMENT = "Fe" 
 SEC_ELEMENT = "O" 
@@ -51,7 +54,7 @@ def setup_axes():
 	return fig, axes 
 
 
-def plot_stars(ax, stars, zone_bounds, zbounds): 
+def plot_stars(ax, stars, zone_bounds, zbounds, geometry): 
 	""" 
 	Plot the stars in a given radial range and z range on a given axis. 
 
@@ -63,6 +66,8 @@ def plot_stars(ax, stars, zone_bounds, zbounds):
 		The inner and outer zones to take in the plot 
 	zbounds : array-like 
 		The lower and upper bound on |z| 
+	geometry : disk_geometry 
+		The geometry of the zones of the output 
 	""" 
 	cmap = plt.get_cmap(CMAP) 
 	stars = stars.filter("zone_final", ">=", zone_bounds[0]) 
@@ -70,10 +75,10 @@ def plot_stars(ax, stars, zone_bounds, zbounds):
 	stars = stars.filter("abszfinal", ">=", zbounds[0]) 
 	stars = stars.filter("abszfinal", "<=", zbounds[1]) 
 	stars = stars.filter("mass", ">", 1) 
-	colors = [i["zone_origin"] * 0.25 for i in stars] 
+	colors = geometry.radius(np.array(stars["zone_origin"])) 
 	med_mass = np.median(stars["mass"])
-	sizes = [i["mass"] / med_mass * 10 * (1 - 
-		vice.cumulative_return_fraction(i["age"])) for i in stars] 
+	sizes = analysis.remaining_mass(stars["mass"], 
+		stars["age"]) / med_mass * 10 
 	return ax.scatter(
 		stars["[%s/H]" % (REF_ELEMENT)], 
 		stars["[%s/%s]" % (SEC_ELEMENT, REF_ELEMENT)], 
@@ -89,14 +94,16 @@ if __name__ == "__main__":
 	plt.clf() 
 	fig, axes = setup_axes() 
 	out = vice.multioutput(sys.argv[1]) 
-	extra_tracer_data = np.genfromtxt("%s_extra_tracer_data.out" % (out.name)) 
-	out.stars["abszfinal"] = [abs(row[-1]) for row in 
-		extra_tracer_data[:out.stars.size[0]]] 
-	zone_bounds = [[12, 19], [20, 27], [28, 35], [36, 43], [44, 51]] 
+	out.stars["abszfinal"] = np.abs(analysis.zheights(out.name, out)) 
+	# the innermost and outermost zone of each annulus 
+	geometry = analysis.disk_geometry.from_output(out) 
+	zone_bounds = [[geometry.zone(i), geometry.zone(i + 2) - 1] for i in 
+		[3, 5, 7, 9, 11]] 
 	z_bounds = [[1, 2], [0.5, 1], [0, 0.5]] 
 	for i in range(3): 
 		for j in range(5): 
-			sc = plot_stars(axes[i][j], out.stars, zone_bounds[j], z_bounds[i])
+			sc = plot_stars(axes[i][j], out.stars, zone_bounds[j], z_bounds[i], 
+				geometry) 
 	# sc = plot_stars(axes[0][0], out.stars, zone_bounds[0], z_bounds[0])  
 	cbar_ax = fig.add_axes([0.92, 0.05, 0.02, 0.95]) 
 	fig.colorbar(sc, cax = cbar_ax) 
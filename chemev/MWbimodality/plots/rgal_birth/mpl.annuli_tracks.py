@@ -19,6 +19,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+import analysis 
 
 XLIM = [-1.2, 0.7] 
 YLIM = [0.0, 0.5] 
@@ -40,7 +43,7 @@ def setup_axes():
 	return axes 
 
 
-def plot_tracers(ax, tracers, zone_bounds): 
+def plot_tracers(ax, tracers, zone_bounds, geometry): 
 	cmap = plt.get_cmap(CMAP) 
 	tracers = [list(i) for i in zip(
 		tracers["zone_origin"], 
@@ -57,12 +60,12 @@ def plot_tracers(ax, tracers, zone_bounds):
 	YX = len(tracers) * [0.] 
 	colors = len(tracers) * [None] 
 	sizes = len(tracers) * [None] 
+	crf = analysis.cumulative_return_fraction([row[5] for row in tracers]) 
 	for i in range(len(tracers)): 
 		XH[i] = m.log10(tracers[i][3] / vice.solar_z[sys.argv[3]]) 
 		YX[i] = m.log10(tracers[i][4] / vice.solar_z[sys.argv[4]]) - XH[i] 
-		colors[i] = tracers[i][0] * 0.25 
-		sizes[i] = tracers[i][2] / 1e6 * 4 * (1 - 
-			vice.cumulative_return_fraction(tracers[i][5])) 
+		colors[i] = geometry.radius(tracers[i][0]) 
+		sizes[i] = tracers[i][2] / 1e6 * 4 * (1 - crf[i]) 
 	sc = ax.scatter(XH, YX, c = colors, s = sizes, cmap = cmap, vmin = 1, 
 		vmax = 15) 
 	return sc 
@@ -77,27 +80,20 @@ def plot_track(ax, szout):
 if __name__ == "__main__": 
 	plt.clf() 
 	axes = setup_axes() 
-	out = vice.multioutput(sys.argv[1]) 
-	extra_tracer_data = np.genfromtxt("%s_extra_tracer_data.out" % (out.name)) 
-	out.stars["zfinal"] = [row[-1] for row in 
-		extra_tracer_data[:out.stars.size[0]]] 
-	fltrd_tracers = out.stars.filter("zfinal", ">=", -3.) 
-	fltrd_tracers = fltrd_tracers.filter("zfinal", "<=", 3.) 
-	plot_tracers(axes[0], fltrd_tracers, [12, 19]) 
-	plot_tracers(axes[1], fltrd_tracers, [20, 27]) 
-	plot_tracers(axes[2], fltrd_tracers, [28, 35]) 
-	plot_tracers(axes[3], fltrd_tracers, [36, 43]) 
-	sc = plot_tracers(axes[4], fltrd_tracers, [44, 51]) 
-	plot_track(axes[0], out.zones["zone12"]) 
-	plot_track(axes[0], out.zones["zone19"]) 
-	plot_track(axes[1], out.zones["zone20"]) 
-	plot_track(axes[1], out.zones["zone27"])
-	plot_track(axes[2], out.zones["zone28"]) 
-	plot_track(axes[2], out.zones["zone35"])
-	plot_track(axes[3], out.zones["zone36"]) 
-	plot_track(axes[3], out.zones["zone43"])
-	plot_track(axes[4], out.zones["zone44"]) 
-	plot_track(axes[4], out.zones["zone51"])
+	# the innermost and outermost zone of each annulus 
+	geometry = analysis.disk_geometry.from_output(sys.argv[1]) 
+	annuli = [[geometry.zone(i), geometry.zone(i + 2) - 1] for i in 
+		[3, 5, 7, 9, 11]] 
+	# only the zones with tracks and the star particle columns plotted 
+	out = analysis.lazy_output(sys.argv[1], zones = range(annuli[0][0], 
+		annuli[-1][1] + 1), stars = ["zone_origin", "zone_final", "mass", 
+		"formation_time", "z(%s)" % (sys.argv[3]), "z(%s)" % (sys.argv[4])]) 
+	out.stars["zfinal"] = analysis.zheights(out.name, out) 
+	fltrd_tracers = analysis.star_query(out.stars).where(zfinal = (-3., 3.)) 
+	for i in range(len(annuli)): 
+		sc = plot_tracers(axes[i], fltrd_tracers, annuli[i], geometry) 
+		for j in annuli[i]: 
+			plot_track(axes[i], out.zones["zone%d" % (j)]) 
 	cbar = plt.colorbar(sc, ax = axes[4], pad = 0) 
 	cbar.set_label(r"$R_\text{gal}$ of birth [kpc]") 
 	plt.tight_layout() 
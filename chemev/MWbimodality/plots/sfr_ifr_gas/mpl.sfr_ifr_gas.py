@@ -17,6 +17,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+from analysis import history_cube 
 
 
 CMAP = "plasma" 
@@ -64,29 +67,20 @@ def plot_quantities(axes, out):
 	prefac_in = 100 
 	prefac_sfr = 100 
 	prefac_gas = 1e-7 
-	for i in range(int(15.5 / 0.25)): 
-		sigma_in = [j / (m.pi * ((0.25 * (i + 1))**2 - (0.25 * i)**2)) for j in 
-			out.zones["zone%d" % (i)].history["ifr"]]
-		sigma_sfr = [j / (m.pi * ((0.25 * (i + 1))**2 - (0.25 * i)**2)) for j in 
-			out.zones["zone%d" % (i)].history["sfr"]] 
-		sigma_gas = [j / (m.pi * ((0.25 * (i + 1))**2 - (0.25 * i)**2)) for j in 
-			out.zones["zone%d" % (i)].history["mgas"]] 
-		sigma_in = [j * prefac_in for j in sigma_in] 
-		sigma_sfr = [j * prefac_sfr for j in sigma_sfr] 
-		sigma_gas = [j * prefac_gas for j in sigma_gas] 
+	cube = history_cube(out, keys = ["time", "ifr", "sfr", "mgas"]) 
+	geometry = cube.geometry 
+	n = geometry.n_active 
+	areas = geometry.areas[:n, None] 
+	sigma_in = prefac_in * cube["ifr"][:n] / areas 
+	sigma_sfr = prefac_sfr * cube["sfr"][:n] / areas 
+	sigma_gas = prefac_gas * cube["mgas"][:n] / areas 
+	for i in range(n): 
 		kwargs = {
-			"c": 		cmap((0.25 * i + 0.125) / 15.5) 
+			"c": 		cmap(geometry.radius(i) / geometry.cutoff) 
 		} 
-		axes[0].plot(out.zones["zone%d" % (i)].history["time"], 
-			# out.zones["zone%d" % (i)].history["ifr"], **kwargs) 
-			sigma_in, **kwargs) 
-		axes[1].plot(out.zones["zone%d" % (i)].history["time"], 
-			# out.zones["zone%d" % (i)].history["sfr"], **kwargs) 
-			sigma_sfr, **kwargs) 
-		axes[2].plot(out.zones["zone%d" % (i)].history["time"], 
-			# [i * 1.e-9 for i in out.zones["zone%d" % (i)].history["mgas"]], 
-			# **kwargs) 
-			sigma_gas, **kwargs) 
+		axes[0].plot(cube["time"][i], sigma_in[i], **kwargs) 
+		axes[1].plot(cube["time"][i], sigma_sfr[i], **kwargs) 
+		axes[2].plot(cube["time"][i], sigma_gas[i], **kwargs) 
 
 
 if __name__ == "__main__": 
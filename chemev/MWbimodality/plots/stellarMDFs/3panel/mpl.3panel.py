@@ -16,6 +16,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../../..")) 
+import analysis 
 
 XLIM = [-1.4, 0.7] 
 YLIM = [0, 0.19] 
@@ -40,33 +43,25 @@ def setup_axes():
 
 
 
-def get_mdf(stars, minrgal, maxrgal, minabsz, maxabsz): 
+def get_mdf(cube, minrgal, maxrgal, minabsz, maxabsz): 
 	r""" 
 	Calculates the stellar MDF in [Fe/H] for a given range in Rgal and |z| 
 
 	Parameters 
 	---------- 
-	- stars : The star particles from the VICE output 
+	- cube : The mass-weighted histogram of the star particles in final zone, 
+	  |z| and [Fe/H] 
 	- minrgal : The minimum galactocentric radius in kpc 
 	- maxrgal : The maximum galactocentric radius in kpc 
 	- minabsz : The minimum |z| in kpc 
 	- maxabsz : The maximum |z| in kpc 
 	""" 
-	stars = stars.filter("zone_final", ">=", minrgal / 0.25) 
-	stars = stars.filter("zone_final", "<=", (maxrgal - 0.25) / 0.25) 
-	stars = stars.filter("abszfinal", ">=", minabsz) 
-	stars = stars.filter("abszfinal", "<=", maxabsz) 
-	stars = stars.filter("mass", ">", 0) 
-	dist = (len(BINS) - 1) * [0.] 
-	for i in range(len(dist)): 
-		fltrd_stars = stars.filter("[fe/h]", ">=", BINS[i]) 
-		fltrd_stars = fltrd_stars.filter("[fe/h]", "<=", BINS[i + 1]) 
-		dist[i] = sum(fltrd_stars["mass"]) 
-	norm = sum(dist) 
-	return [i / norm for i in dist] 
+	dist = cube.marginal("[fe/h]", rgal_final = (minrgal, maxrgal), 
+		abszfinal = (minabsz, maxabsz)) 
+	return dist / dist.sum() 
 
 
-def plot_mdf(ax, stars, minrgal, maxrgal, minabsz, maxabsz, color, 
+def plot_mdf(ax, cube, minrgal, maxrgal, minabsz, maxabsz, color, 
 	label = False): 
 	r""" 
 	Plot the MDF in [Fe/H] for a given range in Rgal and |z| 
@@ -74,7 +69,8 @@ def plot_mdf(ax, stars, minrgal, maxrgal, minabsz, maxabsz, color,
 	Parameters 
 	----------
 	- ax : The subplot to plot on 
-	- stars : The star particles from the VICE output 
+	- cube : The mass-weighted histogram of the star particles in final zone, 
+	  |z| and [Fe/H] 
 	- minrgal : The minimum galactocentric radius in kpc 
 	- maxrgal : The maximum galactocentric radius in kpc 
 	- minabsz : The minimum |z| in kpc 
@@ -83,7 +79,7 @@ def plot_mdf(ax, stars, minrgal, maxrgal, minabsz, maxabsz, color,
 	- label : Whether or not to label the lines for a legend 
 	""" 
 	centers = list(map(lambda x, y: (x + y) / 2, BINS[1:], BINS[:-1])) 
-	mdf = get_mdf(stars, minrgal, maxrgal, minabsz, maxabsz) 
+	mdf = get_mdf(cube, minrgal, maxrgal, minabsz, maxabsz) 
 	kwargs = {} 
 	if label: kwargs["label"] = r"%g $\leq R_\text{gal} \leq$ %g kpc" % (
 		minrgal, maxrgal) 
@@ -94,16 +90,22 @@ if __name__ == "__main__":
 	plt.clf() 
 	axes = setup_axes() 
 	out = vice.output(sys.argv[1]) 
-	extra = np.genfromtxt("%s_extra_tracer_data.out" % (out.name)) 
-	out.stars["abszfinal"] = [abs(row[-1]) for row in extra] 
+	out.stars["abszfinal"] = np.abs(analysis.zheights(out.name, out)) 
+	out.stars["rgal_final"] = analysis.disk_geometry.from_output(out).radius( 
+		out.stars["zone_final"]) 
 	zbins = [2, 1, 0.5, 0] 
 	rbins = [3, 5, 7, 9, 11, 13] 
+	cube = analysis.histogram_cube(out.stars, [ 
+		("rgal_final", rbins), 
+		("abszfinal", zbins[::-1]), 
+		("[fe/h]", BINS) 
+	]) 
 	colors = ["red", "gold", "green", "blue", "darkviolet"] 
 	for i in range(3): 
 		axes[i].text(-0.6, 0.15, r"%g $\leq \left|z\right| \leq$ %g kpc" % (
 			zbins[i + 1], zbins[i]), fontsize = 15)  
 		for j in range(5): 
-			plot_mdf(axes[i], out.stars, rbins[j], rbins[j + 1], 
+			plot_mdf(axes[i], cube, rbins[j], rbins[j + 1], 
 				zbins[i + 1], zbins[i], colors[j], 
 				label = i == 0) 
 	leg = axes[0].legend(loc = plots.mpltoolkit.mpl_loc("upper left"), 
@@ -16,6 +16,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../../..")) 
+import analysis 
 
 OFE_BINS = np.arange(-0.1, 0.51, 0.01).tolist() 
 XLIM = [-0.1, 0.5] 
@@ -68,11 +71,28 @@ def setup_axes():
 	return axes 
 
 
-def get_ofe_pdf(stars, min_rgal, max_rgal, minabsz, maxabsz, minFeH, maxFeH): 
+def get_cube(stars, radii, z): 
+	""" 
+	Get the mass-weighted histogram of the stars in final zone, |z|, [Fe/H] 
+	and [O/Fe] 
+
+	stars : the star particles from the VICE output 
+	radii : the edges of the galactocentric radius bins 
+	z : the edges of the |z| bins 
+	""" 
+	return analysis.histogram_cube(stars, [ 
+		("rgal_final", radii), 
+		("abszfinal", sorted(z)), 
+		("[fe/h]", sorted(set([i for row in FEH_BINS for i in row]))), 
+		("[o/fe]", OFE_BINS) 
+	]) 
+
+
+def get_ofe_pdf(cube, min_rgal, max_rgal, minabsz, maxabsz, minFeH, maxFeH): 
 	""" 
 	Get the PDF within the binspace 
 
-	stars : the dataframe of the stars from the VICE output 
+	cube : the mass-weighted histogram of the stars from get_cube 
 	min_rgal : the lower bound galactocentric radius 
 	max_rgal : the upper bound galactocentric radius 
 	minabsz : the lower bound |z| 
@@ -80,37 +100,31 @@ def get_ofe_pdf(stars, min_rgal, max_rgal, minabsz, maxabsz, minFeH, maxFeH):
 	min_FeH : The lower bound [Fe/H] to calculate the PDF for 
 	max_FeH : The upper bound [Fe/H] to calculate the PDF for 
 	"""	
-	stars = stars.filter("zone_final", ">=", min_rgal / 0.25) 
-	stars = stars.filter("zone_final", "<=", (max_rgal - 0.25) / 0.25) 
-	stars = stars.filter("abszfinal", ">=", minabsz) 
-	stars = stars.filter("abszfinal", "<=", maxabsz) 
-	stars = stars.filter("[fe/h]", ">=", minFeH) 
-	stars = stars.filter("[fe/h]", "<=", maxFeH) 
-	if len(stars["mass"]) >= len(OFE_BINS): 
-		dist = (len(OFE_BINS) - 1) * [0.0] 
-		for i in range(len(dist)): 
-			fltrd_stars = stars.filter("[o/fe]", ">=", OFE_BINS[i]) 
-			fltrd_stars = fltrd_stars.filter("[o/fe]", "<=", OFE_BINS[i + 1]) 
-			dist[i] += sum(fltrd_stars["mass"]) 
-		norm = sum(dist) 
-		return [i / norm for i in dist] 
+	ranges = { 
+		"rgal_final": 	(min_rgal, max_rgal), 
+		"abszfinal": 	(minabsz, maxabsz), 
+		"[fe/h]": 		(minFeH, maxFeH) 
+	} 
+	if cube.total(counts = True, **ranges) >= len(OFE_BINS): 
+		dist = cube.marginal("[o/fe]", **ranges) 
+		return dist / dist.sum() 
 	else: 
 		return 
 
 
-def plot_mdfs(ax, stars, min_rgal, max_rgal, minabsz, maxabsz, label = False): 
+def plot_mdfs(ax, cube, min_rgal, max_rgal, minabsz, maxabsz, label = False): 
 	""" 
 	Plot all MDFs for a given rgal - |z| bin 
 
 	ax : the subplot to plot on 
-	stars : the dataframe of the stars from the VICE output 
+	cube : the mass-weighted histogram of the stars from get_cube 
 	min_rgal : the minimum final galactocentric radius 
 	max_rgal : the maximum final galactocentric radius 
 	minabsz : the minimum final |z| 
 	maxabsz : the maximum final |z| 
 	""" 
 	for i in range(len(FEH_BINS)): 
-		dist = get_ofe_pdf(stars, min_rgal, max_rgal, minabsz, maxabsz, 
+		dist = get_ofe_pdf(cube, min_rgal, max_rgal, minabsz, maxabsz, 
 			FEH_BINS[i][0], FEH_BINS[i][1]) 
 		if dist is not None: 
 			kwargs = {
@@ -131,16 +145,17 @@ if __name__ == "__main__":
 	plt.clf() 
 	axes = setup_axes() 
 	out = vice.multioutput(sys.argv[1]) 
-	extra_tracer_data = np.genfromtxt("%s_extra_tracer_data.out" % (out.name)) 
-	out.stars["abszfinal"] = [abs(row[-1]) for row in 
-		extra_tracer_data[:out.stars.size[0]]] 
+	out.stars["abszfinal"] = np.abs(analysis.zheights(out.name, out)) 
+	out.stars["rgal_final"] = analysis.disk_geometry.from_output(out).radius( 
+		out.stars["zone_final"]) 
 	radii = [3, 5, 7, 9, 11, 13] 
 	z = [2, 1, 0.5, 0] 
+	cube = get_cube(out.stars, radii, z) 
 	for i in range(3): 
 		for j in range(5): 
 			# plot_mdfs(axes[i][j], out.stars, radii[j], radii[j + 1], 
 			# 	z[i + 1], z[i], label = i == 2 and j == 4) 
-			plot_mdfs(axes[i][j], out.stars, radii[j], radii[j + 1], 
+			plot_mdfs(axes[i][j], cube, radii[j], radii[j + 1], 
 				z[i + 1], z[i]) 
 	leg = axes[0][4].legend(loc = plots.mpltoolkit.mpl_loc("upper right"), 
 		ncol = 1, frameon = False, handlelength = 0, fontsize = 25) 
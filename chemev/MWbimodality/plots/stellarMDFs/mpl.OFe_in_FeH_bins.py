@@ -17,6 +17,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+import analysis 
 
 OFE_BINS = np.arange(0., 0.51, 0.01).tolist() 
 XLIM = [-0.02, 0.52] 
@@ -55,33 +58,39 @@ def setup_axes():
 	return axes 
 
 
-def get_ofe_pdf(stars, min_rgal, max_rgal, min_FeH, max_FeH): 
+def get_cube(stars): 
 	""" 
-	stars :: The dataframe of the stars from the VICE output 
+	stars :: The star particles to histogram in final radius, [Fe/H] and [O/Fe] 
+	""" 
+	return analysis.histogram_cube(stars, [ 
+		("rgal_final", [3, 5, 7, 9, 11, 13]), 
+		("[fe/h]", sorted(set([i for row in FEH_BINS for i in row]))), 
+		("[o/fe]", OFE_BINS) 
+	]) 
+
+
+def get_ofe_pdf(cube, min_rgal, max_rgal, min_FeH, max_FeH): 
+	""" 
+	cube :: The mass-weighted histogram of the stars from get_cube 
 	min_rgal :: The lower bound galactocentric radius 
 	max_rgal :: The upper bound galactocentric radius 
 	min_FeH :: The lower bound [Fe/H] to calculate the PDF for 
 	max_FeH :: The upper bound [Fe/H] to calculate the PDF for 
 	""" 
-	stars = stars.filter("zone_final", ">=", min_rgal / 0.25) 
-	stars = stars.filter("zone_final", "<=", (max_rgal - 0.25) / 0.25) 
-	stars = stars.filter("[fe/h]", ">=", min_FeH) 
-	stars = stars.filter("[fe/h]", "<=", max_FeH) 
-	if len(stars["mass"]) >= len(OFE_BINS): 
-		dist = (len(OFE_BINS) - 1) * [0.] 
-		for i in range(len(dist)): 
-			fltrd_stars = stars.filter("[o/fe]", ">=", OFE_BINS[i]) 
-			fltrd_stars = fltrd_stars.filter("[o/fe]", "<=", OFE_BINS[i + 1]) 
-			dist[i] += sum(fltrd_stars["mass"]) 
-		norm = sum(dist) 
-		return [i / norm for i in dist] 
+	ranges = { 
+		"rgal_final": 	(min_rgal, max_rgal), 
+		"[fe/h]": 		(min_FeH, max_FeH) 
+	} 
+	if cube.total(counts = True, **ranges) >= len(OFE_BINS): 
+		dist = cube.marginal("[o/fe]", **ranges) 
+		return dist / dist.sum() 
 	else: 
 		return  
 
 
-def plot_pdfs(ax, stars, min_rgal, max_rgal, label = False): 
+def plot_pdfs(ax, cube, min_rgal, max_rgal, label = False): 
 	for i in range(len(FEH_BINS)): 
-		dist = get_ofe_pdf(stars, min_rgal, max_rgal, FEH_BINS[i][0], 
+		dist = get_ofe_pdf(cube, min_rgal, max_rgal, FEH_BINS[i][0], 
 			FEH_BINS[i][1]) 
 		if dist is not None: 
 			kwargs = {
@@ -104,15 +113,17 @@ if __name__ == "__main__":
 	for i in extra_tracer_data: 
 		if i[-1] == 100: i[-1] = 0 
 	out.tracers["zfinal"] = [row[-1] for row in extra_tracer_data[:out.tracers.size[0]]] 
-	stars = out.tracers.filter("zfinal", ">=", -3.) 
-	stars = stars.filter("zfinal", "<=", 3.) 
-	stars = stars.filter("mass", ">", 0) 
+	out.tracers["rgal_final"] = analysis.disk_geometry.from_output(out).radius( 
+		out.tracers["zone_final"]) 
+	stars = analysis.star_query(out.tracers).where(zfinal = (-3, 3)).filter( 
+		"mass", ">", 0) 
 	print("Number of stars: %d" % (len(stars["mass"]))) 
-	plot_pdfs(axes[0], stars, 3, 5) 
-	plot_pdfs(axes[1], stars, 5, 7) 
-	plot_pdfs(axes[2], stars, 7, 9) 
-	plot_pdfs(axes[3], stars, 9, 11) 
-	plot_pdfs(axes[4], stars, 11, 13, label = True) 
+	cube = get_cube(stars) 
+	plot_pdfs(axes[0], cube, 3, 5) 
+	plot_pdfs(axes[1], cube, 5, 7) 
+	plot_pdfs(axes[2], cube, 7, 9) 
+	plot_pdfs(axes[3], cube, 9, 11) 
+	plot_pdfs(axes[4], cube, 11, 13, label = True) 
 	leg = axes[4].legend(loc = plots.mpltoolkit.mpl_loc("upper right"), ncol = 1, 
 		frameon = False, handlelength = 0, fontsize = 25) 
 	for i in range(len(leg.get_texts())): 
@@ -16,6 +16,9 @@ import math as m
 import vice 
 import sys 
 import os 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+from analysis import history_cube 
 
 CMAP = "plasma" 
 XLIM = [-1, 14] 
@@ -47,14 +50,16 @@ def plot_tau_star(ax, out):
 		The multioutput object from the VICE simulation. 
 	""" 
 	cmap = plt.get_cmap(CMAP) 
-	for i in range(int(15.5 / 0.25)): 
-		tau_star = list(map(lambda x, y: 1.e-9 * x / y if y else float("nan"), 
-			out.zones["zone%d" % (i)].history["mgas"], 
-			out.zones["zone%d" % (i)].history["sfr"])) 
-		ax.plot(out.zones["zone%d" % (i)].history["time"], 
-			tau_star, c = cmap((0.25 * i + 0.125) / 15.5))
+	cube = history_cube(out, keys = ["time", "mgas", "sfr"]) 
+	geometry = cube.geometry 
+	with np.errstate(divide = "ignore", invalid = "ignore"): 
+		tau_star = np.where(cube["sfr"] != 0, 1.e-9 * cube["mgas"] / cube["sfr"], 
+			float("nan")) 
+	for i in range(geometry.n_active): 
+		ax.plot(cube["time"][i], tau_star[i], 
+			c = cmap(geometry.radius(i) / geometry.cutoff)) 
 	sm = plt.cm.ScalarMappable(cmap = cmap, norm = plt.Normalize(vmin = 0, 
-		vmax = 15.5)) 
+		vmax = geometry.cutoff)) 
 	cbar = plt.colorbar(sm, cax = plots.mpltoolkit.append_axes(ax), pad = 0) 
 	cbar.set_label(r"$R_\text{gal}$ [kpc]") 
 
@@ -0,0 +1,69 @@
+r""" 
+Bin lookup routines shared by the tracer particle classes and the disk models. 
+Both routines find the bin a value falls into with a binary search over the 
+bin edges rather than a linear scan. 
+""" 
+
+__all__ = ["get_bin_number", "get_bin_numbers"] 
+import numpy as np 
+
+
+def get_bin_number(bins, val): 
+	r""" 
+	Get the bin number of a given value in a given binspace. 
+
+	Parameters 
+	---------- 
+	bins : array-like 
+		The bin edges. Assumed to be sorted in ascending order. Passing a 
+		``numpy.ndarray`` avoids a conversion on every call. 
+	val : real number 
+		The value whose bin number is to be found. 
+
+	Returns 
+	------- 
+	bin : int 
+		The index ``i`` of the first bin satisfying 
+		``bins[i] <= val <= bins[i + 1]``. -1 if the value does not lie within 
+		the binspace. 
+	""" 
+	bins = np.asarray(bins) 
+	idx = int(np.searchsorted(bins, val, side = "left")) 
+	if idx == 0: 
+		return 0 if val == bins[0] else -1 
+	elif idx == len(bins): 
+		return -1 
+	else: 
+		return idx - 1 
+
+
+def get_bin_numbers(bins, vals): 
+	r""" 
+	Get the bin numbers of an array of values in a given binspace. 
+
+	Parameters 
+	---------- 
+	bins : array-like 
+		The bin edges. Assumed to be sorted in ascending order. 
+	vals : real number or array-like 
+		The values whose bin numbers are to be found. 
+
+	Returns 
+	------- 
+	bins : int or numpy.ndarray 
+		The bin number of each value, with the same semantics as 
+		``get_bin_number``: closed intervals, the lower bin taking precedence on 
+		shared edges, and -1 for values outside of the binspace. An int if 
+		``vals`` is a single value. 
+	""" 
+	bins = np.asarray(bins) 
+	scalar = np.ndim(vals) == 0 
+	vals = np.atleast_1d(vals) 
+	idx = np.searchsorted(bins, vals, side = "left").astype(np.intp) 
+	result = idx - 1 
+	result[idx == len(bins)] = -1 
+	result[(idx == 0) & (vals == bins[0])] = 0 
+	if scalar: 
+		return int(result[0]) 
+	else: 
+		return result 
@@ -0,0 +1,149 @@
+r""" 
+Restartable runs of multizone models. A checkpoint record is kept next to 
+the output recording what is being run, the state of the migration 
+scheme's random number stream when it started, and whether or not it 
+finished. The model integrates into a staging directory which replaces the 
+output only once the run is complete, so that an interrupted run never 
+leaves a partial output behind which looks finished. 
+
+When a job is restarted (e.g. after preemption by a batch queue), a run 
+which already finished with the same settings is not repeated, and one 
+which was interrupted is rerun from the recorded random number stream 
+state, such that it assigns exactly the same analogs to its star particles 
+as the first attempt did. 
+""" 
+
+__all__ = ["run", "status"] 
+import numpy as np 
+import hashlib 
+import shutil 
+import json 
+import time 
+import vice 
+import sys 
+import os 
+# the atomic file writes are shared with the analysis routines 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"..")) 
+from utils import atomic_write 
+
+
+def run(mz, times, key = None, resume = True): 
+	r""" 
+	Run a multizone model with a checkpoint record. 
+
+	Parameters 
+	---------- 
+	mz : ``vice.multizone`` 
+		The model, with its migration settings in place. 
+	times : array-like 
+		The output times. 
+	key : str [default : None] 
+		Anything else identifying the model (e.g. the hash of its 
+		``diskspec`` specification and the settings and seed of its 
+		migration scheme). Runs with different output times, numbers of 
+		zones or star particles, migration scheme classes, or keys are never 
+		mistaken for one another. 
+	resume : bool [default : True] 
+		Whether or not to pick up from the checkpoint record of a previous 
+		attempt with the same settings. If False, the model is always run 
+		from scratch. 
+
+	Returns 
+	------- 
+	ran : bool 
+		False if the output of a previous successful run was kept, True 
+		otherwise. 
+
+	Notes 
+	----- 
+	The record is written to "<name>.checkpoint.json". If the star particle 
+	migration scheme has an ``rng`` attribute (e.g. a ``tracers.UWhydro`` 
+	object), its state is saved there before the run starts and restored 
+	from there when an interrupted run is retried. If the scheme is a 
+	context manager (i.e. it writes extra tracer data), the run takes place 
+	within it, such that its output file is flushed and closed whether or 
+	not the run succeeds. 
+	""" 
+	times = np.asarray(times, dtype = np.float64) 
+	name = mz.name 
+	filename = "%s.checkpoint.json" % (name) 
+	digest = _key(mz, times, key) 
+	record = status(name) 
+	stream = getattr(mz.migration.stars, "rng", None) 
+	if resume and record is not None and record["key"] == digest: 
+		if record["status"] == "complete" and os.path.exists("%s.vice" % ( 
+			name)): 
+			print("Keeping the finished output of %s" % (name)) 
+			return False 
+		else: pass 
+		if stream is not None and record["rng"] is not None: 
+			print("Resuming %s from attempt %d" % (name, record["attempts"])) 
+			stream.state = record["rng"] 
+		else: pass 
+		record["attempts"] += 1 
+	else: 
+		record = { 
+			"key": 			digest, 
+			"rng": 			None if stream is None else stream.state, 
+			"attempts": 	1 
+		} 
+	record["status"] = "running" 
+	record["started"] = time.time() 
+	_dump(record, filename) 
+
+	staging = "%s.partial" % (name) 
+	mz.name = staging 
+	try: 
+		# bypass the run method of subclasses, which may call this function 
+		if hasattr(mz.migration.stars, "__enter__"): 
+			with mz.migration.stars: 
+				vice.multizone.run(mz, times, overwrite = True) 
+		else: 
+			vice.multizone.run(mz, times, overwrite = True) 
+	finally: 
+		mz.name = name 
+	if os.path.exists("%s.vice" % (name)): 
+		shutil.rmtree("%s.vice" % (name)) 
+	else: pass 
+	os.replace("%s.vice" % (staging), "%s.vice" % (name)) 
+	record["status"] = "complete" 
+	record["finished"] = time.time() 
+	_dump(record, filename) 
+	return True 
+
+
+def status(name): 
+	r""" 
+	Get the checkpoint record of a model. 
+
+	Parameters 
+	---------- 
+	name : str 
+		The name of the model's output. 
+
+	Returns 
+	------- 
+	record : dict or None 
+		The record, None if there is none. Its "status" is "complete" if the 
+		run finished and "running" if it is under way or was interrupted. 
+	""" 
+	filename = "%s.checkpoint.json" % (name) 
+	if os.path.exists(filename): 
+		with open(filename, 'r') as f: 
+			return json.load(f) 
+	else: 
+		return None 
+
+
+def _key(mz, times, key): 
+	sha = hashlib.sha1() 
+	sha.update(times.tobytes()) 
+	sha.update(("%d_%d_%s_%s" % (mz.n_zones, mz.n_stars, 
+		type(mz.migration.stars).__name__, key)).encode()) 
+	return sha.hexdigest()[:16] 
+
+
+def _dump(record, filename): 
+	with atomic_write(filename) as f: 
+		json.dump(record, f, indent = 4) 
@@ -1,5 +1,8 @@
 r""" 
 Routines common to the multizone simulations in written here. 
+
+The radial profiles accept either a single radius or an array of them, such 
+that the value for every zone of a model can be computed in one call. 
 """ 
 
 __all__ = ["TIME_BINS", "RAD_BINS", "ZONE_WIDTH", "eta", "tau_star", 
@@ -22,18 +25,24 @@ def eta(rgal, corrective = 0):
 
 	Parameters 
 	----------
-	rgal : real number 
+	rgal : real number or array-like 
 		Galactocentric radius in kpc 
-	corrective : real number [default : 0] 
+	corrective : real number or array-like [default : 0] 
 		The corrective term to account for tau_star / tau_sfh 
 
 	Returns 
 	-------
-	eta : real number 
+	eta : real number or numpy.ndarray 
 		The mass loading factor at that radius. 
+
+	Notes 
+	----- 
+	The CCSN yield of oxygen and its solar abundance are looked up once per 
+	call, so profiles should be computed by passing all radii at once. 
 	""" 
-	return vice.yields.ccsne.settings['o'] / vice.solar_z['o'] * (
-		10**(0.06 * (rgal - 4) - 0.3)) - 0.6 + corrective
+	norm = vice.yields.ccsne.settings['o'] / vice.solar_z['o'] 
+	if np.ndim(rgal): rgal = np.asarray(rgal, dtype = np.float64) 
+	return norm * 10**(0.06 * (rgal - 4) - 0.3) - 0.6 + corrective 
 
 
 def tau_star(rgal, norm = 2, scale = 3): 
@@ -43,7 +52,7 @@ def tau_star(rgal, norm = 2, scale = 3):
 
 	Parameters 
 	----------
-	rgal : real number 
+	rgal : real number or array-like 
 		Galactocentric radius in kpc 
 	norm : real number [default : 2] 
 		The value of :math:`\tau_\star` at r = 0. 
@@ -52,7 +61,7 @@ def tau_star(rgal, norm = 2, scale = 3):
 
 	Returns 
 	-------
-	t : real number 
+	t : real number or numpy.ndarray 
 		:math:`\tau_\star` at the specified radius 
 
 	Notes 
@@ -64,7 +73,10 @@ def tau_star(rgal, norm = 2, scale = 3):
 	where :math:`r_\text{s}` is the scale radius, :math:`A` is the norm, and 
 	:math:`r` is the galactocentric radius. 
 	""" 
-	return norm * m.exp(rgal / (2 * scale)) 
+	if np.ndim(rgal): 
+		return norm * np.exp(np.asarray(rgal, dtype = np.float64) / (2 * scale)) 
+	else: 
+		return norm * m.exp(rgal / (2 * scale)) 
 	# return norm * m.exp(rgal / (5 * scale)) 
 	# return norm * m.exp(rgal / (0.75 * scale)) 
 
@@ -75,19 +87,29 @@ def harmonic_timescale(t1, t2):
 
 	Parameters 
 	----------
-	t1 : real number 
+	t1 : real number or array-like 
 		The first timescale. 
-	t2 : real number 
+	t2 : real number or array-like 
 		The second timescale. 
 
 	Returns 
 	-------
-	tau : real number 
+	tau : real number or numpy.ndarray 
 		The harmonic timescale defined by: 
 
 		.. math:: \tau \equiv \left(t1^{-1} - t2^{-1}\right)^{-1} 
+
+		Zero where either timescale is zero. 
 	""" 
-	if t1 and t2: 
+	if np.ndim(t1) or np.ndim(t2): 
+		t1, t2 = np.broadcast_arrays(np.asarray(t1, dtype = np.float64), 
+			np.asarray(t2, dtype = np.float64)) 
+		result = np.zeros(t1.shape) 
+		nonzero = (t1 != 0) & (t2 != 0) 
+		with np.errstate(divide = "ignore"): 
+			result[nonzero] = (1 / t1[nonzero] - 1 / t2[nonzero])**(-1) 
+		return result 
+	elif t1 and t2: 
 		return (1 / t1 - 1 / t2)**(-1) 
 	else: 
 		return 0 
@@ -99,18 +121,22 @@ def depletion_time(tau_star, eta = 2.5, r = 0.4):
 
 	Parameters 
 	----------
-	tau_star : real number 
+	tau_star : real number or array-like 
 		The star formation efficiency timescale 
-	eta : real number [default : 2.5] 
+	eta : real number or array-like [default : 2.5] 
 		The mass loading factor 
 	r : real number [default : 0.4] 
 		The recycling parameter 
 
 	Returns 
 	-------
-	tau_dep : real number 
+	tau_dep : real number or numpy.ndarray 
 		The depletion timescale defined by: 
 
 		.. math:: \tau_\text{dep} \equiv \frac{\tau_\star}{1 + \eta - r} 
 	""" 
+	if np.ndim(tau_star) or np.ndim(eta): 
+		tau_star = np.asarray(tau_star, dtype = np.float64) 
+		eta = np.asarray(eta, dtype = np.float64) 
+	else: pass 
 	return tau_star / (1 + eta - r) 
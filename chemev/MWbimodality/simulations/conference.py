@@ -10,7 +10,12 @@ ARGV
 
 # import tracers 
 import gas_disks 
+import binning 
+import writer 
+import diskspec 
+import checkpoint 
 import common 
+from common import eta, tau_star, harmonic_timescale 
 import numpy as np 
 import math as m 
 import vice 
@@ -42,7 +47,94 @@ TSWITCH = 2. # linear to exponential switch in Gyr
 REFF = 6. # The present-day effective radius of the disk galaxy 
 # MGSCHMIDT0 = 1.e6 
 
-SANCHEZ_TAU_SFH_DATA = np.genfromtxt("sanchez_tau_sfh.dat").tolist() 
+
+
+class tau_sfh_table(object): 
+
+	r""" 
+	The e-folding timescale of the star formation history as a function of 
+	galactocentric radius, interpolated from a table of timescales at radii 
+	in units of the effective radius. 
+
+	Parameters 
+	----------
+	filename : str 
+		The file containing the table: radii in units of the effective radius 
+		in the first column and timescales in Gyr in the second, in order of 
+		increasing radius. It is read the first time the timescale is needed. 
+	Re : real number [default : REFF] 
+		The effective radius in kpc. 
+
+	Notes 
+	----- 
+	Radii outside of the table are extrapolated linearly from its last two 
+	entries. Timescales at individual radii are memoized, since the star 
+	formation history classes of every zone look them up several times. 
+	""" 
+
+	def __init__(self, filename, Re = REFF): 
+		self._filename = filename 
+		self._Re = Re 
+		self._radii = None 
+		self._timescales = None 
+		self._memo = {} 
+
+	def __call__(self, rgal): 
+		r""" 
+		Get the timescale at one or more radii. 
+
+		Parameters 
+		----------
+		rgal : real number or array-like 
+			Galactocentric radius in kpc. 
+
+		Returns 
+		-------
+		tau_sfh : float or numpy.ndarray 
+			The timescale(s) in Gyr. 
+		""" 
+		if np.ndim(rgal): 
+			return self._interpolate(np.asarray(rgal, dtype = np.float64)) 
+		elif rgal in self._memo: 
+			return self._memo[rgal] 
+		else: 
+			self._memo[rgal] = float(self._interpolate(np.array([rgal]))[0]) 
+			return self._memo[rgal] 
+
+	@property 
+	def radii(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The tabulated radii in units of the effective radius. 
+		""" 
+		if self._radii is None: self._load() 
+		return self._radii 
+
+	@property 
+	def timescales(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The tabulated timescales in Gyr. 
+		""" 
+		if self._timescales is None: self._load() 
+		return self._timescales 
+
+	def _load(self): 
+		data = np.genfromtxt(self._filename) 
+		self._radii = np.ascontiguousarray(data[:, 0]) 
+		self._timescales = np.ascontiguousarray(data[:, 1]) 
+
+	def _interpolate(self, rgal): 
+		Re = self.radii 
+		tau = self.timescales 
+		x = to_Re(rgal, Re = self._Re) 
+		result = np.interp(x, Re, tau) 
+		outside = (x < Re[0]) | (x > Re[-1]) 
+		result[outside] = interpolate(Re[-2], Re[-1], tau[-2], tau[-1], 
+			x[outside]) 
+		return result 
 
 
 def interpolate(x1, x2, y1, y2, x): 
@@ -66,9 +158,12 @@ def to_Re(rgal, Re = 6):
 
 
 def get_bin_number(val, bins): 
-	for i in range(len(bins) - 1): 
-		if bins[i] <= val <= bins[i + 1]: return i 
-	return -1 
+	return binning.get_bin_number(bins, val) 
+
+
+# The Sanchez (2020) timescales 
+TAU_SFH = tau_sfh_table("%s/sanchez_tau_sfh.dat" % ( 
+	os.path.dirname(os.path.abspath(__file__)))) 
 
 
 def tau_in(rgal): 
@@ -79,31 +174,7 @@ def tau_in(rgal):
 	return 3 + (rgal + 1e-12) / 2.5 
 
 
-def harmonic_timescale(t1, t2): 
-	r""" 
-	Calculate a harmonic timescale. 
-
-	Parameters 
-	----------
-	t1 : real number 
-		The first timescale. 
-	t2 : real number 
-		The second timescale. 
-
-	Returns 
-	-------
-	tau : real number 
-		The harmonic timescale defined by: 
-
-		.. math:: \tau \equiv \left(t1^{-1} - t2^{-1}\right)^{-1} 
-	""" 
-	if t1 and t2: 
-		return (1 / t1 - 1 / t2)**(-1) 
-	else: 
-		return 0 
-
-
-class sfe: 
+class sfe(gas_disks.history): 
 
 	r""" 
 	SFE timescale as a function of time at a given galactocentric radius. 
@@ -120,8 +191,8 @@ class sfe:
 		else: 
 			self._tstar = 1.e6 
 
-	def __call__(self, time): 
-		return self._tstar 
+	def _evaluate(self, time): 
+		return np.full(np.shape(time), self._tstar) 
 
 	@staticmethod 
 	def amp_ratio(): 
@@ -164,22 +235,20 @@ class sfe:
 # 				-(time - TIME_SWITCH) / tau_in(self._rgal)) 
 
 
-class star_formation_history: 
+class star_formation_history(gas_disks.history): 
 
 	def __init__(self, rgal): 
 		self._timescale = star_formation_history.tau_sfh(rgal) 
 		self._norm = self.norm(rgal) 
 
-	def __call__(self, time): 
+	def _evaluate(self, time): 
 		# linear-exponential form 
-		# return self._norm * time * m.exp(-time / self._timescale) 
+		# return self._norm * time * np.exp(-time / self._timescale) 
 
 		# linear-then-exponential form 
-		if time <= TSWITCH: 
-			return self._norm * time 
-		else: 
-			return self._norm * TSWITCH * m.exp(-(time - TSWITCH) / 
-				self._timescale) 
+		return np.where(time <= TSWITCH, self._norm * time, 
+			self._norm * TSWITCH * np.exp(-(time - TSWITCH) / 
+				self._timescale)) 
 
 	@property 
 	def timescale(self): 
@@ -206,15 +275,7 @@ class star_formation_history:
 		# return 3 + (rgal + 1e-12) / 2.5 
 
 		# The Sanchez (2020) timescales 
-		Re = [i[0] for i in SANCHEZ_TAU_SFH_DATA] 
-		tau = [i[1] for i in SANCHEZ_TAU_SFH_DATA] 
-		rgal = to_Re(rgal) 
-		bin_ = get_bin_number(rgal, Re) 
-		if bin_ != -1: 
-			return interpolate(Re[bin_], Re[bin_ + 1], tau[bin_], tau[bin_ + 1], 
-				rgal) 
-		else: 
-			return interpolate(Re[-2], Re[-1], tau[-2], tau[-1], rgal) 
+		return TAU_SFH(rgal) 
 
 
 	def norm(self, rgal): 
@@ -242,17 +303,16 @@ class star_formation_history:
 		# )**(-1) * rgal * m.exp(-rgal / RS_MOL) 
 
 		# norm for linear-then-exponential evolution 
+		tau_sfh = star_formation_history.tau_sfh(rgal) 
 		return rgal * m.exp(-rgal / RS_MOL) * ZONE_WIDTH * (
 			0.5 * TSWITCH**2 + 
-			TSWITCH * star_formation_history.tau_sfh(rgal) * (
-				1 - m.exp(-(TIME_BINS[-1] - TSWITCH) / 
-					star_formation_history.tau_sfh(rgal)
-				) 
+			TSWITCH * tau_sfh * ( 
+				1 - m.exp(-(TIME_BINS[-1] - TSWITCH) / tau_sfh) 
 			) 
 		)**(-1) 
 
 
-class fiducial_sfh: 
+class fiducial_sfh(gas_disks.history): 
 
 	def __init__(self, rgal): 
 		self._tau_rise = 2 
@@ -265,9 +325,9 @@ class fiducial_sfh:
 				self._tau_rise * self._timescale))) 
 		)**(-1) * 3 
 
-	def __call__(self, time): 
-		return self._norm * m.exp(-time / self._timescale) * (1 - 
-			m.exp(-time / self._tau_rise)) 
+	def _evaluate(self, time): 
+		return self._norm * np.exp(-time / self._timescale) * (1 - 
+			np.exp(-time / self._tau_rise)) 
 
 	@property 
 	def timescale(self): 
@@ -280,15 +340,15 @@ class fiducial_sfh_with_lateburst(fiducial_sfh):
 		super().__init__(rgal) 
 		self._tmax = 10.8
 		self._width = 1 
-		self._a = super().__call__(self._tmax) 
+		self._a = float(super()._evaluate(self._tmax)) 
 
-	def __call__(self, time): 
-		return 0.91 * (super().__call__(time) + self._a * m.exp(
+	def _evaluate(self, time): 
+		return 0.91 * (super()._evaluate(time) + self._a * np.exp( 
 			-(time - self._tmax)**2 / (2 * self._width)**2 
 		))
 
 
-class constant_sfh: 
+class constant_sfh(gas_disks.history): 
 
 	r""" 
 	Constant star formation history embedded within the molecular plus 
@@ -299,21 +359,21 @@ class constant_sfh:
 		self._mdotstar0 = 1. 
 		self._rgal = rgal 
 
-	def __call__(self, time): 
-		return self._mdotstar0 * 2 * m.pi * self._rgal * m.exp(-self._rgal / 
-			RS_MOL) * ZONE_WIDTH 
+	def _evaluate(self, time): 
+		return np.full(np.shape(time), self._mdotstar0 * 2 * m.pi * 
+			self._rgal * m.exp(-self._rgal / RS_MOL) * ZONE_WIDTH) 
 
 
-class constant_gas: 
+class constant_gas(gas_disks.history): 
 
 	def __init__(self, rgal): 
 		self._mass = 1.e8 * rgal * m.exp(-rgal / RSCALE) 
 
-	def __call__(self, time): 
-		return self._mass 
+	def _evaluate(self, time): 
+		return np.full(np.shape(time), self._mass) 
 
 
-class infall_history: 
+class infall_history(gas_disks.history): 
 
 	r""" 
 	The functional form of the infall history in Msun/yr at a given 
@@ -345,8 +405,8 @@ class infall_history:
 		)**(-1) 
 
 
-	def __call__(self, time): 
-		return self._norm * m.exp(-time / self._tau_in) 
+	def _evaluate(self, time): 
+		return self._norm * np.exp(-time / self._tau_in) 
 
 	@property 
 	def timescale(self): 
@@ -361,14 +421,18 @@ class diskmigration(hydrodisk.hydrodiskstars):
 	to an output file. 
 	""" 
 
-	def __init__(self, radbins, mode = "linear", filename = "stars.out"): 
+	def __init__(self, radbins, mode = "linear", filename = "stars.out", 
+		sink = None): 
 		super().__init__(radbins, mode = mode) 
-		if isinstance(filename, str): 
-			self._file = open(filename, 'w') 
-			self._file.write("# zone_origin\ttime_origin\tzfinal\n") 
-		else: 
-			raise TypeError("Filename must be a string. Got: %s" % (
-				type(filename))) 
+		# the highest zone number of the model, if its inactive outer zones 
+		# are collapsed into one 
+		self._sink = sink 
+		self._writer = writer.tracer_writer(filename, [ 
+			("zone_origin", np.int32, "%d"), 
+			("time_origin", np.float64, "%.2f"), 
+			("zfinal", np.float64, "%.2f") 
+		]) 
+		self._zfinal = self.analog_data["zfinal"] 
 
 		# Multizone object automatically swaps this to True in setting up 
 		# its stellar population zone histories 
@@ -381,19 +445,28 @@ class diskmigration(hydrodisk.hydrodiskstars):
 				if self.analog_index == -1: 
 					finalz = 100 
 				else: 
-					finalz = self.analog_data["zfinal"][self.analog_index] 
-				self._file.write("%d\t%.2f\t%.2f\n" % (zone, tform, finalz)) 
+					finalz = self._zfinal[self.analog_index] 
+				self._writer.write(zone, tform, finalz) 
 			else: pass 
 			return zone 
+		elif self._sink is not None: 
+			return min(super().__call__(zone, tform, time), self._sink) 
 		else: 
 			return super().__call__(zone, tform, time) 
 
 	def close_file(self): 
 		r""" 
 		Closes the output file - should be called after the multizone model 
-		simulation runs. 
+		simulation runs, unless this object is used as a context manager. 
 		""" 
-		self._file.close() 
+		self._writer.close() 
+
+	def __enter__(self): 
+		return self 
+
+	def __exit__(self, exc_type, exc_value, exc_tb): 
+		self.close_file() 
+		return False 
 
 	@property 
 	def write(self): 
@@ -413,123 +486,129 @@ class diskmigration(hydrodisk.hydrodiskstars):
 			raise TypeError("Must be a boolean. Got: %s" % (type(value))) 
 
 
-class diskmodel(vice.multizone): 
-
-	def __init__(self): 
-		super().__init__(
-			name = sys.argv[1], 
-			n_zones = len(RAD_BINS) - 1, 
-			n_stars = int(sys.argv[2]), 
-			verbose = True, 
-			simple = False) 
-		# self.migration.stars = tracers.UWhydro(TIME_BINS, RAD_BINS, 
-		# 	n_stars = self.n_stars, 
-		# 	filename = "%s_extra_tracer_data.out" % (self.name)) 
-		# self.migration.stars = hydrodisk.hydrodiskstars(RAD_BINS) 
-		self.migration.stars = diskmigration(RAD_BINS, 
-			filename = "%s_extra_tracer_data.out" % (sys.argv[1])) 
-		for i in range(self.n_zones): 
-			# self.zones[i].func = infall_history(ZONE_WIDTH * (i + 0.5)) 
-			# self.zones[i].mode = "ifr" 
-			# self.zones[i].func = star_formation_history(ZONE_WIDTH * (i + 0.5)) 
-			# self.zones[i].func = constant_sfh(ZONE_WIDTH * (i + 0.5)) 
-			# self.zones[i].func = fiducial_sfh(ZONE_WIDTH * (i + 0.5)) 
-			self.zones[i].func = fiducial_sfh_with_lateburst(
-				ZONE_WIDTH * (i + 0.5)) 
-			self.zones[i].mode = "sfr" 
-			# self.zones[i].func = constant_gas(ZONE_WIDTH * (i + 0.5)) 
-			# self.zones[i].mode = "gas" 
-			self.bins = np.linspace(-3, 1, 401) 
-			self.zones[i].elements = ["fe", "o"] 
-			self.zones[i].dt = DT 
-			self.zones[i].Mg0 = 0 
-			self.zones[i].schmidt = True 
-			# self.zones[i].schmidt = False 
-			# if i: 
-			# 	self.zones[i].MgSchmidt = MGSCHMIDT0 * (RAD_BINS[i + 1]**2 - 
-			# 		RAD_BINS[i]**2) / RAD_BINS[1]**2 
-			# else: 
-			# 	self.zones[i].MgSchmidt = MGSCHMIDT0 
-			self.zones[i].MgSchmidt = 1.e7 * m.pi * (RAD_BINS[i + 1]**2 - 
-				RAD_BINS[i]**2) 
-			self.zones[i].schmidt_index = 0.85 
-			if i > 61: 
-				self.zones[i].func = lambda t: 0 
-				self.zones[i].tau_star = 1.e6 
-				self.zones[i].eta = 100 
-				for j in self.zones[i].elements: 
-					self.zones[i].entrainment.agb[j] = 0 
-					self.zones[i].entrainment.ccsne[j] = 0 
-					self.zones[i].entrainment.sneia[j] = 0 
-			else: 
-				# self.zones[i].tau_star = sfe(ZONE_WIDTH * (i + 0.5)) 
-				# self.zones[i].eta = eta(ZONE_WIDTH * (i + 0.5), 
-				# 	corrective = (self.zones[i].tau_star(0) / 
-				# 		self.zones[i].func.timescale)
-				# 	) 
-				self.zones[i].tau_star = TAU_STAR_MOL 
-				# self.zones[i].tau_star = tau_star(ZONE_WIDTH * (i + 0.5), 
-				# 	norm = TAU_STAR_MOL) 
-				self.zones[i].eta = eta(ZONE_WIDTH * (i + 0.5), 
-					# corrective = self.zones[0].tau_star / 
-					# 	self.zones[i].func.timescale 
-					corrective = 0 
-					) 
-
-	def run(self): 
-		super().run(np.linspace(0, 12.8, 257), overwrite = True) 
-		self.migration.stars.close_file() 
-		# pass 
-
-
-def tau_star(rgal, norm = 2): 
+def zone_spec(sfh = "fiducial_sfh_with_lateburst", mode = "sfr", 
+	tau_star = TAU_STAR_MOL, corrective = 0, inactive = "keep"): 
 	r""" 
-	The mathematical relation between galactocentric radius in kpc and the 
-	SFE timescale :math:`\tau_\star`. 
+	The ``diskspec`` specification of the zones of the inside-out disk model. 
 
 	Parameters 
 	----------
-	rgal : real number 
-		Galactocentric radius in kpc 
-	norm : real number [default : 2] 
-		The value of :math:`\tau_\star` at r = 0. 
+	sfh : str or type [default : "fiducial_sfh_with_lateburst"] 
+		The class in this module describing the evolution of each zone, 
+		constructed from the galactocentric radius of the zone, or its name. 
+	mode : str [default : "sfr"] 
+		The mode of each zone, i.e. what the ``sfh`` class describes. 
+	tau_star : real number [default : TAU_STAR_MOL] 
+		The SFE timescale of the star forming zones in Gyr. 
+	corrective : real number [default : 0] 
+		The corrective term added to the mass loading factor. 
+	inactive : str [default : "keep"] 
+		"keep" to integrate the zones beyond R_SF individually, or "sink" to 
+		collapse them into a single zone collecting the stars which migrate 
+		there. 
 
 	Returns 
 	-------
-	t : real number 
-		:math:`\tau_\star` at the specified radius 
-
-	Notes 
-	----- 
-	The mathematical relation describing :math:`\tau_\star`: 
-
-	.. math:: \tau_\star = A e^{-r/2r_\text{s}} 
-
-	where :math:`r_\text{s}` is the scale radius, :math:`A` is the norm, 
-	and :math:`r` is the galactocentric radius. 
+	spec : dict 
+		The specification. 
 	""" 
-	return norm * m.exp(rgal / (2 * RSCALE)) 
+	if not isinstance(sfh, str): sfh = sfh.__name__ 
+	return diskspec.complete({ 
+		"zone_width": 		ZONE_WIDTH, 
+		"cutoff": 			R_SF, 
+		"sfh": 				{"family": "conference.%s" % (sfh), "mode": mode}, 
+		"tau_star": 		tau_star, 
+		"eta": 				{"profile": "eta", "corrective": corrective}, 
+		"elements": 		["fe", "o"], 
+		"dt": 				DT, 
+		"Mg0": 				0, 
+		"schmidt": 			True, 
+		"schmidt_index": 	0.85, 
+		"MgSchmidt": 		{"profile": "area", "density": 1.e7}, 
+		"inactive": 		{"mode": inactive, "tau_star": 1.e6, "eta": 100} 
+	}) 
+
 
+class diskmodel(vice.multizone): 
 
-def eta(rgal, corrective = 0): 
 	r""" 
-	The mathematical relation between galactocentric radius in kpc and the 
-	mass loading factor. 
+	The inside-out disk model. 
 
 	Parameters 
 	----------
-	rgal : real number 
-		Galactocentric radius in kpc 
-	corrective : real number [default : 0] 
-		The corrective term to account for tau_star / tau_sfh  
-
-	Returns 
-	-------
-	eta : real number 
-		The mass loading factor at that radius. 
+	name : str [default : "diskmodel"] 
+		The name of the output. 
+	n_stars : int [default : 4] 
+		The number of star particles per zone per timestep. 
+	migration_mode : str [default : "linear"] 
+		The mode of the ``hydrodiskstars`` migration scheme. 
+	spec : dict or str [default : None] 
+		The ``diskspec`` specification of the zones, or the name of a file 
+		containing one. None to build it from the remaining keyword arguments 
+		with ``zone_spec``. 
+	kwargs : varying types 
+		Keyword arguments passed to ``zone_spec`` (i.e. sfh, mode, tau_star, 
+		corrective, and inactive). 
 	""" 
-	return vice.yields.ccsne.settings['o'] / vice.solar_z['o'] * (
-		10**(0.06 * (rgal - 4) - 0.3)) - 0.6 + corrective 
+
+	def __init__(self, name = "diskmodel", n_stars = 4, 
+		migration_mode = "linear", spec = None, **kwargs): 
+		if spec is None: 
+			spec = zone_spec(**kwargs) 
+		elif len(kwargs): 
+			raise TypeError("Cannot combine a specification with: %s" % ( 
+				str(sorted(kwargs.keys())))) 
+		elif isinstance(spec, str): 
+			spec = diskspec.load(spec) 
+		else: pass 
+		super().__init__(
+			name = name, 
+			n_zones = diskspec.zone_count(spec, len(RAD_BINS) - 1), 
+			n_stars = n_stars, 
+			verbose = True, 
+			simple = False) 
+		# self.migration.stars = tracers.UWhydro(TIME_BINS, RAD_BINS, 
+		# 	n_stars = self.n_stars, 
+		# 	filename = "%s_extra_tracer_data.out" % (self.name)) 
+		# self.migration.stars = hydrodisk.hydrodiskstars(RAD_BINS) 
+		self.migration.stars = diskmigration(RAD_BINS, mode = migration_mode, 
+			filename = "%s_extra_tracer_data.out" % (name), 
+			sink = diskspec.sink_zone(spec, len(RAD_BINS) - 1)) 
+		# other star formation histories: infall_history (mode = "ifr"), 
+		# star_formation_history, constant_sfh, fiducial_sfh, and 
+		# constant_gas (mode = "gas") 
+		self._spec = diskspec.complete(spec) 
+		self._migration_mode = migration_mode 
+		diskspec.configure(self, self._spec) 
+
+	@property 
+	def spec(self): 
+		r""" 
+		Type : dict 
+
+		The ``diskspec`` specification of the zones. Written to "spec.json" 
+		within the output directory when the model runs, along with the 
+		geometry of the zones in "geometry.json". 
+		""" 
+		return self._spec 
+
+	def run(self, resume = True): 
+		r""" 
+		Run the model from 0 to 12.8 Gyr. 
+
+		Parameters 
+		----------
+		resume : bool [default : True] 
+			Whether or not to keep the output of a previous run of the same 
+			model or retry an interrupted one, as in ``checkpoint.run``. 
+		""" 
+		checkpoint.run(self, np.linspace(0, 12.8, 257), key = "%s_%s" % ( 
+			diskspec.spec_hash(self._spec), self._migration_mode), 
+			resume = resume) 
+		diskspec.save(self._spec, "%s.vice/spec.json" % (self.name)) 
+		diskspec.geometry(self._spec, self.n_zones).save( 
+			"%s.vice/geometry.json" % (self.name)) 
+		# pass 
 
 
 if __name__ == "__main__": 
@@ -537,6 +616,6 @@ if __name__ == "__main__":
 		print("R = %.2f kpc ; tau_sfh = %.2f" % (
 			i + ZONE_WIDTH / 2, 
 			star_formation_history.tau_sfh(i + ZONE_WIDTH / 2))) 
-	diskmodel().run() 
+	diskmodel(name = sys.argv[1], n_stars = int(sys.argv[2])).run() 
 
 
@@ -10,7 +10,9 @@ Subroutines for reading in and manipulating the data stored for this project.
 # 	PATH += "/%s" % (i) 
 # sys.path.append(PATH) 
 
-__all__ = ["UWhydroparticles", "UWhydroparticles_zfilter"] 
+__all__ = ["UWhydroparticles", "UWhydroparticles_zfilter", 
+	"UWhydroparticles_file"] 
 from .UWhydro import UWhydro as UWhydroparticles 
 from .UWhydro import UWhydro_zfilter as UWhydroparticles_zfilter 
+from .UWhydro import FILE as UWhydroparticles_file 
 
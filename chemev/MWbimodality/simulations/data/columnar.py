@@ -0,0 +1,20 @@
+r""" 
+The binary columnar store of the top-level data package, shared rather than 
+duplicated. Both data packages are imported under the name ``data``, so the 
+implementation is loaded from its file rather than by package name. 
+""" 
+
+__all__ = ["columnar_file", "columnar_subset"] 
+import importlib.util 
+import sys 
+import os 
+# the implementation imports the utilities at the top of the project 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"../..")) 
+
+_spec = importlib.util.spec_from_file_location("_columnar", os.path.join( 
+	os.path.dirname(os.path.abspath(__file__)), "../../data/columnar.py")) 
+_columnar = importlib.util.module_from_spec(_spec) 
+_spec.loader.exec_module(_columnar) 
+columnar_file = _columnar.columnar_file 
+columnar_subset = _columnar.columnar_subset 
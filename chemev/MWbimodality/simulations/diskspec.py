@@ -0,0 +1,404 @@
+r""" 
+Declarative specifications of the zones of the multizone disk models. A 
+specification names the star formation history family of the zones and the 
+radial profiles of their parameters (e.g. tau_star, eta, the Schmidt law 
+normalization). Each profile is evaluated once over the centers of all zones 
+as an array, and the results are then assigned to the zones in a single pass. 
+
+A specification is a dictionary, or a JSON, TOML, or YAML file containing 
+one, with any of the following keys (see ``DEFAULTS``): 
+
+- "zone_width" : The width of each zone in kpc. 
+- "cutoff" : The radius in kpc beyond which zones do not form stars. 
+- "sfh" : A dictionary with keys "family", the name of a class or function 
+  as "module.name", "mode", the zone mode it describes, and optionally 
+  "args", a list of profiles. If "args" is given, each zone's function is 
+  ``family(*args)`` with the profiles evaluated at the zone; otherwise it is 
+  ``family(rgal)``. 
+- "tau_star", "eta", "MgSchmidt" : Profiles. 
+- "elements", "dt", "Mg0", "schmidt", "schmidt_index" : The same value for 
+  every zone. 
+- "bins" : A dictionary with keys "start", "stop" and "num", the arguments 
+  of ``numpy.linspace`` for the metallicity distribution function bins. 
+- "inactive" : A dictionary with keys "tau_star" and "eta", the values for 
+  the zones beyond the cutoff, and optionally "mode". If "mode" is "keep" 
+  (the default), every zone is integrated. If it is "sink", the zones 
+  beyond the cutoff are collapsed into a single zone, numbered as the first 
+  of them, which forms no stars but collects the stellar populations 
+  migrating beyond the cutoff (see ``zone_count`` and ``sink_zone``). The 
+  zones inside the cutoff keep their numbers either way. 
+
+Zones are left at VICE's default for "MgSchmidt" and "schmidt_index" if 
+they are None. 
+
+A profile is either a number, the same for every zone, or a dictionary with 
+a key "profile" and its parameters, any of which may themselves be 
+profiles: 
+
+- {"profile": "exponential", "norm": A, "scale": s} : :math:`A e^{r/s}` 
+- {"profile": "eta", "corrective": c} : The mass loading factor of 
+  ``common.eta``. 
+- {"profile": "area", "density": d} : d times the area of the annulus. 
+- {"profile": "function", "function": "module.name", "kwargs": {}} : Any 
+  function of radius. 
+""" 
+
+__all__ = ["DEFAULTS", "load", "complete", "spec_hash", "geometry", 
+	"zone_count", "sink_zone", "evaluate", "configure", "save", 
+	"disk_geometry"] 
+import common 
+import numpy as np 
+import importlib 
+import hashlib 
+import json 
+import copy 
+import vice 
+import sys 
+import os 
+# the zone geometry is shared with the analysis routines 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"..")) 
+from analysis.geometry import disk_geometry 
+
+DEFAULTS = { 
+	"zone_width": 		0.25, 
+	"cutoff": 			15.5, 
+	"sfh": 				{ 
+		"family": 			"conference.fiducial_sfh_with_lateburst", 
+		"mode": 			"sfr" 
+	}, 
+	"tau_star": 		2.45, 
+	"eta": 				{"profile": "eta", "corrective": 0}, 
+	"elements": 		["fe", "o"], 
+	"dt": 				0.01, 
+	"Mg0": 				0, 
+	"schmidt": 			True, 
+	"schmidt_index": 	0.85, 
+	"MgSchmidt": 		{"profile": "area", "density": 1.e7}, 
+	"bins": 			{"start": -3, "stop": 1, "num": 401}, 
+	"inactive": 		{"mode": "keep", "tau_star": 1.e6, "eta": 100} 
+} 
+
+# the evaluated profiles of each specification, keyed by its hash 
+_EVALUATED = {} 
+
+
+def load(filename): 
+	r""" 
+	Read a specification from a file. 
+
+	Parameters 
+	---------- 
+	filename : str 
+		The name of a JSON (.json), TOML (.toml), or YAML (.yaml or .yml) 
+		file. TOML files require python 3.11 or the ``toml`` package, and 
+		YAML files the ``PyYAML`` package. 
+
+	Returns 
+	------- 
+	spec : dict 
+		The specification, with defaults filled in for any missing keys. 
+	""" 
+	extension = os.path.splitext(filename)[1].lower() 
+	if extension == ".json": 
+		with open(filename, 'r') as f: 
+			spec = json.load(f) 
+	elif extension == ".toml": 
+		if sys.version_info[:2] >= (3, 11): 
+			import tomllib 
+			with open(filename, 'rb') as f: 
+				spec = tomllib.load(f) 
+		else: 
+			import toml 
+			spec = toml.load(filename) 
+	elif extension in [".yaml", ".yml"]: 
+		import yaml 
+		with open(filename, 'r') as f: 
+			spec = yaml.safe_load(f) 
+	else: 
+		raise ValueError("Unrecognized specification file type: %s" % ( 
+			filename)) 
+	return complete(spec) 
+
+
+def complete(spec): 
+	r""" 
+	Fill in the defaults for any keys missing from a specification. 
+
+	Parameters 
+	---------- 
+	spec : dict 
+		The specification. 
+
+	Returns 
+	------- 
+	spec : dict 
+		A copy of the specification with every key of ``DEFAULTS``. 
+	""" 
+	if not isinstance(spec, dict): raise TypeError( 
+		"Specification must be a dictionary. Got: %s" % (type(spec))) 
+	unrecognized = [i for i in spec.keys() if i not in DEFAULTS] 
+	if len(unrecognized): raise ValueError( 
+		"Unrecognized specification keys: %s" % (str(unrecognized))) 
+	completed = copy.deepcopy(DEFAULTS) 
+	completed.update(copy.deepcopy(spec)) 
+	return completed 
+
+
+def spec_hash(spec): 
+	r""" 
+	Get a hash identifying a specification. 
+
+	Parameters 
+	---------- 
+	spec : dict 
+		The specification. 
+
+	Returns 
+	------- 
+	hash : str 
+		A hexadecimal digest of the specification with defaults filled in, 
+		which is the same for any two specifications describing the same 
+		model. 
+	""" 
+	return hashlib.sha1(json.dumps(complete(spec), sort_keys = True).encode() 
+		).hexdigest()[:16] 
+
+
+def geometry(spec, n_zones): 
+	r""" 
+	Get the geometry of the zones of a specification. 
+
+	Parameters 
+	---------- 
+	spec : dict 
+		The specification. 
+	n_zones : int 
+		The number of zones. 
+
+	Returns 
+	------- 
+	geometry : ``disk_geometry`` 
+		The zones of width "zone_width" with the cutoff of the 
+		specification. Written to "geometry.json" within the output 
+		directory when the models run, where the analysis routines read it 
+		back with ``disk_geometry.from_output``. 
+	""" 
+	spec = complete(spec) 
+	return disk_geometry(zone_width = spec["zone_width"], n_zones = n_zones, 
+		cutoff = spec["cutoff"]) 
+
+
+def zone_count(spec, n_zones): 
+	r""" 
+	Get the number of zones to build a model with. 
+
+	Parameters 
+	---------- 
+	spec : dict 
+		The specification. 
+	n_zones : int 
+		The number of zones spanning the whole disk. 
+
+	Returns 
+	------- 
+	n : int 
+		``n_zones``, or the number of zones inside the cutoff plus one if 
+		the inactive zones are collapsed into a sink. 
+	""" 
+	sink = sink_zone(spec, n_zones) 
+	if sink is None: 
+		return n_zones 
+	else: 
+		return sink + 1 
+
+
+def sink_zone(spec, n_zones): 
+	r""" 
+	Get the number of the zone collecting the stellar populations which 
+	migrate beyond the cutoff. 
+
+	Parameters 
+	---------- 
+	spec : dict 
+		The specification. 
+	n_zones : int 
+		The number of zones spanning the whole disk. 
+
+	Returns 
+	------- 
+	sink : int or None 
+		The number of the first zone beyond the cutoff, or None if the 
+		inactive zones are integrated individually or there are none. The 
+		migration scheme should place stellar populations headed for any 
+		higher zone number in this zone. 
+	""" 
+	spec = complete(spec) 
+	mode = spec["inactive"].get("mode", "keep") 
+	if mode not in ["keep", "sink"]: raise ValueError( 
+		"Inactive zone mode must be either 'keep' or 'sink'. Got: %s" % (mode)) 
+	active = geometry(spec, n_zones).n_active 
+	if mode == "sink" and active < n_zones: 
+		return active 
+	else: 
+		return None 
+
+
+def evaluate(spec, n_zones): 
+	r""" 
+	Evaluate the radial profiles of a specification. 
+
+	Parameters 
+	---------- 
+	spec : dict 
+		The specification. 
+	n_zones : int 
+		The number of zones. 
+
+	Returns 
+	------- 
+	profiles : dict 
+		"rgal", "tau_star", "eta" and "MgSchmidt" as arrays with one value 
+		per zone, and "active", whether or not each zone is inside the 
+		cutoff. Profiles are evaluated only once per specification, number 
+		of zones, and CCSN yield of oxygen. 
+	""" 
+	spec = complete(spec) 
+	key = (spec_hash(spec), n_zones, repr(vice.yields.ccsne.settings['o']), 
+		vice.solar_z['o']) 
+	if key not in _EVALUATED: 
+		zones = geometry(spec, n_zones) 
+		profiles = { 
+			"rgal": 	zones.centers, 
+			"active": 	np.arange(n_zones) < zones.n_active 
+		} 
+		for i in ["tau_star", "eta", "MgSchmidt"]: 
+			profiles[i] = _profile(spec[i], zones) 
+		if "args" in spec["sfh"]: 
+			profiles["sfh_args"] = [_profile(i, zones) for i in 
+				spec["sfh"]["args"]] 
+		else: pass 
+		_EVALUATED[key] = profiles 
+	else: pass 
+	return _EVALUATED[key] 
+
+
+def configure(mz, spec): 
+	r""" 
+	Set up the zones of a multizone model from a specification. 
+
+	Parameters 
+	---------- 
+	mz : ``vice.multizone`` 
+		The model. Its migration settings are left untouched. 
+	spec : dict or str 
+		The specification, or the name of a file containing one. 
+
+	Returns 
+	------- 
+	hash : str 
+		The hash of the specification, as in ``spec_hash``. 
+	""" 
+	if isinstance(spec, str): spec = load(spec) 
+	spec = complete(spec) 
+	profiles = evaluate(spec, mz.n_zones) 
+	if (spec["inactive"].get("mode", "keep") == "sink" and 
+		np.sum(~profiles["active"]) > 1): raise ValueError( 
+		"Expected a single sink zone beyond the cutoff. Got: %d" % ( 
+			np.sum(~profiles["active"]))) 
+	family = _resolve(spec["sfh"]["family"]) 
+	bins = np.linspace(spec["bins"]["start"], spec["bins"]["stop"], 
+		spec["bins"]["num"]) 
+	for i in range(mz.n_zones): 
+		zone = mz.zones[i] 
+		zone.elements = spec["elements"] 
+		zone.dt = spec["dt"] 
+		zone.Mg0 = spec["Mg0"] 
+		zone.bins = bins 
+		zone.schmidt = spec["schmidt"] 
+		if spec["schmidt_index"] is not None: 
+			zone.schmidt_index = spec["schmidt_index"] 
+		else: pass 
+		if profiles["MgSchmidt"] is not None: 
+			zone.MgSchmidt = profiles["MgSchmidt"][i] 
+		else: pass 
+		zone.mode = spec["sfh"]["mode"] 
+		if profiles["active"][i]: 
+			if "sfh_args" in profiles: 
+				func = family(*[j[i] for j in profiles["sfh_args"]]) 
+			else: 
+				func = family(profiles["rgal"][i]) 
+			# tabulate ``gas_disks.history`` objects on the timesteps 
+			if hasattr(func, "on_grid"): func.on_grid(spec["dt"]) 
+			zone.func = func 
+			zone.tau_star = profiles["tau_star"][i] 
+			zone.eta = profiles["eta"][i] 
+		else: 
+			zone.func = _zero 
+			zone.tau_star = spec["inactive"]["tau_star"] 
+			zone.eta = spec["inactive"]["eta"] 
+			for j in zone.elements: 
+				zone.entrainment.agb[j] = 0 
+				zone.entrainment.ccsne[j] = 0 
+				zone.entrainment.sneia[j] = 0 
+	return spec_hash(spec) 
+
+
+def save(spec, filename): 
+	r""" 
+	Write a specification to a JSON file. 
+
+	Parameters 
+	---------- 
+	spec : dict 
+		The specification. 
+	filename : str 
+		The name of the file. 
+	""" 
+	with open(filename, 'w') as f: 
+		json.dump(complete(spec), f, indent = 4, sort_keys = True) 
+
+
+def _zero(t): 
+	return 0 
+
+
+def _profile(profile, zones): 
+	# evaluate a profile at the center of each zone of a disk_geometry 
+	rgal = zones.centers 
+	if profile is None: 
+		return None 
+	elif not isinstance(profile, dict): 
+		return np.full(len(rgal), float(profile)) 
+	else: pass 
+	params = dict([(key, _profile(value, zones) if isinstance(value, dict) 
+		and "profile" in value else value) for key, value in profile.items() 
+		if key != "profile"]) 
+	if profile["profile"] == "exponential": 
+		return params["norm"] * np.exp(rgal / params["scale"]) 
+	elif profile["profile"] == "eta": 
+		return common.eta(rgal, corrective = params.get("corrective", 0)) 
+	elif profile["profile"] == "area": 
+		return params["density"] * zones.areas 
+	elif profile["profile"] == "function": 
+		function = _resolve(params["function"]) 
+		kwargs = params.get("kwargs", {}) 
+		try: 
+			return np.asarray(function(rgal, **kwargs), dtype = np.float64) 
+		except TypeError: 
+			# scalar-only functions (e.g. those using math.exp) 
+			return np.array([function(i, **kwargs) for i in rgal]) 
+	else: 
+		raise ValueError("Unrecognized profile: %s" % (profile["profile"])) 
+
+
+def _resolve(name): 
+	# find a class or function given as "module.name", including those of a 
+	# model being run as a script 
+	module, attr = name.rsplit('.', 1) 
+	main = sys.modules["__main__"] 
+	if module not in sys.modules and os.path.splitext(os.path.basename( 
+		getattr(main, "__file__", "")))[0] == module: 
+		return getattr(main, attr) 
+	else: 
+		return getattr(importlib.import_module(module), attr) 
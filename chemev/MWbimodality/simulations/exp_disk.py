@@ -10,42 +10,62 @@ ARGV
 import tracers 
 import gas_disks 
 from common import * 
+from diskspec import disk_geometry 
 import numpy as np 
-import math as m 
 import vice 
 import sys 
 import os 
 
 
-def run_simulation(): 
+def run_simulation(scale, name = "moddisk", n_stars = 4, 
+	tau_star0 = 2, seed = None): 
+	r""" 
+	Run the exponential disk model. 
+
+	Parameters 
+	---------- 
+	scale : real number 
+		The scale length of the disk in kpc. 
+	name : str [default : "moddisk"] 
+		The name of the output. 
+	n_stars : int [default : 4] 
+		The number of star particles per zone per timestep. 
+	tau_star0 : real number [default : 2] 
+		The SFE timescale at r = 0 in Gyr. 
+	seed : int [default : None] 
+		The seed of the tracer particles' random number stream. 
+	""" 
 	from vice.yields.presets import my_yields 
-	mz = vice.multizone(name = "moddisk", 
+	mz = vice.multizone(name = name, 
 		n_zones = len(RAD_BINS) - 1, 
-		n_tracers = 4, verbose = True, simple = False) 
+		n_tracers = n_stars, verbose = True, simple = False) 
 	mz.migration.stars = tracers.UWhydro(TIME_BINS, RAD_BINS, 
-		filename = "%s_extra_tracer_data.out" % (mz.name)) 
+		filename = "%s_extra_tracer_data.out" % (mz.name), seed = seed) 
+	zones = disk_geometry(ZONE_WIDTH, len(RAD_BINS) - 1, cutoff = 15.5) 
+	etas = eta(zones.centers) 
+	tau_stars = tau_star(zones.centers, norm = tau_star0, scale = scale) 
 	for i in range(mz.n_zones): 
 		mz.zones[i].mode = "gas" 
 		mz.zones[i].func = gas_disks.static_exponential(i, 6.0e9, 
-			RAD_BINS, float(sys.argv[1]))  
+			RAD_BINS, scale)  
 		mz.zones[i].bins = np.linspace(-3, 1, 401) 
 		mz.zones[i].elements = ["mg", "fe", "o"] 
-		mz.zones[i].eta = eta( (RAD_BINS[i] + RAD_BINS[i + 1]) / 2 ) 
+		mz.zones[i].eta = etas[i] 
 		mz.zones[i].dt = 0.01 
-		if i > 61: 
+		if i >= zones.n_active: 
 			mz.zones[i].tau_star = float("inf") 
 			for j in mz.zones[i].elements: 
 				mz.zones[i].entrainment.agb[j] = 0 
 				mz.zones[i].entrainment.ccsne[j] = 0 
 				mz.zones[i].entrainment.sneia[j] = 0 
 		else: 
-			# tau_star ~ e^r/(2r_s) ; extra factor of two for bin center 
-			mz.zones[i].tau_star = 2 * m.exp( (RAD_BINS[i] + RAD_BINS[i + 1]) / 
-				(4 * float(sys.argv[1]))) 
+			# tau_star ~ e^r/(2r_s) 
+			mz.zones[i].tau_star = tau_stars[i] 
 	print("Running....") 
-	mz.run(np.linspace(0, 12.8, 641), overwrite = True) 
-	mz.migration.stars.close_file() 
+	with mz.migration.stars: 
+		mz.run(np.linspace(0, 12.8, 641), overwrite = True) 
+	zones.save("%s.vice/geometry.json" % (mz.name)) 
 
 if __name__ == "__main__": 
-	run_simulation() 
+	run_simulation(float(sys.argv[1])) 
 
@@ -1,24 +1,86 @@
 
-__all__ = ["static_exponential", "exponential_decay"]  
-import math as m 
+__all__ = ["history", "static_exponential", "exponential_decay", 
+	"linear_exponential", "linear_then_exponential"] 
+import numpy as np 
 import numbers 
 
-class static_exponential: 
+
+class history(object): 
+
+	r""" 
+	Base class for the functions of time describing the evolution of a zone 
+	(e.g. its star formation or infall history). Subclasses implement the 
+	evolution in ``_evaluate`` with numpy functions, such that it can be 
+	evaluated at any number of times at once. 
+
+	Calling an object with a single time returns a float, and with an array 
+	of times an array. Once ``on_grid`` has been told the timestep size of 
+	the simulation, calls at times on that grid are looked up in a table 
+	evaluated in bulk rather than computed one at a time. 
+	""" 
+
+	# the timestep size and the values on the grid of timesteps 
+	_dt = None 
+	_table = None 
+
+	def __call__(self, time): 
+		if isinstance(time, (float, int)): 
+			if self._dt is not None: 
+				idx = round(time / self._dt) 
+				if idx >= 0 and abs(time - idx * self._dt) <= 1.e-6 * self._dt: 
+					if idx >= len(self._table): self._extend(idx) 
+					return self._table[idx] 
+				else: pass 
+			else: pass 
+			return float(self._evaluate(time)) 
+		elif np.ndim(time): 
+			return self._evaluate(np.asarray(time, dtype = np.float64)) 
+		else: 
+			return float(self._evaluate(float(time))) 
+
+	def on_grid(self, dt): 
+		r""" 
+		Tabulate the evolution on the times 0, dt, 2dt, ... 
+
+		Parameters 
+		---------- 
+		dt : real number 
+			The timestep size in Gyr. 
+		""" 
+		if not isinstance(dt, numbers.Number) or dt <= 0: raise ValueError( 
+			"Timestep size must be a positive number. Got: %s" % (str(dt))) 
+		self._dt = float(dt) 
+		self._table = [] 
+
+	def _invalidate(self): 
+		# a parameter has changed, so the tabulated values are out of date 
+		if self._dt is not None: self._table = [] 
+
+	def _extend(self, idx): 
+		# a list, since indexing one is faster than indexing an array 
+		n = max(2 * len(self._table), idx + 1, 1024) 
+		self._table = self._evaluate(self._dt * np.arange(n)).tolist() 
+
+	def _evaluate(self, time): 
+		raise NotImplementedError 
+
+
+class static_exponential(history): 
 
 	""" 
 	A callable object for a gas reservoir within a static exponential disk 
 	""" 
 
 	def __init__(self, zone, norm, rad_bins, scale_length): 
-		self._mass = norm * m.exp(-zone * (rad_bins[zone + 1] - rad_bins[zone]) / 
+		self._mass = norm * np.exp(-zone * (rad_bins[zone + 1] - rad_bins[zone]) / 
 			scale_length) * (rad_bins[zone + 1]**2 - 
 			rad_bins[zone]**2) / rad_bins[1]**2 
 
-	def __call__(self, time): 
-		return self._mass 
+	def _evaluate(self, time): 
+		return np.full(np.shape(time), self._mass) 
 
 
-class exponential_decay: 
+class exponential_decay(history): 
 
 	r""" 
 	A callable object representing exponential decay. 
@@ -28,8 +90,8 @@ class exponential_decay:
 		self.norm = norm 
 		self.timescale = timescale 
 
-	def __call__(self, t): 
-		return self.norm * m.exp(-t / self.timescale) 
+	def _evaluate(self, t): 
+		return self.norm * np.exp(-t / self.timescale) 
 
 	@property 
 	def norm(self): 
@@ -43,6 +105,7 @@ class exponential_decay:
 		if isinstance(value, numbers.Number): 
 			if value > 0: 
 				self._norm = float(value)  
+				self._invalidate() 
 			else: 
 				raise ValueError("Must be positive. Got: %g" % (value)) 
 		else: 
@@ -61,6 +124,7 @@ class exponential_decay:
 		if isinstance(value, numbers.Number): 
 			if value > 0: 
 				self._timescale = float(value) 
+				self._invalidate() 
 			else: 
 				raise ValueError("Must be positive. Got: %g" % (value)) 
 		else: 
@@ -76,8 +140,8 @@ class linear_exponential(exponential_decay):
 	def __init__(self, norm, timescale): 
 		super().__init__(norm, timescale) 
 
-	def __call__(self, time): 
-		return self.norm * time * m.exp(-time / self.timescale) 
+	def _evaluate(self, time): 
+		return self.norm * time * np.exp(-time / self.timescale) 
 
 
 class linear_then_exponential(exponential_decay): 
@@ -90,12 +154,10 @@ class linear_then_exponential(exponential_decay):
 		super().__init__(norm, timescale) 
 		self.switch = switch 
 
-	def __call__(self, time): 
-		if time <= self.switch: 
-			return self.norm * time 
-		else: 
-			return self.norm * self.switch * m.exp(-(time - self.switch) / 
-				self.timescale) 
+	def _evaluate(self, time): 
+		return np.where(time <= self.switch, self.norm * time, 
+			self.norm * self.switch * np.exp(-(time - self.switch) / 
+				self.timescale)) 
 
 	@property 
 	def switch(self): 
@@ -110,6 +172,7 @@ class linear_then_exponential(exponential_decay):
 		if isinstance(value, numbers.Number): 
 			if value > 0: 
 				self._switch = float(value) 
+				self._invalidate() 
 			else: 
 				raise ValueError("Must be positive. Got: %g" % (value)) 
 		else: 
@@ -9,6 +9,8 @@ ARGV
 
 import tracers 
 import gas_disks 
+import diskspec 
+import checkpoint 
 from common import * 
 import numpy as np 
 import math as m 
@@ -39,81 +41,168 @@ def tau_in(rgal):
 
 
 def Min0(rgal, k = 0.1, tau_star0 = TAU_STAR0, scale = 3): 
+	if np.ndim(rgal): rgal = np.asarray(rgal, dtype = np.float64) 
 	t_star = tau_star(rgal, norm = tau_star0, scale = scale) 
 	t_in = tau_in(rgal) 
+	t_dep = depletion_time(t_star, eta = eta(rgal, corrective = t_star / t_in)) 
+	# t_dep = depletion_time(t_star, eta = eta(rgal)) 
 	return k * (
-		rgal / ZONE_WIDTH * m.exp(-rgal / scale) * 
-		harmonic_timescale(t_in, depletion_time(t_star, 
-			eta = eta(rgal, corrective = t_star / t_in))
-			# eta = eta(rgal)) 
-		)**(-1) * (
-			m.exp(-12.8 / depletion_time(t_star, 
-				eta = eta(rgal, corrective = t_star / t_in))) - 
-				# eta = eta(rgal))) - 
-			m.exp(-12.8 / t_in) 
+		rgal / ZONE_WIDTH * np.exp(-rgal / scale) * 
+		harmonic_timescale(t_in, t_dep)**(-1) * ( 
+			np.exp(-12.8 / t_dep) - 
+			np.exp(-12.8 / t_in) 
 		)**(-1) 
 	)
 
 
 def sfr_norm(r, rs = 3, k = 100): 
-	return k * tau_in(r)**(-2) * (1 - (1 + 12.8 / tau_in(r)) * m.exp(-12.8 / 
-		tau_in(r)))**(-1) * 2 * m.pi * r * m.exp(-r / rs) * 0.25 
+	if np.ndim(r): r = np.asarray(r, dtype = np.float64) 
+	return k * tau_in(r)**(-2) * (1 - (1 + 12.8 / tau_in(r)) * np.exp(-12.8 / 
+		tau_in(r)))**(-1) * 2 * m.pi * r * np.exp(-r / rs) * 0.25 
 
 
 def lintexp_sfr_norm(r, rs = 3, k = 1000): 
+	if np.ndim(r): r = np.asarray(r, dtype = np.float64) 
 	t = 12.8 
 	t1 = 1 
-	return k * r * m.exp(-r / rs) / t * (0.5 * t + tau_in(r) * (1 - 
-		m.exp(-(t - t1) / tau_in(r))))**(-1) 
+	return k * r * np.exp(-r / rs) / t * (0.5 * t + tau_in(r) * (1 - 
+		np.exp(-(t - t1) / tau_in(r))))**(-1) 
 
 
-def run_simulation(): 
-	mz = vice.multizone(name = sys.argv[1], n_zones = len(RAD_BINS) - 1, 
-		n_stars = 4, verbose = True, simple = False) 
+def eta_corrective(rgal, tau_star0 = TAU_STAR0): 
+	r""" 
+	The corrective term to the mass loading factor, tau_star / tau_in. 
+
+	Parameters 
+	----------
+	rgal : real number 
+		Galactocentric radius in kpc. 
+	tau_star0 : real number [default : TAU_STAR0] 
+		The SFE timescale at r = 0 in Gyr. 
+
+	Returns 
+	-------
+	corrective : real number 
+		The ratio of the SFE and infall timescales at that radius. 
+	""" 
+	return tau_star(rgal, norm = tau_star0) / tau_in(rgal) 
+
+
+def zone_spec(sfh = "linear_then_exponential", tau_star0 = TAU_STAR0, 
+	corrective = True, inactive = "keep"): 
+	r""" 
+	The ``diskspec`` specification of the zones of the inside-out disk model. 
+
+	Parameters 
+	----------
+	sfh : str [default : "linear_then_exponential"] 
+		The family: "linear_then_exponential" or "linear_exponential" star 
+		formation histories, or "exponential_decay" infall histories. 
+	tau_star0 : real number [default : TAU_STAR0] 
+		The SFE timescale at r = 0 in Gyr. 
+	corrective : bool [default : True] 
+		Whether or not to add tau_star / tau_in to the mass loading factor. 
+	inactive : str [default : "keep"] 
+		"keep" to integrate the zones beyond 15.5 kpc individually, or "sink" 
+		to collapse them into a single zone collecting the stars which 
+		migrate there. 
+
+	Returns 
+	-------
+	spec : dict 
+		The specification. 
+	""" 
+	timescale = {"profile": "function", "function": "iodisk.tau_in"} 
+	if sfh == "linear_then_exponential": 
+		mode = "sfr" 
+		args = [{"profile": "function", "function": "iodisk.lintexp_sfr_norm"}, 
+			timescale, 1] 
+	elif sfh == "linear_exponential": 
+		mode = "sfr" 
+		args = [{"profile": "function", "function": "iodisk.sfr_norm"}, 
+			timescale] 
+	elif sfh == "exponential_decay": 
+		mode = "ifr" 
+		args = [{"profile": "function", "function": "iodisk.Min0", 
+			"kwargs": {"tau_star0": tau_star0}}, timescale] 
+	else: 
+		raise ValueError("Unrecognized star formation history: %s" % (sfh)) 
+	if corrective: 
+		corrective = {"profile": "function", "function": "iodisk.eta_corrective", 
+			"kwargs": {"tau_star0": tau_star0}} 
+	else: 
+		corrective = 0 
+	return diskspec.complete({ 
+		"zone_width": 		ZONE_WIDTH, 
+		"cutoff": 			15.5, 
+		"sfh": 				{"family": "gas_disks.%s" % (sfh), "mode": mode, 
+								"args": args}, 
+		"tau_star": 		{"profile": "exponential", "norm": tau_star0, 
+								"scale": 6}, 
+		"eta": 				{"profile": "eta", "corrective": corrective}, 
+		"elements": 		["mg", "fe", "o"], 
+		"dt": 				0.01, 
+		"Mg0": 				0, 
+		"schmidt": 			True, 
+		"schmidt_index": 	None, 
+		"MgSchmidt": 		None, 
+		"inactive": 		{"mode": inactive, "tau_star": 100, "eta": 100} 
+	}) 
+
+
+def run_simulation(name = "iodisk", n_stars = 4, migration = "UWhydro_1event", 
+	seed = None, spec = None, resume = True, **kwargs): 
+	r""" 
+	Run the inside-out disk model. 
+
+	Parameters 
+	----------
+	name : str [default : "iodisk"] 
+		The name of the output. 
+	n_stars : int [default : 4] 
+		The number of star particles per zone per timestep. 
+	migration : str [default : "UWhydro_1event"] 
+		The name of the tracer particle class in ``tracers`` to migrate 
+		stars with. 
+	seed : int [default : None] 
+		The seed of the tracer particles' random number stream. 
+	spec : dict or str [default : None] 
+		The ``diskspec`` specification of the zones, or the name of a file 
+		containing one. None to build it from the remaining keyword arguments 
+		with ``zone_spec``. 
+	resume : bool [default : True] 
+		Whether or not to keep the output of a previous run of the same model 
+		or retry an interrupted one, as in ``checkpoint.run``. 
+	kwargs : varying types 
+		Keyword arguments passed to ``zone_spec`` (i.e. sfh, tau_star0, 
+		corrective, and inactive). 
+	""" 
+	if spec is None: 
+		spec = zone_spec(**kwargs) 
+	elif len(kwargs): 
+		raise TypeError("Cannot combine a specification with: %s" % ( 
+			str(sorted(kwargs.keys())))) 
+	elif isinstance(spec, str): 
+		spec = diskspec.load(spec) 
+	else: pass 
+	mz = vice.multizone(name = name, 
+		n_zones = diskspec.zone_count(spec, len(RAD_BINS) - 1), 
+		n_stars = n_stars, verbose = True, simple = False) 
 	# mz.migration.stars = tracers.UWhydro(TIME_BINS, RAD_BINS, 
 	# 	n_stars = mz.n_stars, 
 	# 	filename = "%s_extra_tracer_data.out" % (mz.name)) 
-	mz.migration.stars = tracers.UWhydro_1event(TIME_BINS, RAD_BINS, 
+	mz.migration.stars = getattr(tracers, migration)(TIME_BINS, RAD_BINS, 
 		n_stars = mz.n_stars, 
-		filename = "%s_extra_tracer_data.out" % (mz.name)) 
-	for i in range(mz.n_zones): 
-		# mz.zones[i].mode = "ifr" 
-		mz.zones[i].mode = "sfr" 
-		# mz.zones[i].func = gas_disks.exponential_decay(
-		# 	Min0( (RAD_BINS[i] + RAD_BINS[i + 1]) / 2 ), 
-		# 	tau_in(RAD_BINS[i] + RAD_BINS[i + 1]) / 2) 
-		# mz.zones[i].func = gas_disks.linear_exponential(
-		#  	sfr_norm((RAD_BINS[i] + RAD_BINS[i + 1]) / 2), 
-		#  	tau_in((RAD_BINS[i] + RAD_BINS[i + 1]) / 2))  
-		mz.zones[i].func = gas_disks.linear_then_exponential(
-			lintexp_sfr_norm((RAD_BINS[i] + RAD_BINS[i + 1]) / 2), 
-			tau_in((RAD_BINS[i] + RAD_BINS[i + 1]) / 2), 
-			1) 
-		mz.bins = np.linspace(-3, 1, 401) 
-		mz.zones[i].elements = ["mg", "fe", "o"] 
-		mz.zones[i].dt = 0.01 
-		mz.zones[i].Mg0 = 0 
-		if i > 61: 
-			mz.zones[i].func = lambda t: 0 
-			mz.zones[i].tau_star = 100 
-			# mz.zones[i].tau_star = float("inf") 
-			mz.zones[i].eta = 100 
-			for j in mz.zones[i].elements: 
-				mz.zones[i].entrainment.agb[j] = 0 
-				mz.zones[i].entrainment.ccsne[j] = 0 
-				mz.zones[i].entrainment.sneia[j] = 0 
-		else: 
-			mz.zones[i].tau_star = tau_star(ZONE_WIDTH * (i + 0.5), 
-				norm = TAU_STAR0) 
-			mz.zones[i].eta = eta( (RAD_BINS[i] + RAD_BINS[i + 1]) / 2 , 
-				corrective = mz.zones[i].tau_star / tau_in(
-					(RAD_BINS[i] + RAD_BINS[i + 1]) / 2)) 
-			# mz.zones[i].eta = eta( (RAD_BINS[i] + RAD_BINS[i + 1]) / 2 ) 
-		mz.zones[i].schmidt = True 
+		filename = "%s_extra_tracer_data.out" % (mz.name), seed = seed, 
+		sink = diskspec.sink_zone(spec, len(RAD_BINS) - 1)) 
+	diskspec.configure(mz, spec) 
 	print("Running....") 
 	# mz.run(np.linspace(0, 12.8, 641), overwrite = True) 
-	mz.run(np.linspace(0, 12.8, 257), overwrite = True) 
-	mz.migration.stars.close_file() 
+	checkpoint.run(mz, np.linspace(0, 12.8, 257), key = "%s_%s_%s" % ( 
+		diskspec.spec_hash(spec), migration, seed), resume = resume) 
+	diskspec.save(spec, "%s.vice/spec.json" % (mz.name)) 
+	diskspec.geometry(spec, mz.n_zones).save("%s.vice/geometry.json" % ( 
+		mz.name)) 
 
 
 if __name__ == "__main__": 
@@ -129,5 +218,5 @@ if __name__ == "__main__":
 		print("R = %.2f kpc; norm = %.2f ; tau_sfh = %.2f" % (
 			i + ZONE_WIDTH / 2, lintexp_sfr_norm(i + ZONE_WIDTH / 2), 
 			tau_in(i + ZONE_WIDTH / 2))) 
-	run_simulation() 
+	run_simulation(name = sys.argv[1]) 
 
@@ -0,0 +1,167 @@
+r""" 
+Seeded random number streams for the tracer particle classes. Variates are 
+drawn from a ``numpy.random.Generator`` in large blocks and handed out one at 
+a time, which avoids the overhead of millions of scalar calls to the global 
+``numpy.random`` functions and makes simulations reproducible. 
+""" 
+
+__all__ = ["random_stream"] 
+import numpy as np 
+
+
+class random_stream(object): 
+
+	r""" 
+	A buffered stream of pseudo-random numbers. 
+
+	Parameters 
+	---------- 
+	seed : int, sequence of ints, or ``numpy.random.SeedSequence`` 
+		[default : None] 
+		The seed of the stream. If None, fresh entropy is pulled from the 
+		operating system, and the stream will not be reproducible. 
+	block : int [default : 65536] 
+		The number of variates to draw from the generator at a time. 
+
+	Notes 
+	----- 
+	Independent streams for parallel workers should be obtained with 
+	``spawn`` rather than by seeding each with a different integer, which 
+	guarantees that they do not overlap. 
+	""" 
+
+	def __init__(self, seed = None, block = 65536): 
+		if isinstance(seed, np.random.SeedSequence): 
+			self._seed = seed 
+		else: 
+			self._seed = np.random.SeedSequence(seed) 
+		if not isinstance(block, int) or block <= 0: raise ValueError( 
+			"Block size must be a positive integer. Got: %s" % (block)) 
+		self._block = block 
+		self._generator = np.random.default_rng(self._seed) 
+		# the state of the generator before the current block was drawn 
+		self._origin = self._generator.bit_generator.state 
+		self._buffer = np.empty(0) 
+		self._position = 0 
+
+	@property 
+	def seed(self): 
+		r""" 
+		Type : ``numpy.random.SeedSequence`` 
+
+		The seed sequence this stream was built from. 
+		""" 
+		return self._seed 
+
+	@property 
+	def state(self): 
+		r""" 
+		Type : dict 
+
+		The position of the stream, which can be written out as JSON and 
+		assigned back to a stream with the same block size to continue 
+		drawing the same variates from where it left off (e.g. when 
+		restarting an interrupted simulation). 
+		""" 
+		return { 
+			"origin": 		self._origin, 
+			"drawn": 		len(self._buffer), 
+			"position": 	self._position, 
+			"block": 		self._block 
+		} 
+
+	@state.setter 
+	def state(self, value): 
+		if not isinstance(value, dict): raise TypeError( 
+			"State must be a dictionary. Got: %s" % (type(value))) 
+		if value["block"] != self._block: raise ValueError( 
+			"State is of a stream with block size %d, not %d." % ( 
+				value["block"], self._block)) 
+		self._generator.bit_generator.state = value["origin"] 
+		self._origin = self._generator.bit_generator.state 
+		if value["drawn"]: 
+			self._buffer = self._generator.random(self._block) 
+		else: 
+			self._buffer = np.empty(0) 
+		self._position = value["position"] 
+
+	def random(self, size = None): 
+		r""" 
+		Draw uniform variates in the range [0, 1). 
+
+		Parameters 
+		---------- 
+		size : int [default : None] 
+			The number of variates to draw. If None, a single float is 
+			returned. 
+
+		Returns 
+		------- 
+		x : float or numpy.ndarray 
+			The variates. 
+		""" 
+		if size is None: 
+			if self._position == len(self._buffer): self._refill() 
+			self._position += 1 
+			return float(self._buffer[self._position - 1]) 
+		else: 
+			out = np.empty(size) 
+			filled = 0 
+			while filled < size: 
+				if self._position == len(self._buffer): self._refill() 
+				n = min(size - filled, len(self._buffer) - self._position) 
+				out[filled:filled + n] = self._buffer[ 
+					self._position:self._position + n] 
+				self._position += n 
+				filled += n 
+			return out 
+
+	def randint(self, high, size = None): 
+		r""" 
+		Draw integer variates in the range [0, high). 
+
+		Parameters 
+		---------- 
+		high : int or array-like 
+			The exclusive upper bound(s). Must be positive. 
+		size : int [default : None] 
+			The number of variates to draw if ``high`` is a scalar. Ignored 
+			if ``high`` is an array, in which case one variate is drawn per 
+			element. 
+
+		Returns 
+		------- 
+		n : int or numpy.ndarray 
+			The variates. 
+		""" 
+		if np.ndim(high): 
+			high = np.asarray(high) 
+			return np.minimum((self.random(high.size) * high.ravel()).astype( 
+				np.intp), high.ravel() - 1).reshape(high.shape) 
+		elif size is None: 
+			return min(int(self.random() * high), int(high) - 1) 
+		else: 
+			return np.minimum((self.random(size) * high).astype(np.intp), 
+				int(high) - 1) 
+
+	def spawn(self, n): 
+		r""" 
+		Create statistically independent child streams. 
+
+		Parameters 
+		---------- 
+		n : int 
+			The number of streams to create. 
+
+		Returns 
+		------- 
+		streams : list 
+			The child ``random_stream`` objects, with the same block size. 
+		""" 
+		return [random_stream(seed = i, block = self._block) for i in 
+			self._seed.spawn(n)] 
+
+	def _refill(self): 
+		self._origin = self._generator.bit_generator.state 
+		self._buffer = self._generator.random(self._block) 
+		self._position = 0 
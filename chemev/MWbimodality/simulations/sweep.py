@@ -0,0 +1,228 @@
+r""" 
+Runs a sweep over the parameters of one of the multizone models (i.e. 
+``conference.diskmodel``, ``iodisk.run_simulation``, or 
+``exp_disk.run_simulation``). Each variant runs in its own python process, at 
+most a given number at a time, and writes its output to its own directory. A 
+manifest of the wall time, peak memory, and exit status of every run is 
+written alongside them. 
+
+ARGV 
+---- 
+1) 		The model to run: "conference", "iodisk", or "exp_disk" 
+2) 		A JSON file containing either a list of parameter sets or a 
+		dictionary mapping each parameter to a list of values to take 
+		every combination of 
+3) 		The directory to write the runs to 
+4) 		The maximum number of runs at a time [optional] 
+""" 
+
+__all__ = ["MODELS", "REQUIRED", "grid", "run_sweep"] 
+import multiprocessing.pool 
+import subprocess 
+import itertools 
+import json 
+import time 
+import sys 
+import os 
+# the atomic file writes are shared with the analysis routines 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"..")) 
+from utils import atomic_write 
+
+# the models which can be swept over, and the function building and running 
+# each one from keyword arguments 
+MODELS = { 
+	"conference": 	"conference.diskmodel(**_parameters).run()", 
+	"iodisk": 		"iodisk.run_simulation(**_parameters)", 
+	"exp_disk": 	"exp_disk.run_simulation(**_parameters)" 
+} 
+
+# the parameters of each model which have no default and must be given 
+REQUIRED = { 
+	"conference": 	[], 
+	"iodisk": 		[], 
+	"exp_disk": 	["scale"] 
+} 
+
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__)) 
+
+
+def grid(**axes): 
+	r""" 
+	Take every combination of the values of several parameters. 
+
+	Parameters 
+	---------- 
+	axes : keyword arguments 
+		Each parameter and a list of the values to take. 
+
+	Returns 
+	------- 
+	parameters : list 
+		A dictionary of parameters for each combination, varying the last 
+		parameter fastest. 
+
+	Example Code 
+	------------ 
+	>>> grid(tau_star = [1, 2], n_stars = [2, 4]) 
+	[{'tau_star': 1, 'n_stars': 2}, {'tau_star': 1, 'n_stars': 4}, 
+	 {'tau_star': 2, 'n_stars': 2}, {'tau_star': 2, 'n_stars': 4}] 
+	""" 
+	keys = list(axes.keys()) 
+	return [dict(zip(keys, values)) for values in itertools.product(*[ 
+		axes[key] for key in keys])] 
+
+
+def run_sweep(model, parameters, directory, processes = None, 
+	overwrite = False, verbose = False): 
+	r""" 
+	Run a model for each of several sets of parameters. 
+
+	Parameters 
+	---------- 
+	model : str 
+		The model to run. Must be a key of ``MODELS``. 
+	parameters : list or dict 
+		Either a list of dictionaries, each the keyword arguments of one run 
+		(e.g. "sfh", "tau_star", "corrective", "migration_mode", "n_stars"), 
+		or a dictionary of lists to take every combination of with ``grid``. 
+		The output name of each run is chosen here and must not be given, 
+		and those listed in ``REQUIRED`` must be. 
+	directory : str 
+		The directory to write the runs to. Run i writes its output, its 
+		side files, its parameters, and its log to the subdirectory 
+		"run%03d". 
+	processes : int [default : None] 
+		The maximum number of runs at a time. None for one per CPU. 
+	overwrite : bool [default : False] 
+		Whether or not to rerun variants which already finished successfully 
+		with the same parameters in a previous sweep into this directory. 
+	verbose : bool [default : False] 
+		Whether or not to print the status of each run as it finishes. 
+
+	Returns 
+	------- 
+	manifest : list 
+		A dictionary for each run, in the same order as the parameters, with 
+		the following keys: 
+
+		- "name" : The name of the run's output. 
+		- "parameters" : The keyword arguments of the run. 
+		- "status" : The exit status of the run's process, negative if it 
+		  was killed by a signal. 
+		- "seconds" : The wall time of the run in seconds. 
+		- "peak_memory" : The peak resident memory of the run in MB. 
+
+		The manifest is also written to "manifest.json" in the directory. 
+
+	Notes 
+	----- 
+	Runs are separate processes rather than workers of a 
+	``multiprocessing.Pool``: the models set global state (e.g. yield 
+	settings), a crash in VICE takes down only the run it happened in, and 
+	the peak memory of each run can be measured on its own. 
+	""" 
+	if model not in MODELS: raise ValueError( 
+		"Unrecognized model: %s. Must be one of: %s" % (model, 
+			str(sorted(MODELS.keys())))) 
+	if isinstance(parameters, dict): parameters = grid(**parameters) 
+	for i in parameters: 
+		if "name" in i: raise ValueError( 
+			"The output name of each run is set by the sweep. Got: %s" % ( 
+				str(i))) 
+		# check before launching anything, rather than failing in every run 
+		missing = [key for key in REQUIRED[model] if key not in i] 
+		if len(missing): raise ValueError( 
+			"Missing required parameters of %s: %s. Got: %s" % (model, 
+				str(missing), str(i))) 
+	directory = os.path.abspath(directory) 
+	if processes is None: processes = os.cpu_count() 
+	tasks = [] 
+	for i in range(len(parameters)): 
+		tasks.append({ 
+			"model": 		model, 
+			"directory": 	"%s/run%03d" % (directory, i), 
+			"parameters": 	dict(parameters[i]) 
+		}) 
+		tasks[-1]["parameters"]["name"] = "%s/%s" % (tasks[-1]["directory"], 
+			model) 
+	manifest = [] 
+	pool = multiprocessing.pool.ThreadPool(processes = max(1, min(processes, 
+		len(tasks)))) 
+	try: 
+		for record in pool.imap(lambda task: _run(task, overwrite), tasks): 
+			if verbose: _report(record, len(manifest), len(tasks)) 
+			manifest.append(record) 
+	finally: 
+		pool.close() 
+		pool.join() 
+	os.makedirs(directory, exist_ok = True) 
+	_dump(manifest, "%s/manifest.json" % (directory)) 
+	return manifest 
+
+
+def _run(task, overwrite): 
+	# a previous record of a successful run with the same parameters 
+	filename = "%s/run.json" % (task["directory"]) 
+	if not overwrite and os.path.exists(filename): 
+		with open(filename, 'r') as f: 
+			record = json.load(f) 
+		if record["status"] == 0 and record["parameters"] == task["parameters"]: 
+			return record 
+		else: pass 
+	else: pass 
+	os.makedirs(task["directory"], exist_ok = True) 
+	_dump(task["parameters"], "%s/parameters.json" % (task["directory"])) 
+	command = [sys.executable, "-c", 
+		"import json, %s ; _parameters = json.load(open(%r)) ; %s" % ( 
+			task["model"], "%s/parameters.json" % (task["directory"]), 
+			MODELS[task["model"]])] 
+	start = time.time() 
+	with open("%s/log.out" % (task["directory"]), 'w') as log: 
+		# the models read their data files relative to this directory 
+		process = subprocess.Popen(command, cwd = _DIRECTORY, stdout = log, 
+			stderr = subprocess.STDOUT) 
+		# os.wait4 reports the resource usage of this process alone 
+		pid, status, usage = os.wait4(process.pid, 0) 
+	process.returncode = _exit_status(status) 
+	record = { 
+		"name": 		task["parameters"]["name"], 
+		"parameters": 	task["parameters"], 
+		"status": 		process.returncode, 
+		"seconds": 		time.time() - start, 
+		# ru_maxrss is in kB on Linux but bytes on Mac OS 
+		"peak_memory": 	usage.ru_maxrss / 1024**(1 + (sys.platform == "darwin")) 
+	} 
+	_dump(record, filename) 
+	return record 
+
+
+def _exit_status(status): 
+	if os.WIFSIGNALED(status): 
+		return -os.WTERMSIG(status) 
+	else: 
+		return os.WEXITSTATUS(status) 
+
+
+def _dump(obj, filename): 
+	with atomic_write(filename) as f: 
+		json.dump(obj, f, indent = 4) 
+
+
+def _report(record, index, total): 
+	sys.stdout.write("[%d/%d] %s: status %d, %.2f s, %.1f MB\n" % (index + 1, 
+		total, record["name"], record["status"], record["seconds"], 
+		record["peak_memory"])) 
+	sys.stdout.flush() 
+
+
+if __name__ == "__main__": 
+	with open(sys.argv[2], 'r') as f: 
+		parameters = json.load(f) 
+	if len(sys.argv) > 4: 
+		processes = int(sys.argv[4]) 
+	else: 
+		processes = None 
+	manifest = run_sweep(sys.argv[1], parameters, sys.argv[3], 
+		processes = processes, verbose = True) 
+	sys.exit(int(any([i["status"] for i in manifest]))) 
@@ -3,21 +3,19 @@ Subroutines for setting up tracer particles in multizone simulations
 by tuning them to hydrodynamical simulation star particles. 
 """ 
 
-__all__ = ["UWhydro", "UWhydro_inward", "UWhydro_outward", "UWhydro_reverse"] 
+__all__ = ["UWhydro", "UWhydro_inward", "UWhydro_outward", "UWhydro_reverse", 
+	"migration_table", "migration_batch"] 
+from binning import get_bin_number, get_bin_numbers 
+from rng import random_stream 
+from writer import tracer_writer 
 import numpy as np 
-
-def _get_bin_number(bins, val): 
-	""" 
-	Gets the bin number of a given value in a given binspace. 
-
-	bins :: the array containing the bin edges. Assumed to be sorted. 
-	val :: the number whose bin number needs to be found 
-
-	Returns -1 if the value does not lie within the binspace 
-	""" 
-	for i in range(len(bins) - 1): 
-		if bins[i] <= val <= bins[i + 1]: return i 
-	return -1 
+import hashlib 
+import sys 
+import os 
+# the atomic file writes are shared with the analysis routines 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+	"..")) 
+from utils import atomic_write 
 
 def _interpolate(x1, x2, y1, y2, x): 
 	""" 
@@ -42,12 +40,12 @@ def _interpolate(x1, x2, y1, y2, x):
 		The y-coordinate of the linearly extrapolated point 
 	""" 
 	try: 
-		return (y2 - y1) / (x2 - x1) * (x - x1) + y1 
+		return (y2 - y1) / float(x2 - x1) * (x - x1) + y1 
 	except ZeroDivisionError: 
 		return y2 
 
 
-def _rand_range(start, stop): 
+def _rand_range(start, stop, stream = np.random): 
 	r""" 
 	Return a randomly-generated number in a given range. 
 
@@ -57,13 +55,454 @@ def _rand_range(start, stop):
 		The lower-bound of the range 
 	stop : real number 
 		The upper-bound of the range 
+	stream : object [default : numpy.random] 
+		The source of uniform random numbers, with a ``random`` method. 
 
 	Returns 
 	-------
 	x : real number 
 		A pseudo-randomly generated number in the range [start, stop). 
 	""" 
-	return start + (stop - start) * np.random.random() 
+	return start + (stop - start) * stream.random() 
+
+
+# Analyzed tables are shared between every tracer object built with the same 
+# bins and the same analysis variant. 
+_TABLES = {} 
+
+# The columns of the extra tracer data output file 
+_FIELDS = [ 
+	("zone_origin", np.int32, "%d"), 
+	("time_origin", np.float64, "%.2f"), 
+	("zone_final", np.int32, "%d"), 
+	("zfinal", np.float64, "%.3f") 
+] 
+
+
+class migration_table(object): 
+
+	r""" 
+	A compressed-sparse-row table of the hydrodynamical star particles which 
+	are eligible analogs for a stellar population born in a given zone and 
+	time bin. 
+
+	Parameters 
+	----------
+	zones : array-like 
+		The zone numbers of the analog star particles at the end of the 
+		simulation, sorted such that the analogs of each (zone, time bin) cell 
+		are contiguous. 
+	heights : array-like 
+		The heights above or below the disk midplane in kpc of each analog at 
+		the end of the simulation. 
+	offsets : array-like 
+		The index into ``zones`` and ``heights`` at which each cell begins, 
+		plus a trailing entry denoting the end of the last cell. Cells are 
+		ordered by birth zone first and by time bin second. 
+	n_time_bins : int 
+		The number of time bins per zone. 
+
+	Notes 
+	----- 
+	Analogs which migrate inward (outward) are stored as precomputed indices 
+	into the table with their own offsets, such that selecting among them is 
+	also a single slice. 
+	""" 
+
+	def __init__(self, zones, heights, offsets, n_time_bins): 
+		self._zones = np.asarray(zones, dtype = np.int32) 
+		self._heights = np.asarray(heights, dtype = np.float64) 
+		self._offsets = np.asarray(offsets, dtype = np.int64) 
+		self._n_time_bins = int(n_time_bins) 
+		self._n_zones = (len(self._offsets) - 1) // self._n_time_bins 
+		cells = np.repeat(np.arange(len(self._offsets) - 1), 
+			np.diff(self._offsets)) 
+		owners = cells // self._n_time_bins 
+		self._filters = { 
+			"inward": self._index_filter(cells, self._zones <= owners), 
+			"outward": self._index_filter(cells, self._zones >= owners) 
+		} 
+
+	@property 
+	def zones(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The final zone numbers of every analog in the table. 
+		""" 
+		return self._zones 
+
+	@property 
+	def heights(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The final heights in kpc of every analog in the table. 
+		""" 
+		return self._heights 
+
+	@property 
+	def offsets(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The index at which each (zone, time bin) cell begins. 
+		""" 
+		return self._offsets 
+
+	@property 
+	def n_time_bins(self): 
+		r""" 
+		Type : int 
+
+		The number of time bins per zone. 
+		""" 
+		return self._n_time_bins 
+
+	def bounds(self, zone, tbin): 
+		r""" 
+		Get the range of indices holding the analogs of a given cell. 
+
+		Parameters 
+		---------- 
+		zone : int 
+			The zone number of birth. Negative values index from the end. 
+		tbin : int 
+			The time bin of birth. Negative values index from the end. 
+
+		Returns 
+		------- 
+		start : int 
+			The index of the first analog of this cell. 
+		stop : int 
+			One past the index of the last analog of this cell. 
+		""" 
+		cell = self._cell(zone, tbin) 
+		return [int(self._offsets[cell]), int(self._offsets[cell + 1])] 
+
+	def batch_bounds(self, zones, tbins): 
+		r""" 
+		Get the range of indices holding the analogs of many cells at once. 
+
+		Parameters 
+		---------- 
+		zones : array-like 
+			The zone numbers of birth. Negative values index from the end. 
+		tbins : array-like 
+			The time bins of birth. Negative values index from the end. 
+
+		Returns 
+		------- 
+		start : numpy.ndarray 
+			The index of the first analog of each cell. 
+		stop : numpy.ndarray 
+			One past the index of the last analog of each cell. 
+		""" 
+		zones = np.array(zones, dtype = np.intp) 
+		tbins = np.array(tbins, dtype = np.intp) 
+		zones[zones < 0] += self._n_zones 
+		tbins[tbins < 0] += self._n_time_bins 
+		cells = zones * self._n_time_bins + tbins 
+		return [self._offsets[cells], self._offsets[cells + 1]] 
+
+	def filtered(self, zone, tbin, direction): 
+		r""" 
+		Get the indices of the analogs of a given cell which migrate in a 
+		given direction. 
+
+		Parameters 
+		---------- 
+		zone : int 
+			The zone number of birth. Negative values index from the end. 
+		tbin : int 
+			The time bin of birth. Negative values index from the end. 
+		direction : str 
+			Either "inward" or "outward", selecting analogs which end up at 
+			or inside, or at or outside of the zone of birth, respectively. 
+
+		Returns 
+		------- 
+		indices : numpy.ndarray 
+			The indices into ``zones`` and ``heights`` of the eligible 
+			analogs. A view, not a copy. 
+		""" 
+		indices, offsets = self._filters[direction] 
+		cell = self._cell(zone, tbin) 
+		return indices[offsets[cell]:offsets[cell + 1]] 
+
+	@classmethod 
+	def from_particles(cls, time_bins, rad_bins, tform, rform, rfinal, 
+		zfinal, neighbors = True): 
+		r""" 
+		Bin a set of hydrodynamical star particles into a migration table. 
+
+		Parameters 
+		---------- 
+		time_bins : array-like 
+			The bin edges in formation time in Gyr. 
+		rad_bins : array-like 
+			The bin edges in galactocentric radius in kpc. 
+		tform : array-like 
+			The formation time of each star particle. 
+		rform : array-like 
+			The galactocentric radius of each star particle at birth. 
+		rfinal : array-like 
+			The galactocentric radius of each star particle at the end of the 
+			simulation. 
+		zfinal : array-like 
+			The height of each star particle at the end of the simulation. 
+		neighbors : bool [default : True] 
+			Whether or not cells without any star particles take the analogs 
+			of the neighboring zones at the same time bin. If still empty, or 
+			if False, they take the zone of birth itself with a height of 100, 
+			which is to be ignored after the fact. 
+
+		Returns 
+		------- 
+		table : migration_table 
+			The analyzed table. 
+		""" 
+		n_zones = len(rad_bins) - 1 
+		n_time_bins = len(time_bins) 
+		tbins = get_bin_numbers(time_bins, tform) 
+		tbins[tbins < 0] += n_time_bins 
+		rbins = get_bin_numbers(rad_bins, rform) 
+		rbins[rbins < 0] += n_zones 
+		finals = get_bin_numbers(rad_bins, rfinal) 
+		cells = rbins * n_time_bins + tbins 
+		# stable sort preserves the order of the star particles in each cell 
+		order = np.argsort(cells, kind = "stable") 
+		offsets = np.concatenate(([0], np.cumsum(np.bincount(cells, 
+			minlength = n_zones * n_time_bins)))) 
+		zones = finals[order] 
+		heights = np.asarray(zfinal, dtype = np.float64)[order] 
+		zones = [zones[offsets[i]:offsets[i + 1]] for i in range( 
+			len(offsets) - 1)] 
+		heights = [heights[offsets[i]:offsets[i + 1]] for i in range( 
+			len(offsets) - 1)] 
+		for i in range(n_zones): 
+			for j in range(n_time_bins): 
+				cell = i * n_time_bins + j 
+				if len(zones[cell]): continue 
+				if neighbors: 
+					# let it find something in a neighboring zone 
+					adjacent = [] 
+					if i > 0: adjacent.append(cell - n_time_bins) 
+					if i < n_zones - 1: adjacent.append(cell + n_time_bins) 
+					if len(adjacent): 
+						zones[cell] = np.concatenate( 
+							[zones[k] for k in adjacent]) 
+						heights[cell] = np.concatenate( 
+							[heights[k] for k in adjacent]) 
+					else: pass 
+				else: pass 
+				if len(zones[cell]) == 0: 
+					zones[cell] = np.array([i]) 
+					heights[cell] = np.array([100.]) # ignore after the fact 
+				else: pass 
+		offsets = np.concatenate(([0], np.cumsum([len(k) for k in zones]))) 
+		return cls(np.concatenate(zones), np.concatenate(heights), offsets, 
+			n_time_bins) 
+
+	def save(self, filename): 
+		r""" 
+		Save the table to a ``.npz`` file. 
+
+		Parameters 
+		---------- 
+		filename : str 
+			The name of the file. Written with ``atomic_write``, such that 
+			simultaneous jobs never read a partially written table. 
+		""" 
+		with atomic_write(filename, 'wb') as out: 
+			np.savez(out, zones = self._zones, heights = self._heights, 
+				offsets = self._offsets, n_time_bins = self._n_time_bins) 
+
+	@classmethod 
+	def load(cls, filename): 
+		r""" 
+		Load a table previously written with ``save``. 
+
+		Parameters 
+		---------- 
+		filename : str 
+			The name of the ``.npz`` file. 
+
+		Returns 
+		------- 
+		table : migration_table 
+			The table stored in the file. 
+		""" 
+		with np.load(filename) as raw: 
+			return cls(raw["zones"], raw["heights"], raw["offsets"], 
+				int(raw["n_time_bins"])) 
+
+	def _cell(self, zone, tbin): 
+		if zone < 0: zone += self._n_zones 
+		if tbin < 0: tbin += self._n_time_bins 
+		return zone * self._n_time_bins + tbin 
+
+	def _index_filter(self, cells, mask): 
+		indices = np.flatnonzero(mask) 
+		offsets = np.concatenate(([0], np.cumsum(np.bincount(cells[mask], 
+			minlength = len(self._offsets) - 1)))) 
+		return [indices, offsets] 
+
+
+class migration_batch(object): 
+
+	r""" 
+	The analogs and zone histories of a batch of stellar populations. 
+
+	Parameters 
+	----------
+	zone_origin : array-like 
+		The zone number of birth of each stellar population. 
+	time_origin : array-like 
+		The time of birth of each stellar population in Gyr. 
+	zone_final : array-like 
+		The zone number of each analog at the end of the simulation. 
+	zfinal : array-like 
+		The height of each analog at the end of the simulation in kpc. 
+	init : array-like [default : None] 
+		The fractional zone number of each stellar population at birth. 
+	final : array-like [default : None] 
+		The fractional zone number of each stellar population at ``tend``. 
+	tend : real number [default : None] 
+		The end time of the interpolation between ``init`` and ``final``. 
+	migration_time : array-like [default : None] 
+		The time at which each stellar population moves to its final zone in 
+		a single event. 
+	sink : int [default : None] 
+		The highest zone number a stellar population can occupy. Stellar 
+		populations whose analogs end up beyond it are placed in it instead. 
+		None for no limit. 
+
+	Notes 
+	----- 
+	If ``migration_time`` is given, the stellar populations migrate in a 
+	single event as with a ``UWhydro_1event`` object. Otherwise their zone 
+	numbers are interpolated linearly between ``init`` and ``final``, as 
+	with a ``UWhydro`` object. 
+	""" 
+
+	def __init__(self, zone_origin, time_origin, zone_final, zfinal, 
+		init = None, final = None, tend = None, migration_time = None, 
+		sink = None): 
+		self._sink = sink 
+		self._zone_origin = np.asarray(zone_origin, dtype = np.int16) 
+		self._time_origin = np.asarray(time_origin, dtype = np.float64) 
+		self._zone_final = np.asarray(zone_final, dtype = np.int16) 
+		self._zfinal = np.asarray(zfinal, dtype = np.float64) 
+		if migration_time is None: 
+			self._init = np.asarray(init, dtype = np.float64) 
+			self._final = np.asarray(final, dtype = np.float64) 
+			self._tend = float(tend) 
+			self._migration_time = None 
+		else: 
+			self._migration_time = np.asarray(migration_time, 
+				dtype = np.float64) 
+
+	def __call__(self, t): 
+		r""" 
+		Get the zone number of every stellar population at a given time. 
+
+		Parameters 
+		---------- 
+		t : real number 
+			The time in Gyr. 
+
+		Returns 
+		------- 
+		zones : numpy.ndarray 
+			The zone numbers. Stellar populations not yet born are placed in 
+			zone 0 if their zone numbers are interpolated linearly, and in 
+			their zone of origin if they migrate in a single event, as with 
+			the ``UWhydro`` and ``UWhydro_1event`` objects respectively. 
+		""" 
+		return self._zones(self._time_origin, self._zone_origin, t, 
+			*self._path()) 
+
+	def __len__(self): 
+		return len(self._zone_origin) 
+
+	@property 
+	def zone_origin(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The zone number of birth of each stellar population. 
+		""" 
+		return self._zone_origin 
+
+	@property 
+	def time_origin(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The time of birth of each stellar population in Gyr. 
+		""" 
+		return self._time_origin 
+
+	@property 
+	def zone_final(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The zone number of each analog at the end of the simulation. 
+		""" 
+		return self._zone_final 
+
+	@property 
+	def zfinal(self): 
+		r""" 
+		Type : numpy.ndarray 
+
+		The height of each analog at the end of the simulation in kpc. 
+		""" 
+		return self._zfinal 
+
+	def trajectories(self, times): 
+		r""" 
+		Get the zone history of every stellar population. 
+
+		Parameters 
+		---------- 
+		times : array-like 
+			The times in Gyr at which to evaluate the zone numbers. 
+
+		Returns 
+		------- 
+		zones : numpy.ndarray 
+			A 2-D ``int16`` array of zone numbers whose first axis runs over 
+			stellar populations and second over ``times``. 
+		""" 
+		times = np.asarray(times, dtype = np.float64)[None, :] 
+		return self._zones(self._time_origin[:, None], 
+			self._zone_origin[:, None], times, 
+			*[i[:, None] for i in self._path()]) 
+
+	def _path(self): 
+		if self._migration_time is None: 
+			return [self._init, self._final] 
+		else: 
+			return [self._migration_time, self._zone_final] 
+
+	def _zones(self, time, zone, t, *path): 
+		if self._migration_time is None: 
+			init, final = path 
+			with np.errstate(divide = "ignore", invalid = "ignore"): 
+				current = np.where(self._tend == time, final, 
+					(final - init) / (self._tend - time) * (t - time) + init) 
+			current = np.where(t < time, 0, current.astype(np.int16)) 
+			zones = np.where(t == time, zone, current).astype(np.int16) 
+		else: 
+			migration_time, final = path 
+			zones = np.where(t > migration_time, final, zone).astype(np.int16) 
+		if self._sink is not None: 
+			return np.minimum(zones, self._sink).astype(np.int16) 
+		else: 
+			return zones 
 
 
 class UWhydro(object): 
@@ -73,18 +512,27 @@ class UWhydro(object):
 	interpolating linearly between zone numbers. 
 	""" 
 
+	# The key under which the analyzed migration table is shared, and whether 
+	# or not empty cells take the analogs of the neighboring zones 
+	_variant = "default" 
+	_neighbors = True 
+
 	def __init__(self, time_bins, rad_bins, n_stars = 1, 
-		filename = "tracers.out"): 
-		self._time_bins = time_bins[:] 
-		self._rad_bins = rad_bins[:] 
+		filename = "tracers.out", seed = None, sink = None): 
+		self._time_bins = np.array(time_bins) 
+		self._rad_bins = np.array(rad_bins) 
 		self._n_stars = n_stars 
-		self._zones, self._heights = self._analyze_radii() 
-		self._file = open(filename, 'w') 
-		self._file.write("# zone_origin\ttime_origin\tzone_final\tzfinal\n") 
+		# the highest zone number of the model, if its inactive outer zones 
+		# are collapsed into one; the extra tracer data still record the zone 
+		# numbers of the analogs themselves 
+		self.sink = sink 
+		self._rng = random_stream(seed = seed) 
+		self._table = self._analyze_radii() 
+		self._writer = tracer_writer(filename, _FIELDS) 
 		self.write = False 
 
 	def __call__(self, zone, time, t, n = 0): 
-		# tbin = _get_bin_number(self._time_bins, time) 
+		# tbin = get_bin_number(self._time_bins, time) 
 		# idx = np.random.randint(len(self._zones[zone][tbin])) 
 		# final = self._zones[zone][tbin][idx] + np.random.random() 
 		# init = zone + np.random.random() 
@@ -103,14 +551,16 @@ class UWhydro(object):
 		# 			t)) 
 		# return zones 
 
-		tbin = _get_bin_number(self._time_bins, time) 
+		tbin = get_bin_number(self._time_bins, time) 
 		if t == time: 
-			self._idx = np.random.randint(len(self._zones[zone][tbin])) 
-			self._init = zone + np.random.random() 
-			self._final = self._zones[zone][tbin][self._idx] + np.random.random() 
+			start, stop = self._table.bounds(zone, tbin) 
+			self._idx = start + self._rng.randint(stop - start) 
+			self._init = zone + self._rng.random() 
+			self._final = (int(self._table.zones[self._idx]) + 
+				self._rng.random()) 
 			if self.write: 
-				self._file.write("%d\t%.2f\t%d\t%.3f\n" % (zone, time, 
-					self._final, self._heights[zone][tbin][self._idx]))  
+				self._writer.write(zone, time, self._final, 
+					self._table.heights[self._idx]) 
 			else: 
 				pass 
 		else: 
@@ -120,71 +570,156 @@ class UWhydro(object):
 		elif t == time: 
 			return zone 
 		else: 
-			return int(_interpolate(time, self._time_bins[-1], self._init, 
-				self._final, t)) 
+			return self._clamp(int(_interpolate(time, self._time_bins[-1], 
+				self._init, self._final, t))) 
+
+
+	def assign(self, zones, times): 
+		r""" 
+		Assign analogs to a batch of stellar populations at once, such as all 
+		of those born in one timestep. 
+
+		Parameters 
+		---------- 
+		zones : array-like 
+			The zone number of birth of each stellar population. 
+		times : array-like 
+			The time of birth of each stellar population in Gyr. 
+
+		Returns 
+		------- 
+		batch : migration_batch 
+			The analogs of the stellar populations and their zone histories. 
+
+		Notes 
+		----- 
+		The analog data of the batch are written to the extra tracer data 
+		output file if ``write`` is True, as with a call to this object. 
+		""" 
+		zones = np.asarray(zones, dtype = np.intp) 
+		times = np.asarray(times, dtype = np.float64) 
+		idx = self._pick(zones, times) 
+		batch = migration_batch(zones, times, self._table.zones[idx], 
+			self._table.heights[idx], 
+			init = zones + self._rng.random(len(zones)), 
+			final = self._table.zones[idx] + self._rng.random(len(zones)), 
+			tend = self._time_bins[-1], sink = self.sink) 
+		if self.write: self._write_batch(batch) 
+		return batch 
+
+	def _clamp(self, zone): 
+		if self.sink is not None and zone > self.sink: 
+			return self.sink 
+		else: 
+			return zone 
+
+	def _pick(self, zones, times): 
+		r""" 
+		Randomly select the index into the migration table of an analog for 
+		each of a batch of stellar populations. 
+		""" 
+		start, stop = self._table.batch_bounds(zones, 
+			get_bin_numbers(self._time_bins, times)) 
+		return start + self._rng.randint(stop - start) 
 
+	def _write_batch(self, batch): 
+		self._writer.write_many(batch.zone_origin, batch.time_origin, 
+			batch.zone_final, batch.zfinal) 
 
 	def _analyze_radii(self): 
-		print("Analyzing radii....") 
+		key = (self._variant, tuple(self._time_bins.tolist()), 
+			tuple(self._rad_bins.tolist())) 
+		if key not in _TABLES: 
+			from data import UWhydroparticles_file 
+			cache = self._cache_file(UWhydroparticles_file) 
+			if os.path.exists(cache): 
+				_TABLES[key] = migration_table.load(cache) 
+			else: 
+				print("Analyzing radii....") 
+				_TABLES[key] = migration_table.from_particles(self._time_bins, 
+					self._rad_bins, *self._particles(), 
+					neighbors = self._neighbors) 
+				try: 
+					_TABLES[key].save(cache) 
+				except OSError: 
+					pass # e.g. a read-only data directory; analyze every time 
+		else: pass 
+		return _TABLES[key] 
+
+	def _cache_file(self, source): 
+		r""" 
+		The name of the file caching the analyzed migration table. The name 
+		encodes a hash of the bin edges, the analysis variant, and the 
+		modification time and size of the star particle data file, such that 
+		any change to either invalidates the cache. 
+		""" 
+		stat = os.stat(source) 
+		digest = hashlib.sha1() 
+		digest.update(("%s_%s_%d_%d" % (self._variant, self._neighbors, 
+			stat.st_mtime_ns, stat.st_size)).encode()) 
+		# prefix each array with its length such that moving an edge from 
+		# one to the other changes the digest 
+		for bins in [self._time_bins, self._rad_bins]: 
+			digest.update(("%d_" % (len(bins))).encode()) 
+			digest.update(np.asarray(bins, dtype = np.float64).tobytes()) 
+		return "%s.%s.npz" % (os.path.splitext(source)[0], 
+			digest.hexdigest()[:16]) 
+
+	def _particles(self): 
+		r""" 
+		The formation times, birth and final radii, and final heights of the 
+		star particles to bin into the migration table. 
+		""" 
 		from data import UWhydroparticles 
-		zones = (len(self._rad_bins) - 1) * [None] 
-		heights = (len(self._rad_bins) - 1) * [None] 
-		for i in range(len(zones)): 
-			zones[i] = len(self._time_bins) * [None] 
-			heights[i] = len(self._time_bins) * [None] 
-			for j in range(len(zones[i])): 
-				zones[i][j] = [] 
-				heights[i][j] = [] 
-		for i in range(len(UWhydroparticles["tform"])): 
-			tbin = _get_bin_number(self._time_bins, 
-				UWhydroparticles["tform"][i]) 
-			rbin = _get_bin_number(self._rad_bins, 
-				UWhydroparticles["rform"][i]) 
-			zones[rbin][tbin].append(_get_bin_number(self._rad_bins, 
-				UWhydroparticles["rfinal"][i])) 
-			heights[rbin][tbin].append(UWhydroparticles["zfinal"][i]) 
-		for i in range(len(zones)): 
-			for j in range(len(zones[i])): 
-				if len(zones[i][j]) == 0: 
-					# let it find something in a neighboring zone 
-					if i > 0: 
-						zones[i][j] += zones[i - 1][j][:] 
-						heights[i][j] += heights[i - 1][j][:] 
-					if i < len(zones) - 1: 
-						zones[i][j] += zones[i + 1][j][:] 
-						heights[i][j] += heights[i + 1][j][:] 
-					if len(zones[i][j]) == 0: 
-						zones[i][j].append(i) 
-						heights[i][j].append(100) # ignore after the fact 
-						# print("i = %d" % (i)) 
-						# print(zones[i][j]) 
-				else: continue 
-		return [zones, heights] 
+		return [UWhydroparticles["tform"], UWhydroparticles["rform"], 
+			UWhydroparticles["rfinal"], UWhydroparticles["zfinal"]] 
+
 
+	def __enter__(self): 
+		return self 
+
+	def __exit__(self, exc_type, exc_value, exc_tb): 
+		self.close_file() 
+		return False 
 
 	def close_file(self): 
-		self._file.close() 
+		r""" 
+		Flush any buffered extra tracer data and close the output file. 
+		""" 
+		self._writer.close() 
+
+	@property 
+	def rng(self): 
+		r""" 
+		Type : random_stream 
+
+		The seeded stream of random numbers used to select analogs. Workers 
+		running in parallel should take independent streams from its 
+		``spawn`` method. 
+		""" 
+		return self._rng 
 
 
 
 class UWhydro_1event(UWhydro): 
 
 	def __init__(self, time_bins, rad_bins, n_stars = 1, 
-		filename = "tracers.out"): 
+		filename = "tracers.out", seed = None, sink = None): 
 		super().__init__(time_bins, rad_bins, n_stars = n_stars, 
-			filename = filename) 
+			filename = filename, seed = seed, sink = sink) 
 
 
 	def __call__(self, zone, time, t, n = 0): 
-		tbin = _get_bin_number(self._time_bins, time) 
+		tbin = get_bin_number(self._time_bins, time) 
 		if t == time: 
-			self._idx = np.random.randint(len(self._zones[zone][tbin])) 
+			start, stop = self._table.bounds(zone, tbin) 
+			self._idx = start + self._rng.randint(stop - start) 
 			# self._init = zone 
-			self._final = self._zones[zone][tbin][self._idx] 
-			self._mig_time = _rand_range(time, 12.8) 
+			self._final = int(self._table.zones[self._idx]) 
+			self._mig_time = _rand_range(time, 12.8, stream = self._rng) 
 			if self.write: 
-				self._file.write("%d\t%.2f\t%d\t%.3f\n" % (zone, time, 
-					self._final, self._heights[zone][tbin][self._idx]))  
+				self._writer.write(zone, time, self._final, 
+					self._table.heights[self._idx]) 
 			else: 
 				pass 
 		else: 
@@ -192,10 +727,37 @@ class UWhydro_1event(UWhydro):
 		if t == time: 
 			return zone 
 		elif t > self._mig_time: 
-			return self._final 
+			return self._clamp(self._final) 
 		else: 
 			return zone 
 
+	def assign(self, zones, times): 
+		r""" 
+		Assign analogs and migration times to a batch of stellar populations 
+		at once, such as all of those born in one timestep. 
+
+		Parameters 
+		---------- 
+		zones : array-like 
+			The zone number of birth of each stellar population. 
+		times : array-like 
+			The time of birth of each stellar population in Gyr. 
+
+		Returns 
+		------- 
+		batch : migration_batch 
+			The analogs of the stellar populations and their zone histories. 
+		""" 
+		zones = np.asarray(zones, dtype = np.intp) 
+		times = np.asarray(times, dtype = np.float64) 
+		idx = self._pick(zones, times) 
+		batch = migration_batch(zones, times, self._table.zones[idx], 
+			self._table.heights[idx], 
+			migration_time = times + (12.8 - times) * self._rng.random( 
+				len(zones)), sink = self.sink) 
+		if self.write: self._write_batch(batch) 
+		return batch 
+
 
 
 
@@ -215,29 +777,20 @@ class UWhydro_1event(UWhydro):
 
 class UWhydro_zfilter(UWhydro): 
 
-	def __init__(self, time_bins, rad_bins): 
-		super().__init__(time_bins, rad_bins) 
+	_variant = "zfilter" 
+	_neighbors = False 
 
-	def _analyze_radii(self): 
+	def __init__(self, time_bins, rad_bins, n_stars = 1, 
+		filename = "tracers.out", seed = None, sink = None): 
+		super().__init__(time_bins, rad_bins, n_stars = n_stars, 
+			filename = filename, seed = seed, sink = sink) 
+
+	def _particles(self): 
 		from data import UWhydroparticles_zfilter 
-		zones = (len(self._rad_bins) - 1) * [None] 
-		for i in range(len(zones)): 
-			zones[i] = len(self._time_bins) * [None] 
-			for j in range(len(zones[i])): 
-				zones[i][j] = [] 
-		for i in range(len(UWhydroparticles_zfilter["tform"])): 
-			tbin = _get_bin_number(self._time_bins, 
-				UWhydroparticles_zfilter["tform"][i]) 
-			rbin = _get_bin_number(self._rad_bins, 
-				UWhydroparticles_zfilter["rform"][i]) 
-			zones[rbin][tbin].append(_get_bin_number(self._rad_bins, 
-				UWhydroparticles_zfilter["rfinal"][i]))  
-		for i in range(len(zones)): 
-			for j in range(len(zones[i])): 
-				if len(zones[i][j]) == 0: 
-					zones[i][j].append(i) 
-				else: continue 
-		return zones 
+		return [UWhydroparticles_zfilter["tform"], 
+			UWhydroparticles_zfilter["rform"], 
+			UWhydroparticles_zfilter["rfinal"], 
+			UWhydroparticles_zfilter["zfinal"]] 
 
 
 class UWhydro_inward(UWhydro): 
@@ -248,19 +801,21 @@ class UWhydro_inward(UWhydro):
 	which migrate inward. 
 	""" 
 
-	def __init__(self, time_bins, rad_bins): 
-		super().__init__(time_bins, rad_bins) 
+	def __init__(self, time_bins, rad_bins, n_stars = 1, 
+		filename = "tracers.out", seed = None, sink = None): 
+		super().__init__(time_bins, rad_bins, n_stars = n_stars, 
+			filename = filename, seed = seed, sink = sink) 
 
 	def __call__(self, zone, time): 
-		tbin = _get_bin_number(self._time_bins, time) 
-		possibilities = list(filter(lambda x: x <= zone, 
-			self._zones[zone][tbin])) 
+		tbin = get_bin_number(self._time_bins, time) 
+		possibilities = self._table.filtered(zone, tbin, "inward") 
 		if len(possibilities) > 0: 
-			final = possibilities[np.random.randint(len(possibilities))] 
+			final = int(self._table.zones[possibilities[self._rng.randint( 
+				len(possibilities))]]) 
 		else: 
 			final = zone 
-		final += np.random.random() 
-		init = zone + np.random.random() 
+		final += self._rng.random() 
+		init = zone + self._rng.random() 
 		def zones(t): 
 			if t < time: 
 				return 0 
@@ -280,19 +835,21 @@ class UWhydro_outward(UWhydro):
 	which migrate outward. 
 	""" 
 
-	def __init__(self, time_bins, rad_bins): 
-		super().__init__(time_bins, rad_bins) 
+	def __init__(self, time_bins, rad_bins, n_stars = 1, 
+		filename = "tracers.out", seed = None, sink = None): 
+		super().__init__(time_bins, rad_bins, n_stars = n_stars, 
+			filename = filename, seed = seed, sink = sink) 
 
 	def __call__(self, zone, time): 
-		tbin = _get_bin_number(self._time_bins, time) 
-		possibilities = list(filter(lambda x: x >= zone, 
-			self._zones[zone][tbin])) 
+		tbin = get_bin_number(self._time_bins, time) 
+		possibilities = self._table.filtered(zone, tbin, "outward") 
 		if len(possibilities) > 0: 
-			final = possibilities[np.random.randint(len(possibilities))] 
+			final = int(self._table.zones[possibilities[self._rng.randint( 
+				len(possibilities))]]) 
 		else: 
 			final = zone 
-		final += np.random.random() 
-		init = zone + np.random.random() 
+		final += self._rng.random() 
+		init = zone + self._rng.random() 
 		def zones(t): 
 			if t < time: 
 				return 0 
@@ -312,27 +869,15 @@ class UWhydro_reverse(UWhydro):
 	final zone numbers 
 	""" 
 
-	def __init__(self, time_bins, rad_bins): 
-		super().__init__(time_bins, rad_bins) 
+	_variant = "reverse" 
+	_neighbors = False 
 
-	def _analyze_radii(self): 
-		from data import UWhydroparticles 
-		zones = (len(self._rad_bins) - 1) * [None] 
-		for i in range(len(zones)): 
-			zones[i] = len(self._time_bins) * [None] 
-			for j in range(len(zones[i])): 
-				zones[i][j] = [] 
-		for i in range(len(UWhydroparticles["tform"])): 
-			tbin = _get_bin_number(self._time_bins, 
-				UWhydroparticles["tform"][i]) 
-			rbin = _get_bin_number(self._rad_bins, 
-				UWhydroparticles["rfinal"][i]) 
-			zones[rbin][tbin].append(_get_bin_number(self._rad_bins, 
-				UWhydroparticles["rform"][i]))  
-		for i in range(len(zones)): 
-			for j in range(len(zones[i])): 
-				if len(zones[i][j]) == 0: 
-					zones[i][j].append(i) 
-				else: continue 
-		return zones 
+	def __init__(self, time_bins, rad_bins, n_stars = 1, 
+		filename = "tracers.out", seed = None, sink = None): 
+		super().__init__(time_bins, rad_bins, n_stars = n_stars, 
+			filename = filename, seed = seed, sink = sink) 
 
+	def _particles(self): 
+		from data import UWhydroparticles 
+		return [UWhydroparticles["tform"], UWhydroparticles["rfinal"], 
+			UWhydroparticles["rform"], UWhydroparticles["zfinal"]] 
@@ -0,0 +1,200 @@
+r""" 
+A buffered writer for the extra tracer particle data written alongside 
+multizone simulations. Records are accumulated in a preallocated structured 
+array and written out in large chunks, either to a ``.npy`` file or, for 
+compatibility with existing analysis scripts, to a tab-separated text file. 
+""" 
+
+__all__ = ["tracer_writer"] 
+import numpy as np 
+import struct 
+
+
+class tracer_writer(object): 
+
+	r""" 
+	Writes records of extra tracer particle data in large chunks. 
+
+	Parameters 
+	---------- 
+	filename : str 
+		The name of the output file. If it ends in ".npy", records are 
+		written in binary as a 1-D structured numpy array; otherwise they are 
+		written as tab-separated text with a commented header line. 
+	fields : list 
+		A list of (name, dtype, format) tuples describing each column of a 
+		record, where format is the printf-style format to use in text output. 
+	chunk : int [default : 65536] 
+		The number of records to accumulate before writing them out. 
+
+	Notes 
+	----- 
+	A ``.npy`` output is a valid numpy file after every flush: its header is 
+	rewritten with the number of records written so far. The file is not 
+	created until the first flush, such that constructing a writer never 
+	truncates an existing output which ends up not being rewritten. Objects 
+	of this class are context managers which close the file upon exiting, 
+	including when an exception is raised. 
+	""" 
+
+	# magic string and version of the .npy format, version 1.0 
+	_MAGIC = b"\x93NUMPY\x01\x00" 
+
+	def __init__(self, filename, fields, chunk = 65536): 
+		if not isinstance(filename, str): raise TypeError( 
+			"Filename must be a string. Got: %s" % (type(filename))) 
+		if not isinstance(chunk, int) or chunk <= 0: raise ValueError( 
+			"Chunk size must be a positive integer. Got: %s" % (chunk)) 
+		self._filename = filename 
+		self._binary = filename.endswith(".npy") 
+		self._dtype = np.dtype([(i[0], i[1]) for i in fields]) 
+		self._format = "\t".join([i[2] for i in fields]) + "\n" 
+		self._buffer = np.empty(chunk, dtype = self._dtype) 
+		self._n = 0 
+		self._count = 0 
+		self._file = None 
+		if self._binary: 
+			# reserve room for the largest record count, such that the header 
+			# can be rewritten in place without moving any records 
+			length = len(self._header(10**20)) + len(self._MAGIC) + 3 
+			self._header_length = 64 * (length // 64 + 1) - len( 
+				self._MAGIC) - 2 
+		else: pass 
+
+	def __enter__(self): 
+		return self 
+
+	def __exit__(self, exc_type, exc_value, exc_tb): 
+		self.close() 
+		return False 
+
+	@property 
+	def filename(self): 
+		r""" 
+		Type : str 
+
+		The name of the output file. 
+		""" 
+		return self._filename 
+
+	@property 
+	def closed(self): 
+		r""" 
+		Type : bool 
+
+		Whether or not the output file has been closed. 
+		""" 
+		return self._file is not None and self._file.closed 
+
+	@property 
+	def count(self): 
+		r""" 
+		Type : int 
+
+		The number of records written so far, including those not yet 
+		flushed to disk. 
+		""" 
+		return self._count + self._n 
+
+	def write(self, *values): 
+		r""" 
+		Add a single record. 
+
+		Parameters 
+		---------- 
+		values : real numbers 
+			The value of each field in the order they were specified. 
+		""" 
+		self._buffer[self._n] = values 
+		self._n += 1 
+		if self._n == len(self._buffer): self.flush() 
+
+	def write_many(self, *columns): 
+		r""" 
+		Add many records at once. 
+
+		Parameters 
+		---------- 
+		columns : array-like 
+			The values of each field in the order they were specified, one 
+			array per field, all of the same length. 
+		""" 
+		columns = [np.asarray(i) for i in columns] 
+		start = 0 
+		while start < len(columns[0]): 
+			n = min(len(columns[0]) - start, len(self._buffer) - self._n) 
+			for i in range(len(columns)): 
+				self._buffer[self._dtype.names[i]][self._n:self._n + n] = ( 
+					columns[i][start:start + n]) 
+			self._n += n 
+			start += n 
+			if self._n == len(self._buffer): self.flush() 
+
+	def flush(self): 
+		r""" 
+		Write all buffered records out to the file. 
+		""" 
+		if self._file is None: self._open() 
+		if self._n: 
+			if self._binary: 
+				self._buffer[:self._n].tofile(self._file) 
+				self._count += self._n 
+				self._write_header() 
+			else: 
+				self._file.write("".join([self._format % i for i in 
+					self._buffer[:self._n].tolist()])) 
+				self._count += self._n 
+			self._n = 0 
+		else: pass 
+		self._file.flush() 
+
+	def close(self): 
+		r""" 
+		Flush the remaining records and close the file. Has no effect if the 
+		file is already closed. 
+		""" 
+		if not self.closed: 
+			self.flush() 
+			self._file.close() 
+		else: pass 
+
+	def export_text(self, filename): 
+		r""" 
+		Write the records of a binary output to a tab-separated text file in 
+		the format this class writes when not given a ".npy" file name. 
+
+		Parameters 
+		---------- 
+		filename : str 
+			The name of the text file to write. 
+		""" 
+		if not self._binary: raise ValueError( 
+			"Output is already in text format: %s" % (self._filename)) 
+		self.flush() 
+		records = np.load(self._filename, mmap_mode = 'r') 
+		with open(filename, 'w') as out: 
+			out.write("# %s\n" % ("\t".join(self._dtype.names))) 
+			for i in range(0, len(records), len(self._buffer)): 
+				out.write("".join([self._format % j for j in 
+					records[i:i + len(self._buffer)].tolist()])) 
+
+	def _open(self): 
+		if self._binary: 
+			self._file = open(self._filename, 'wb') 
+			self._write_header() 
+		else: 
+			self._file = open(self._filename, 'w') 
+			self._file.write("# %s\n" % ("\t".join(self._dtype.names))) 
+
+	def _header(self, count): 
+		return "{'descr': %s, 'fortran_order': False, 'shape': (%d,), }" % ( 
+			repr(np.lib.format.dtype_to_descr(self._dtype)), count) 
+
+	def _write_header(self): 
+		position = self._file.tell() 
+		self._file.seek(0) 
+		self._file.write(self._MAGIC) 
+		self._file.write(struct.pack("<H", self._header_length)) 
+		self._file.write(self._header(self._count).ljust( 
+			self._header_length - 1).encode("latin1") + b"\n") 
+		if position: self._file.seek(position) 
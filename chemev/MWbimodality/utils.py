@@ -0,0 +1,57 @@
+r""" 
+Small utilities shared by the simulations, the data packages, and the 
+analysis routines. 
+""" 
+
+__all__ = ["atomic_write", "RELATIONS"] 
+import contextlib 
+import operator 
+import os 
+
+# The comparisons which star particle and data queries filter with, as in 
+# ``vice.dataframe.filter`` 
+RELATIONS = { 
+	"<": 		operator.lt, 
+	"<=": 		operator.le, 
+	"=": 		operator.eq, 
+	"==": 		operator.eq, 
+	"!=": 		operator.ne, 
+	">=": 		operator.ge, 
+	">": 		operator.gt 
+} 
+
+
+@contextlib.contextmanager 
+def atomic_write(filename, mode = 'w'): 
+	r""" 
+	Open a file for writing such that it appears under its name only once it 
+	is complete. 
+
+	Parameters 
+	---------- 
+	filename : str 
+		The name of the file. 
+	mode : str [default : 'w'] 
+		The mode to open the file in, e.g. 'wb' for ``np.save``. 
+
+	Notes 
+	----- 
+	The file is written to "<filename>.<pid>.tmp" and moved into place with 
+	``os.replace`` once the block exits cleanly. Simultaneous jobs, or 
+	analysis running alongside a simulation, therefore never read a 
+	partially written file, and an interrupted write leaves any previous 
+	version in place. The temporary file is removed if the block raises. 
+
+	Example Code 
+	------------ 
+	>>> with atomic_write("table.npy", 'wb') as out: 
+		np.save(out, table) 
+	""" 
+	tmp = "%s.%d.tmp" % (filename, os.getpid()) 
+	try: 
+		with open(tmp, mode) as f: 
+			yield f 
+	except BaseException: 
+		if os.path.exists(tmp): os.remove(tmp) 
+		raise 
+	os.replace(tmp, filename) 